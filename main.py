@@ -1,18 +1,7 @@
-import customtkinter as ctk
-from src.database.db_config import setup_database
-from src.interfaces.hub import MainWindow
-
-if __name__ == "__main__":
-    # Setup the database
-    setup_database()
-
-    # Create and run the application
-    app = MainWindow()
 import tkinter as tk
 from src.database.db_config import setup_database
 from src.auth.login import LoginFrame
 import customtkinter as ctk
-from src.interfaces.hub import MainWindow
 
 
 class App(ctk.CTk):
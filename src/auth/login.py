@@ -2,8 +2,7 @@ import tkinter as tk
 from tkinter import messagebox
 import sqlite3
 import customtkinter as ctk
-from ..database.db_config import get_db_connection
-from ..interfaces.hub import MainWindow
+from ..database.db_config import db_connection
 
 
 class LoginFrame(ctk.CTkFrame):
@@ -60,9 +59,8 @@ class LoginFrame(ctk.CTkFrame):
             messagebox.showerror("Error", "Please enter both username and password")
             return
 
-        conn = get_db_connection()
-        if conn:
-            try:
+        try:
+            with db_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
                     """
@@ -73,27 +71,23 @@ class LoginFrame(ctk.CTkFrame):
                     (username, password),
                 )
                 user = cursor.fetchone()
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"An error occurred: {str(e)}")
+            return
 
-                if user:
-                    # Store user info in the controller
-                    self.controller.current_user = {
-                        "id": user[0],
-                        "username": user[1],
-                        "role": user[2],
-                    }
-
-                    # Login successful
-                    messagebox.showinfo("Success", f"Welcome {username}!")
-                    self.open_main_window()
-                else:
-                    messagebox.showerror("Error", "Invalid username or password")
-
-            except sqlite3.Error as e:
-                messagebox.showerror("Database Error", f"An error occurred: {str(e)}")
-            finally:
-                conn.close()
+        if user:
+            # Store user info in the controller
+            self.controller.current_user = {
+                "id": user[0],
+                "username": user[1],
+                "role": user[2],
+            }
+
+            # Login successful
+            messagebox.showinfo("Success", f"Welcome {username}!")
+            self.open_main_window()
         else:
-            messagebox.showerror("Error", "Could not connect to database")
+            messagebox.showerror("Error", "Invalid username or password")
 
     def show_forgot_password(self):
         # Implement forgot password functionality
@@ -105,7 +99,8 @@ class LoginFrame(ctk.CTkFrame):
         # Hide login window
         self.controller.withdraw()
 
-        # Create and show main window
+        # Create and show main window, its pages are only imported once logged in
+        from ..interfaces.hub import MainWindow
         main_window = MainWindow()
 
         # Configure main window based on user role
@@ -0,0 +1,628 @@
+"""Database benchmarks
+
+Every benchmark runs against a private copy of the database so the real
+store is never modified. Run with:
+
+    python -m src.database.benchmark
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from src.database.db_config import DB_FILE
+from src.database.migrations import migrate
+from src.database import checkout, dashboard_data, product_search, purchase_history, sales_analytics, seed_data
+from src.database.storage_profiles import STORAGE_PROFILES
+
+def copy_database(target_dir, name="bench.db"):
+    """Copy the live database into target_dir with the backup API, returns the new path"""
+    path = os.path.join(target_dir, name)
+    source = sqlite3.connect(DB_FILE)
+    target = sqlite3.connect(path)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+    return path
+
+
+def summarize(samples):
+    """Summarize a list of durations in seconds as milliseconds"""
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return {
+        "runs": len(samples),
+        "mean_ms": statistics.mean(samples) * 1000,
+        "p50_ms": statistics.median(samples) * 1000,
+        "p95_ms": p95 * 1000,
+        "max_ms": samples[-1] * 1000,
+    }
+
+
+def simulate_checkout(conn, buyer, lines):
+    """Replay the statements CheckoutFrame.complete_purchase issues for one cart"""
+    cursor = conn.cursor()
+    total_amount = sum(quantity * price for _, quantity, price in lines)
+
+    cursor.execute("SELECT id, loyalty_points, total_spent FROM users WHERE name = ?", (buyer,))
+    user = cursor.fetchone()
+    if user:
+        user_id, current_points, current_spent = user
+    else:
+        cursor.execute("INSERT INTO users (name, created_by) VALUES (?, 1)", (buyer,))
+        user_id, current_points, current_spent = cursor.lastrowid, 0, 0.0
+
+    new_points = int((total_amount / 100) * 10)
+    cursor.execute(
+        "UPDATE users SET loyalty_points = ?, total_spent = ? WHERE id = ?",
+        (current_points + new_points, current_spent + total_amount, user_id),
+    )
+    cursor.execute(
+        "INSERT INTO purchases (user_id, total_amount, points_earned, created_by) VALUES (?, ?, ?, 1)",
+        (user_id, total_amount, new_points),
+    )
+    purchase_id = cursor.lastrowid
+
+    for product_id, quantity, price in lines:
+        cursor.execute(
+            "INSERT INTO purchase_details (purchase_id, product_id, quantity, unit_price, total_price) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (purchase_id, product_id, quantity, price, quantity * price),
+        )
+        cursor.execute(
+            "UPDATE products SET quantity = quantity - ? WHERE id = ?", (quantity, product_id)
+        )
+    conn.commit()
+
+
+def benchmark_checkout_commit(runs=200, cart_size=5):
+    """Time checkout commits with SQLite defaults and with every storage profile"""
+    results = {}
+    configurations = {"sqlite-defaults": {"journal_mode": "DELETE"}}
+    configurations.update(STORAGE_PROFILES)
+
+    for name, pragmas in configurations.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = copy_database(tmp)
+            conn = sqlite3.connect(path)
+            for pragma, value in pragmas.items():
+                conn.execute(f"PRAGMA {pragma} = {value}")
+
+            # Zero quantities are fine, stock is not guarded by the old code path
+            products = conn.execute("SELECT id, price FROM products LIMIT ?", (cart_size,)).fetchall()
+            lines = [(product_id, 1, price) for product_id, price in products]
+
+            samples = []
+            for run in range(runs):
+                start = time.perf_counter()
+                simulate_checkout(conn, f"Benchmark Buyer {run % 10}", lines)
+                samples.append(time.perf_counter() - start)
+            conn.close()
+        results[name] = summarize(samples)
+    return results
+
+
+def benchmark_cart_sizes(cart_sizes=(1, 50, 500), runs=50):
+    """Time committing carts of several sizes, per-line statements against checkout.commit_cart"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(copy_database(tmp))
+        for pragma, value in STORAGE_PROFILES["till"].items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        migrate(conn)
+        seed_data.generate_synthetic_data(conn, products=max(cart_sizes), customers=0, purchases=0, movements=0)
+        # Plenty of stock so no run hits a conflict
+        conn.execute("UPDATE products SET quantity = 1000000")
+        conn.commit()
+        products = conn.execute("SELECT id, name, price FROM products LIMIT ?", (max(cart_sizes),)).fetchall()
+
+        for size in cart_sizes:
+            items = [
+                {'id': product_id, 'name': name, 'price': price, 'quantity': 1}
+                for product_id, name, price in products[:size]
+            ]
+            lines = [(item['id'], item['quantity'], item['price']) for item in items]
+
+            samples = []
+            for run in range(runs):
+                start = time.perf_counter()
+                simulate_checkout(conn, f"Benchmark Buyer {run % 10}", lines)
+                samples.append(time.perf_counter() - start)
+            results[f"per-line {size}"] = summarize(samples)
+
+            samples = []
+            for run in range(runs):
+                start = time.perf_counter()
+                checkout.commit_cart(conn, f"Benchmark Buyer {run % 10}", items)
+                samples.append(time.perf_counter() - start)
+            results[f"batched {size}"] = summarize(samples)
+        conn.close()
+    return results
+
+
+def benchmark_type_ahead_search(products=100_000, queries=30, budget_ms=50.0):
+    """Time the checkout search for every keystroke of typed queries on a large catalog"""
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(copy_database(tmp))
+        migrate(conn)
+        seed_data.generate_synthetic_data(conn, products=products, customers=0, purchases=0, movements=0)
+
+        words = seed_data.PRODUCT_WORDS
+        references = [row[0] for row in conn.execute("SELECT reference FROM products WHERE reference LIKE 'GEN%'")]
+        typed = [f"{rng.choice(words)} {rng.choice(words)}".lower() for _ in range(queries)]
+        typed += [rng.choice(references).lower()[:rng.randint(4, 10)] for _ in range(queries // 3)]
+
+        samples = []
+        for text in typed:
+            # One search per keystroke, as if debouncing never kicked in
+            for length in range(1, len(text) + 1):
+                start = time.perf_counter()
+                product_search.search_products(conn, text[:length], limit=product_search.TYPE_AHEAD_LIMIT)
+                samples.append(time.perf_counter() - start)
+        conn.close()
+
+    stats = summarize(samples)
+    stats["budget_p95_ms"] = budget_ms
+    stats["within_budget"] = stats["p95_ms"] <= budget_ms
+    return {f"{products} products": stats}
+
+
+def add_synthetic_purchases(conn, count, items_per_purchase=4, seed=42, years=(2024,)):
+    """Bulk insert count random purchases with their detail lines, dated in the given years
+
+    The sales rollups are not updated, call sales_analytics.rebuild_sales_rollups() when they matter.
+    """
+    rng = random.Random(seed)
+    products = conn.execute("SELECT id, price, cost_price FROM products").fetchall()
+    users = [row[0] for row in conn.execute("SELECT id FROM users")]
+    next_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM purchases").fetchone()[0]
+    purchases, details = [], []
+    for purchase_id in range(next_id, next_id + count):
+        lines = rng.sample(products, min(items_per_purchase, len(products)))
+        total = 0.0
+        for product_id, price, cost_price in lines:
+            quantity = rng.randint(1, 5)
+            total += quantity * price
+            details.append((purchase_id, product_id, quantity, price, quantity * price, cost_price))
+        created_at = f"{rng.choice(years)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(8, 20):02d}:{rng.randint(0, 59):02d}:00"
+        purchases.append((purchase_id, rng.choice(users), total, int(total / 10), 1, created_at))
+    conn.executemany("""
+        INSERT INTO purchases (id, user_id, total_amount, points_earned, created_by, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, purchases)
+    conn.executemany("""
+        INSERT INTO purchase_details (purchase_id, product_id, quantity, unit_price, total_price, unit_cost)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, details)
+    conn.commit()
+
+
+def load_purchase_history_n_plus_one(conn):
+    """The purchase table refresh before paging: every purchase, then one query per purchase"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT p.id, a.username, u.name, p.created_at, p.total_amount
+        FROM purchases p
+        LEFT JOIN admin a ON p.created_by = a.id
+        LEFT JOIN users u ON p.user_id = u.id
+        ORDER BY p.created_at DESC
+    """)
+    rows = []
+    for purchase in cursor.fetchall():
+        cursor.execute("""
+            SELECT pr.name, pd.quantity
+            FROM purchase_details pd
+            JOIN products pr ON pd.product_id = pr.id
+            WHERE pd.purchase_id = ?
+            ORDER BY pr.name
+        """, (purchase[0],))
+        rows.append(purchase + (" | ".join(f"{name}, {qty}" for name, qty in cursor.fetchall()),))
+    return rows
+
+
+def benchmark_purchase_history(purchases=50_000, runs=5, page_rows=30):
+    """Time opening the purchase history: the old full N+1 load against the first pager page"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(copy_database(tmp))
+        migrate(conn)
+        add_synthetic_purchases(conn, purchases)
+
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            load_purchase_history_n_plus_one(conn)
+            samples.append(time.perf_counter() - start)
+        results["n+1 full load"] = summarize(samples)
+
+        samples = []
+        for _ in range(runs * 20):
+            start = time.perf_counter()
+            pager = purchase_history.purchases_pager(conn=conn)
+            pager.rows(0, page_rows)
+            samples.append(time.perf_counter() - start)
+        results["paged first page"] = summarize(samples)
+
+        # Scrolling further costs the same per page
+        pager = purchase_history.purchases_pager(conn=conn)
+        samples = []
+        for first in range(0, 20 * page_rows, page_rows):
+            start = time.perf_counter()
+            pager.rows(first, first + page_rows)
+            samples.append(time.perf_counter() - start)
+        results["paged next pages"] = summarize(samples)
+        conn.close()
+    return results
+
+
+def load_dashboard_separate_scans(conn):
+    """The dashboard's former reads: one query per card and chart, each scanning products"""
+    conn.execute("SELECT COUNT(*) FROM products").fetchone()
+    conn.execute("SELECT SUM(price * quantity) FROM products").fetchone()
+    conn.execute("SELECT COUNT(*) FROM products WHERE quantity <= min_quantity").fetchone()
+    conn.execute("""
+        SELECT c.name, COUNT(p.id) as count
+        FROM category c
+        LEFT JOIN products p ON c.id = p.category_id
+        GROUP BY c.id, c.name
+        ORDER BY count DESC
+    """).fetchall()
+    conn.execute("""
+        SELECT CASE
+                   WHEN quantity <= min_quantity THEN 'Low Stock'
+                   WHEN quantity <= (min_quantity * 2) THEN 'Medium Stock'
+                   ELSE 'Good Stock'
+               END as status,
+               COUNT(*) as count
+        FROM products
+        GROUP BY status
+    """).fetchall()
+
+
+def benchmark_dashboard_load(products=100_000, runs=20):
+    """Time loading the dashboard numbers: separate scans, one scan, and the aggregates table"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(copy_database(tmp))
+        migrate(conn)
+        seed_data.generate_synthetic_data(conn, products=products, customers=0, purchases=0, movements=0)
+        conn.commit()
+        mismatches = dashboard_data.check_dashboard_aggregates(conn)
+        if mismatches:
+            raise AssertionError(f"dashboard_aggregates out of date: {mismatches}")
+
+        loaders = {
+            "separate scans": load_dashboard_separate_scans,
+            "single pass": lambda conn: dashboard_data.load_dashboard_data(conn, use_aggregates=False, use_snapshot=False),
+            "aggregates": dashboard_data.load_dashboard_data,
+        }
+        for name, load in loaders.items():
+            samples = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                load(conn)
+                samples.append(time.perf_counter() - start)
+            results[name] = summarize(samples)
+        conn.close()
+    return results
+
+
+def benchmark_catalog_snapshot(products=1_000_000, runs=10, changed=100):
+    """Time the catalog reports in SQL against the NumPy catalog snapshot"""
+    from src.database.catalog_snapshot import CatalogSnapshot, prune_product_changes
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(copy_database(tmp))
+        migrate(conn)
+        seed_data.generate_synthetic_data(conn, products=products, customers=0, purchases=0, movements=0)
+        # The load logged every product, trim it as a running shop would have
+        prune_product_changes(conn)
+
+        def timed(name, work, repeat=runs):
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                work()
+                samples.append(time.perf_counter() - start)
+            results[name] = summarize(samples)
+
+        snapshot = CatalogSnapshot()
+        timed("snapshot full load", lambda: snapshot.load(conn), repeat=max(1, runs // 5))
+        snapshot.refresh(conn)
+
+        # The same product changes then an incremental refresh, every run
+        ids = snapshot.ids[::max(1, len(snapshot) // changed)][:changed].tolist()
+
+        def change_and_refresh():
+            conn.executemany("UPDATE products SET quantity = quantity + 1 WHERE id = ?", [(i,) for i in ids])
+            conn.commit()
+            start = time.perf_counter()
+            snapshot.refresh(conn)
+            return time.perf_counter() - start
+        results[f"refresh {changed} chg"] = summarize([change_and_refresh() for _ in range(runs)])
+
+        expected = dashboard_data.load_dashboard_data(conn, use_aggregates=False, use_snapshot=False)
+        actual = snapshot.dashboard_data(conn)
+        if expected['stock_status_counts'] != actual['stock_status_counts'] \
+                or abs(expected['total_value'] - actual['total_value']) > 0.01 * max(1, products / 1000):
+            raise AssertionError(f"snapshot out of date: {actual} != {expected}")
+
+        timed("sql value", lambda: conn.execute("SELECT SUM(price * quantity) FROM products").fetchone())
+        timed("snapshot value", snapshot.inventory_value)
+        timed("sql dashboard", lambda: dashboard_data.load_dashboard_data(conn, use_aggregates=False, use_snapshot=False))
+        timed("snapshot dashboard", lambda: snapshot.dashboard_data(conn))
+        timed("sql below minimum", lambda: conn.execute(
+            "SELECT id FROM products WHERE quantity < min_quantity ORDER BY quantity"
+        ).fetchall())
+        timed("snapshot below min", snapshot.below_minimum_ids)
+        conn.close()
+    return results
+
+
+def add_synthetic_daily_sales(conn, days=730, sale_probability=0.1, end="2024-12-31", seed=42):
+    """Fill the product sales rollups directly with random product-days of sales up to end
+
+    Only sales_daily_product and sales_monthly_product are written, enough
+    for the forecasting job.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    product_ids = np.array([row[0] for row in conn.execute("SELECT id FROM products ORDER BY id")])
+    last = np.datetime64(end)
+    # Each product gets its own sales rate so the forecasts differ
+    rates = rng.uniform(0.2, 2.0, len(product_ids)) * sale_probability
+    cursor = conn.cursor()
+    for age in range(days):
+        sold = rng.random(len(product_ids)) < rates
+        units = rng.poisson(3, sold.sum()) + 1
+        revenue = units * 10.0
+        day = str(last - age)
+        cursor.executemany("""
+            INSERT INTO sales_daily_product (day, product_id, purchases, units, revenue, cost, costed_revenue)
+            VALUES (?, ?, ?, ?, ?, 0, 0)
+        """, zip([day] * len(units), product_ids[sold].tolist(), [1] * len(units), units.tolist(), revenue.tolist()))
+    cursor.execute("""
+        INSERT INTO sales_monthly_product (month, product_id, purchases, units, revenue, cost, costed_revenue)
+        SELECT strftime('%Y-%m-01', day), product_id, SUM(purchases), SUM(units), SUM(revenue), 0, 0
+        FROM sales_daily_product
+        WHERE day > date(:end, :days) AND day <= :end
+        GROUP BY 1, 2
+        ON CONFLICT (month, product_id) DO UPDATE SET
+            purchases = purchases + excluded.purchases,
+            units = units + excluded.units,
+            revenue = revenue + excluded.revenue
+    """, {'end': end, 'days': f"-{days} days"})
+    conn.commit()
+
+
+def benchmark_forecasting(products=100_000, days=730, runs=3):
+    """Time the forecasting batch job over products x days of sales history"""
+    from src.database import forecasting
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(copy_database(tmp))
+        migrate(conn)
+        seed_data.generate_synthetic_data(conn, products=products, customers=0, purchases=0, movements=0)
+        add_synthetic_daily_sales(conn, days)
+        samples = []
+        for run in range(runs):
+            summary = forecasting.run_forecast(conn, as_of="2024-12-31", apply=run == runs - 1)
+            samples.append(summary['seconds'])
+        results[f"{products // 1000}k x {days} days"] = summarize(samples)
+        conn.close()
+    return results
+
+
+def benchmark_stock_ledger(products=10_000, movements=2_000_000, runs=10):
+    """Time stock levels from the whole ledger against the latest snapshot plus the tail"""
+    from src.database import stock_ledger
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(copy_database(tmp))
+        migrate(conn)
+        seed_data.generate_synthetic_data(conn, products=products, customers=1_000, purchases=0,
+                                          movements=movements, start="2023-01-01", end="2024-12-31")
+        start = time.perf_counter()
+        stock_ledger.take_snapshots(conn, "2024-11-30")
+        results["take snapshots"] = summarize([time.perf_counter() - start])
+        if stock_ledger.check_stock_ledger(conn, replay=True) or \
+                stock_ledger.stock_levels(conn, "2024-12-15") != stock_ledger.replay_stock_levels(conn, "2024-12-15"):
+            raise AssertionError("stock snapshots disagree with the ledger")
+
+        product_ids = [row[0] for row in conn.execute("SELECT id FROM products ORDER BY id DESC LIMIT 100")]
+        cases = {
+            "replay catalog": lambda: stock_ledger.replay_stock_levels(conn),
+            "snapshot catalog": lambda: stock_ledger.stock_levels(conn),
+            "replay check": lambda: stock_ledger.check_stock_ledger(conn, replay=True),
+            "snapshot check": lambda: stock_ledger.check_stock_ledger(conn),
+            "replay 100 products": lambda: [conn.execute(
+                "SELECT SUM(quantity_change) FROM stock_movements WHERE product_id = ?", (product_id,)
+            ).fetchone() for product_id in product_ids],
+            "snapshot 100 products": lambda: [stock_ledger.stock_level(conn, product_id) for product_id in product_ids],
+        }
+        for name, work in cases.items():
+            samples = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                work()
+                samples.append(time.perf_counter() - start)
+            results[name] = summarize(samples)
+        conn.close()
+    return results
+
+
+def benchmark_inventory_as_of(products=100_000, movements=1_000_000, runs=10):
+    """Time month-end and mid-month inventory valuation from the monthly checkpoints against a replay"""
+    from src.database import stock_ledger
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(copy_database(tmp))
+        migrate(conn)
+        seed_data.generate_synthetic_data(conn, products=products, customers=1_000, purchases=0,
+                                          movements=movements, start="2023-01-01", end="2024-12-31")
+        start = time.perf_counter()
+        stock_ledger.close_months(conn, "2024-11-30")
+        results["close 24 months"] = summarize([time.perf_counter() - start])
+
+        def replay_valuation(day):
+            return conn.execute("""
+                SELECT COUNT(*), SUM(m.quantity * p.price)
+                FROM (
+                    SELECT product_id, SUM(quantity_change) AS quantity
+                    FROM stock_movements WHERE date <= ? GROUP BY product_id
+                ) m
+                JOIN products p ON p.id = m.product_id
+                WHERE m.quantity != 0
+            """, (day,)).fetchone()
+
+        for day in ("2024-06-30", "2024-12-15"):
+            levels = {row[0]: row[3] for row in stock_ledger.inventory_as_of(conn, day)}
+            if levels != stock_ledger.replay_stock_levels(conn, day):
+                raise AssertionError(f"inventory as of {day} disagrees with the ledger")
+
+        cases = {
+            "replay valuation 2024-06-30": lambda: replay_valuation("2024-06-30"),
+            "month-end valuation 2024-06-30": lambda: stock_ledger.inventory_valuation(conn, "2024-06-30"),
+            "month-end rows 2024-06-30": lambda: stock_ledger.inventory_as_of(conn, "2024-06-30"),
+            "mid-month valuation 2024-12-15 12:00": lambda: stock_ledger.inventory_valuation(conn, "2024-12-15 12:00:00"),
+        }
+        for name, work in cases.items():
+            samples = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                work()
+                samples.append(time.perf_counter() - start)
+            results[name] = summarize(samples)
+        conn.close()
+    return results
+
+
+def year_over_year_from_details(conn, year):
+    """The year over year report computed straight from purchase_details"""
+    return conn.execute("""
+        SELECT strftime('%m', p.created_at),
+               SUM(CASE WHEN p.created_at >= :start THEN d.total_price ELSE 0 END),
+               SUM(CASE WHEN p.created_at < :start THEN d.total_price ELSE 0 END)
+        FROM purchase_details d
+        JOIN purchases p ON p.id = d.purchase_id
+        WHERE p.created_at >= :previous AND p.created_at < :end
+        GROUP BY 1
+        ORDER BY 1
+    """, {'start': f"{year}-01-01", 'previous': f"{year - 1}-01-01", 'end': f"{year + 1}-01-01"}).fetchall()
+
+
+def benchmark_sales_reports(purchases=250_000, runs=10):
+    """Time the sales reports over purchase_details against the daily rollups
+
+    With four lines per purchase the default is a million detail rows over
+    two years.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(copy_database(tmp))
+        migrate(conn)
+        seed_data.generate_synthetic_data(conn, products=5_000, customers=0, purchases=0, movements=0)
+        conn.execute("UPDATE products SET cost_price = ROUND(price * 0.6, 2) WHERE cost_price IS NULL")
+        add_synthetic_purchases(conn, purchases, years=(2023, 2024))
+        sales_analytics.rebuild_sales_rollups(conn.cursor())
+        conn.commit()
+        mismatches = sales_analytics.check_sales_rollups(conn)
+        if mismatches:
+            raise AssertionError(f"sales rollups out of date: {mismatches[:5]}")
+
+        reports = {
+            "yoy details": lambda: year_over_year_from_details(conn, 2024),
+            "yoy rollups": lambda: sales_analytics.year_over_year(conn, 2024),
+            "weekly details": lambda: sales_analytics.sales_by_period_from_details(conn, 'week', "2024-01-01", "2024-12-31"),
+            "weekly rollups": lambda: sales_analytics.sales_by_period(conn, 'week', "2024-01-01", "2024-12-31"),
+            "top products": lambda: sales_analytics.sales_by_product(conn, "2024-01-01", "2024-12-31", limit=20),
+            "by category": lambda: sales_analytics.sales_by_category(conn, "2024-01-01", "2024-12-31"),
+        }
+        for name, report in reports.items():
+            samples = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                report()
+                samples.append(time.perf_counter() - start)
+            results[name] = summarize(samples)
+        conn.close()
+    return results
+
+
+def print_results(title, results):
+    """Print one benchmark's results as a table"""
+    width = max([20] + [len(name) + 2 for name in results])
+    print(f"\n{title}")
+    print(f"{'configuration':<{width}}{'runs':>6}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for name, stats in results.items():
+        print(
+            f"{name:<{width}}{stats['runs']:>6}{stats['mean_ms']:>10.2f}{stats['p50_ms']:>10.2f}"
+            f"{stats['p95_ms']:>10.2f}{stats['max_ms']:>10.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the database benchmarks")
+    parser.add_argument("--runs", type=int, default=200, help="iterations per measurement")
+    parser.add_argument("--products", type=int, default=100_000, help="catalog size for the search benchmark")
+    args = parser.parse_args()
+
+    print_results("Checkout commit latency", benchmark_checkout_commit(runs=args.runs))
+
+    print_results("Checkout commit by cart size (till profile)", benchmark_cart_sizes(runs=max(5, args.runs // 4)))
+
+    print_results(
+        "Purchase history load (50k purchases)",
+        benchmark_purchase_history(runs=max(1, args.runs // 40)),
+    )
+
+    print_results(
+        f"Dashboard load ({args.products} products)",
+        benchmark_dashboard_load(products=args.products, runs=max(5, args.runs // 10)),
+    )
+
+    print_results(
+        "Catalog snapshot against SQL (1M products)",
+        benchmark_catalog_snapshot(runs=max(5, args.runs // 20)),
+    )
+
+    print_results(
+        "Forecasting batch job (100k products x 2 years)",
+        benchmark_forecasting(),
+    )
+
+    print_results(
+        "Stock ledger levels (10k products, 2M movements)",
+        benchmark_stock_ledger(runs=max(3, args.runs // 20)),
+    )
+
+    print_results(
+        "Inventory as of a date (100k products, 1M movements)",
+        benchmark_inventory_as_of(runs=max(3, args.runs // 20)),
+    )
+
+    print_results(
+        "Sales reports (1M purchase lines)",
+        benchmark_sales_reports(runs=max(3, args.runs // 20)),
+    )
+
+    search = benchmark_type_ahead_search(products=args.products)
+    print_results("Type-ahead search latency (per keystroke)", search)
+    for name, stats in search.items():
+        verdict = "within" if stats["within_budget"] else "OVER"
+        print(f"{name}: p95 {stats['p95_ms']:.2f} ms, {verdict} the {stats['budget_p95_ms']:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""Benchmark suite at several data sizes with a JSON report
+
+For every size the suite builds a private database with
+seed_data.generate_synthetic_data() (size products and purchases, a tenth
+as many customers, size stock movements) and times:
+
+- every named query of query_plans.named_queries()
+- the database functions behind the pages: search, dashboard numbers,
+  purchase history pages, sales reports, forecasting and checkout commit
+- the ProductManager and StockManager methods, through the shared pool
+
+The report holds the environment, the rows generated and the timings of
+every case per size, so two runs can be compared:
+
+    python -m src.database.benchmark_suite --sizes 10000 100000 1000000 --output report.json
+    python -m src.database.benchmark_suite --sizes 10000 --baseline report.json
+
+With --baseline the suite exits non-zero when a case's median got slower
+than --tolerance times the baseline's (and by at least MIN_SLOWDOWN_MS).
+"""
+import argparse
+import json
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from src.database import checkout, dashboard_data, product_search, purchase_history, sales_analytics
+from src.database.benchmark import copy_database, summarize, print_results
+from src.database.migrations import migrate
+from src.database.query_plans import named_queries
+from src.database.seed_data import generate_synthetic_data
+from src.database.storage_profiles import STORAGE_PROFILES
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+# A case whose median grows more than this many times is a regression
+DEFAULT_TOLERANCE = 1.5
+
+# ... and gets at least this much slower, so sub-millisecond noise is ignored
+MIN_SLOWDOWN_MS = 0.5
+
+# Typed search text, shortest first, as the checkout search sees it
+SEARCH_TERMS = ["h", "ha", "ham", "hammer", "hammer dr", "gen00", "gen0000012"]
+
+
+def build_database(target_dir, size, seed=42):
+    """A migrated copy of the database holding the generated data for one size
+
+    Returns (path, rows generated per table, seconds taken).
+    """
+    path = copy_database(target_dir, f"suite-{size}.db")
+    conn = sqlite3.connect(path)
+    try:
+        migrate(conn)
+        start = time.perf_counter()
+        counts = generate_synthetic_data(
+            conn, products=size, categories=max(10, size // 1000), customers=max(100, size // 10),
+            purchases=size, movements=size, seed=seed,
+        )
+        seconds = time.perf_counter() - start
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+    return path, counts, seconds
+
+
+def timed(work, runs):
+    """summarize() of runs calls of work"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        work()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def query_cases(conn):
+    """{name: work} running each named query with its sample parameters"""
+    return {
+        f"query {name}": (lambda sql=sql, params=params: conn.execute(sql, params).fetchall())
+        for name, (sql, params) in named_queries(conn).items()
+    }
+
+
+def function_cases(conn):
+    """{name: work} for the database functions the pages call"""
+    newest = conn.execute("SELECT MAX(date(created_at)) FROM purchases").fetchone()[0] or "2024-12-31"
+    year = int(newest[:4])
+
+    def search():
+        for term in SEARCH_TERMS:
+            product_search.search_products(conn, term, limit=product_search.TYPE_AHEAD_LIMIT)
+
+    def history_pages():
+        pager = purchase_history.purchases_pager(conn=conn)
+        pager.rows(0, 30)
+        pager.rows(300, 330)
+
+    return {
+        "search type-ahead": search,
+        "search filtered": lambda: product_search.search_products(
+            conn, "drill", stock_status="Low Stock", sort_by="Price (High-Low)"),
+        "dashboard aggregates": lambda: dashboard_data.load_dashboard_data(conn),
+        "dashboard scan": lambda: dashboard_data.load_dashboard_data(conn, use_aggregates=False, use_snapshot=False),
+        "purchase history pages": history_pages,
+        "purchase history count": lambda: purchase_history.purchases_pager(conn=conn).count(),
+        "sales by week": lambda: sales_analytics.sales_by_period(conn, 'week', f"{year}-01-01", f"{year}-12-31"),
+        "sales top products": lambda: sales_analytics.sales_by_product(conn, f"{year}-01-01", f"{year}-12-31", limit=20),
+        "sales year over year": lambda: sales_analytics.year_over_year(conn, year),
+    }
+
+
+def checkout_case(conn, cart_size=5):
+    """Work committing one cart of cart_size products with plenty of stock"""
+    products = conn.execute(
+        "SELECT id, name, price FROM products ORDER BY id DESC LIMIT ?", (cart_size,)
+    ).fetchall()
+    conn.executemany("UPDATE products SET quantity = 1000000 WHERE id = ?", [(row[0],) for row in products])
+    conn.commit()
+    items = [{'id': product_id, 'name': name, 'price': price, 'quantity': 1} for product_id, name, price in products]
+    return lambda: checkout.commit_cart(conn, "Benchmark Buyer", items)
+
+
+def manager_cases():
+    """{name: work} for the manager methods, which read through the shared pool
+
+    The managers live with their pages, which need customtkinter; without it
+    the cases are skipped and the reason is returned instead.
+    """
+    try:
+        from src.pages.product.product_manager import ProductManager
+        from src.pages.stock.stock_manager import StockManager
+    except ImportError as err:
+        return {}, str(err)
+
+    products, stock = ProductManager(), StockManager()
+    return {
+        "ProductManager.search_products": lambda: products.search_products("drill"),
+        "ProductManager.products_pager": lambda: products.products_pager(sort='Price').rows(0, 100),
+        "ProductManager.purchases_pager": lambda: products.purchases_pager().rows(0, 30),
+        "StockManager.get_low_stock_products": stock.get_low_stock_products,
+        "StockManager.movements_pager": lambda: stock.movements_pager().rows(0, 30),
+        "StockManager.get_reorder_suggestions": lambda: stock.get_reorder_suggestions(50),
+    }, None
+
+
+def run_size(size, runs=20, seed=42):
+    """Build the database for one size and time every case, returns its report entry"""
+    from src.database import forecasting
+    from src.database.db_config import pool
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path, counts, build_seconds = build_database(tmp, size, seed)
+        conn = sqlite3.connect(path)
+        for pragma, value in STORAGE_PROFILES["till"].items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        results, skipped = {}, {}
+        try:
+            for name, work in {**query_cases(conn), **function_cases(conn)}.items():
+                results[name] = timed(work, runs)
+            newest = conn.execute("SELECT MAX(date(created_at)) FROM purchases").fetchone()[0]
+            results["forecast batch"] = timed(lambda: forecasting.run_forecast(conn, as_of=newest), max(1, runs // 10))
+            results["checkout commit"] = timed(checkout_case(conn), runs)
+
+            pool.db_file = path
+            pool.close_all()
+            cases, reason = manager_cases()
+            if reason:
+                skipped["managers"] = reason
+            for name, work in cases.items():
+                results[name] = timed(work, runs)
+        finally:
+            pool.close_all()
+            conn.close()
+    return {
+        'rows': counts,
+        'build_seconds': round(build_seconds, 3),
+        'results': results,
+        'skipped': skipped,
+    }
+
+
+def run_suite(sizes=DEFAULT_SIZES, runs=20, seed=42):
+    """Run every size, returns the JSON-ready report"""
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'runs': runs,
+        'seed': seed,
+        'sizes': {},
+    }
+    for size in sizes:
+        report['sizes'][str(size)] = run_size(size, runs, seed)
+    return report
+
+
+def compare_reports(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """[(size, case, baseline p50 ms, p50 ms)] of the cases slower than tolerance x baseline"""
+    regressions = []
+    for size, entry in report['sizes'].items():
+        previous = baseline.get('sizes', {}).get(size, {}).get('results', {})
+        for name, stats in entry['results'].items():
+            before, after = previous.get(name, {}).get('p50_ms'), stats['p50_ms']
+            if before is not None and after > before * tolerance and after - before >= MIN_SLOWDOWN_MS:
+                regressions.append((size, name, before, after))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the queries and managers at several data sizes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="products and purchases generated per run")
+    parser.add_argument("--runs", type=int, default=20, help="iterations per case")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown of a case's median against the baseline")
+    args = parser.parse_args()
+
+    report = run_suite(args.sizes, args.runs, args.seed)
+    for size, entry in report['sizes'].items():
+        rows = ", ".join(f"{count} {table}" for table, count in entry['rows'].items())
+        print_results(f"{size} rows ({rows}, built in {entry['build_seconds']:.1f}s)", entry['results'])
+        for name, reason in entry['skipped'].items():
+            print(f"skipped {name}: {reason}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_reports(report, json.load(f), args.tolerance)
+        for size, name, before, after in regressions:
+            print(f"REGRESSION {size} {name}: p50 {before:.2f} ms -> {after:.2f} ms")
+        if regressions:
+            sys.exit(1)
+        print(f"No case slower than {args.tolerance}x the baseline")
+
+
+if __name__ == "__main__":
+    main()
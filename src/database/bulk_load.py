@@ -0,0 +1,167 @@
+"""Bulk loading for seeding and imports
+
+Inserting rows one statement at a time pays for every secondary index,
+every trigger and an fsync per commit. BulkLoader takes those costs out of
+the load and pays them once at the end:
+
+- the secondary indexes of the loaded tables are dropped and created again
+  afterwards, a sorted build instead of millions of random B-tree inserts
+- the products_fts and dashboard_aggregates triggers are dropped, and both
+  tables are refilled from products in one pass afterwards
+- the sales rollups get the loaded purchases with one grouped insert each,
+  before their own secondary indexes are built again
+- loaded products with stock and no stock movement get an opening balance
+  in the stock ledger
+- synchronous=OFF and journal_mode=MEMORY hold only while loading, the
+  connection's own settings are put back afterwards
+
+Callers pick the ids (next_id()), so rows of one table can reference rows of
+another without reading anything back:
+
+    with BulkLoader(conn) as loader:
+        first = loader.next_id("purchases")
+        loader.insert("purchases", ["id", "user_id", "total_amount"], purchase_rows)
+        loader.insert("purchase_details", ["purchase_id", "product_id", ...], detail_rows)
+
+Other connections should stay away from the database during a load: they
+would run without the dropped indexes and miss the search and dashboard
+updates until it ends. The product_changes triggers stay, so catalog
+snapshots still see every loaded product.
+"""
+import sqlite3
+
+from src.database.dashboard_data import TRIGGERS as DASHBOARD_TRIGGERS, aggregates_available, rebuild_dashboard_aggregates
+from src.database.product_search import fts_available, rebuild_search_index
+from src.database.sales_analytics import ROLLUPS, record_purchases_from
+from src.database.stock_ledger import record_opening_balances
+
+# Tables whose secondary indexes are dropped during a load
+LOAD_TABLES = ("category", "products", "users", "purchases", "purchase_details", "stock_movements")
+
+# Triggers maintaining tables that are refilled in one pass after the load
+DEFERRED_TRIGGERS = ("products_fts_insert", "products_fts_update", "products_fts_delete") + tuple(DASHBOARD_TRIGGERS)
+
+# PRAGMAs of the load, the previous values are restored at the end
+LOAD_PRAGMAS = {
+    "synchronous": "OFF",
+    "journal_mode": "MEMORY",
+    "cache_size": -256000,
+}
+
+# Rows per executemany() and per transaction
+BATCH_SIZE = 100_000
+
+
+class BulkLoader:
+    """Context manager for loading many rows into a database nobody else is using"""
+
+    def __init__(self, conn, tables=LOAD_TABLES, batch_size=BATCH_SIZE):
+        self.conn = conn
+        self.tables = tables
+        self.batch_size = batch_size
+        self.counts = {}  # table -> rows inserted
+        self._pragmas = {}
+        self._schema = []  # CREATE statements of the dropped indexes and triggers
+        self._rollup_indexes = []  # ... and of the dropped rollup indexes, built last
+        self._first_purchase = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is not None:
+            self.conn.rollback()
+        self.finish()
+        return False
+
+    def start(self):
+        """Switch to the load PRAGMAs and drop the indexes and deferred triggers"""
+        conn = self.conn
+        conn.commit()
+        for pragma, value in LOAD_PRAGMAS.items():
+            self._pragmas[pragma] = conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+            conn.execute(f"PRAGMA {pragma} = {value}")
+
+        indexes = self._indexes(self.tables)
+        rollup_indexes = self._indexes(tuple(ROLLUPS))
+        triggers = conn.execute(f"""
+            SELECT type, name, sql FROM sqlite_master
+            WHERE type = 'trigger' AND name IN ({", ".join("?" for _ in DEFERRED_TRIGGERS)})
+        """, DEFERRED_TRIGGERS).fetchall()
+        self._first_purchase = self.next_id("purchases")
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for kind, name, sql in indexes + triggers + rollup_indexes:
+                cursor.execute(f"DROP {kind.upper()} IF EXISTS {name}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        self._schema = [sql for _, _, sql in indexes + triggers]
+        self._rollup_indexes = [sql for _, _, sql in rollup_indexes]
+
+    def _indexes(self, tables):
+        """(type, name, sql) of the secondary indexes of the tables"""
+        # sql is NULL for the indexes behind UNIQUE and PRIMARY KEY constraints, they stay
+        return self.conn.execute(f"""
+            SELECT type, name, sql FROM sqlite_master
+            WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({", ".join("?" for _ in tables)})
+        """, tables).fetchall()
+
+    def next_id(self, table):
+        """First free id of a table; rows inserted with ids from here on never collide"""
+        return self.conn.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}").fetchone()[0]
+
+    def insert(self, table, columns, rows):
+        """executemany() rows of the given columns, one transaction per batch, returns the row count"""
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        cursor = self.conn.cursor()
+        count = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                cursor.executemany(sql, batch)
+                self.conn.commit()
+                count += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+            self.conn.commit()
+            count += len(batch)
+        self.counts[table] = self.counts.get(table, 0) + count
+        return count
+
+    def finish(self):
+        """Recreate the indexes and triggers, refill what they maintain and restore the PRAGMAs"""
+        conn = self.conn
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for sql in self._schema:
+                cursor.execute(sql)
+            if fts_available(conn):
+                rebuild_search_index(cursor)
+            if aggregates_available(conn):
+                rebuild_dashboard_aggregates(cursor)
+            if self._first_purchase is not None and \
+                    conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sales_daily'").fetchone():
+                record_purchases_from(cursor, self._first_purchase)
+            for sql in self._rollup_indexes:
+                cursor.execute(sql)
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'stock_movements'").fetchone():
+                record_opening_balances(cursor)
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        finally:
+            for pragma, value in self._pragmas.items():
+                conn.execute(f"PRAGMA {pragma} = {value}")
+        self._schema = []
+        self._rollup_indexes = []
+        self._first_purchase = None
+        conn.execute("PRAGMA optimize")
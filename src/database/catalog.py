@@ -0,0 +1,225 @@
+"""Process-wide cache of the product catalog
+
+The pages read products and categories from `catalog` instead of querying
+them each time they are built. The cache loads everything on first use and
+is then kept current two ways:
+
+- the write paths (ProductManager, StockManager, checkout, the categories
+  page) update it right after they commit, re-reading the rows they
+  touched rather than applying their change, so the update is right
+  whether or not a reload got in between;
+- every read first checks PRAGMA data_version, which changes when another
+  connection or process commits, and reloads the whole catalog if it did.
+
+Run `python -m src.database.catalog` to check, on a copy of the database,
+that a newly opened connection sees what another process committed.
+
+Product rows have the same layout as ProductManager.get_product():
+(id, reference, name, description, price, quantity, min_quantity, category name).
+"""
+import subprocess
+import sys
+import tempfile
+import threading
+
+from src.database.db_config import db_connection
+
+PRODUCT_QUERY = """
+    SELECT p.id, p.reference, p.name, p.description, p.price, p.quantity, p.min_quantity, c.name
+    FROM products p
+    LEFT JOIN category c ON p.category_id = c.id
+"""
+PRODUCT_BY_ID = PRODUCT_QUERY + " WHERE p.id = ?"
+
+# Products left in a category, asked before deleting it
+PRODUCTS_IN_CATEGORY = "SELECT COUNT(*) FROM products WHERE category_id = ?"
+
+# Positions in a product row
+REFERENCE, NAME, PRICE, QUANTITY, MIN_QUANTITY, CATEGORY = 1, 2, 4, 5, 6, 7
+
+
+class CatalogCache:
+    """Products by id and reference, categories by id and name"""
+
+    def __init__(self):
+        self.products = {}  # id -> product row
+        self.product_ids = {}  # reference -> id
+        self.categories = {}  # id -> name
+        self.category_ids = {}  # name -> id
+        self.loaded = False
+        self.generation = 0  # Bumped on every change, lets readers skip unchanged data
+        # data_version is only comparable within one connection, so the last
+        # value is kept per pooled connection (one per thread); a connection
+        # without one has no baseline and always reloads
+        self._data_versions = {}
+        self._lock = threading.RLock()
+
+    def refresh(self):
+        """Load the catalog, or reload it when another connection committed since the last look"""
+        with db_connection() as conn:
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            with self._lock:
+                # A connection opened after the last load already counts the
+                # commits made since in its first data_version, so it can only
+                # trust the catalog after loading it once
+                if not self.loaded or self._data_versions.get(conn) != version:
+                    self._load(conn)
+                    # The other connections keep their baselines, forget the closed ones
+                    self._data_versions = {c: v for c, v in self._data_versions.items() if c.pool is not None}
+                self._data_versions[conn] = version
+        return self
+
+    def _load(self, conn):
+        rows = conn.execute(PRODUCT_QUERY).fetchall()
+        categories = conn.execute("SELECT id, name FROM category").fetchall()
+        self.products = {row[0]: row for row in rows}
+        self.product_ids = {row[REFERENCE]: row[0] for row in rows}
+        self.categories = dict(categories)
+        self.category_ids = {name: category_id for category_id, name in categories}
+        self.loaded = True
+        self.generation += 1
+
+    def invalidate(self):
+        """Drop everything, the next read reloads from the database"""
+        with self._lock:
+            self.loaded = False
+            self._data_versions = {}
+
+    # Reads
+
+    def get_product(self, product_id):
+        return self.refresh().products.get(product_id)
+
+    def product_id(self, reference):
+        """Id of the product with this SKU, None when there is none"""
+        return self.refresh().product_ids.get(reference)
+
+    def all_products(self, sort_index=0):
+        """Every product row, ordered by one row position (id by default)"""
+        products = self.refresh().products.values()
+        return sorted(products, key=lambda row: (row[sort_index] is not None, row[sort_index], row[0]))
+
+    def category_id(self, name):
+        return self.refresh().category_ids.get(name)
+
+    def category_list(self):
+        """[(id, name)] ordered by name"""
+        return sorted(self.refresh().categories.items(), key=lambda item: item[1])
+
+    # Write-through, called after the change is committed
+
+    def put_product(self, conn, product_id):
+        """Re-read one product after it was created or edited"""
+        self.put_products(conn, [product_id])
+
+    def put_products(self, conn, product_ids):
+        """Re-read products after they were created, edited or their stock moved"""
+        if not self.loaded:
+            return
+        rows = {product_id: conn.execute(PRODUCT_BY_ID, (product_id,)).fetchone() for product_id in product_ids}
+        with self._lock:
+            for product_id, row in rows.items():
+                old = self.products.pop(product_id, None)
+                if old and self.product_ids.get(old[REFERENCE]) == product_id:
+                    del self.product_ids[old[REFERENCE]]
+                if row:
+                    self.products[product_id] = row
+                    self.product_ids[row[REFERENCE]] = product_id
+            self.generation += 1
+
+    def remove_product(self, product_id):
+        with self._lock:
+            row = self.products.pop(product_id, None)
+            if row:
+                self.product_ids.pop(row[REFERENCE], None)
+                self.generation += 1
+
+    def put_category(self, category_id, name):
+        """Record a created or renamed category, renaming it in the product rows too"""
+        if not self.loaded:
+            return
+        with self._lock:
+            old_name = self.categories.get(category_id)
+            if old_name is not None:
+                self.category_ids.pop(old_name, None)
+                self._rename_category(old_name, name)
+            self.categories[category_id] = name
+            self.category_ids[name] = category_id
+            self.generation += 1
+
+    def remove_category(self, category_id):
+        with self._lock:
+            name = self.categories.pop(category_id, None)
+            if name is not None:
+                self.category_ids.pop(name, None)
+                self._rename_category(name, None)
+                self.generation += 1
+
+    def _rename_category(self, old_name, new_name):
+        for product_id, row in self.products.items():
+            if row[CATEGORY] == old_name:
+                self.products[product_id] = row[:CATEGORY] + (new_name,) + row[CATEGORY + 1:]
+
+
+# The cache shared by every page
+catalog = CatalogCache()
+
+
+def check_new_connection_refresh():
+    """
+    Commit a rename from another process after the catalog was loaded and
+    read it through a new thread's connection and through a reopened one
+
+    Runs on a copy of the database; returns the reads that missed the rename.
+    """
+    from src.database.benchmark import copy_database
+    from src.database.db_config import pool
+
+    db_file = pool.db_file
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = copy_database(tmp, "catalog-check.db")
+        pool.db_file = path
+        pool.close_all()
+        try:
+            cache = CatalogCache()
+            product_id = min(cache.refresh().products)
+            for label, read in [
+                ("new thread", lambda: _in_thread(cache.get_product, product_id)),
+                ("reopened connection", lambda: (pool.close_all(), cache.get_product(product_id))[1]),
+            ]:
+                name = f"Renamed for the {label} check"
+                subprocess.run([sys.executable, "-c", (
+                    "import sqlite3, sys; conn = sqlite3.connect(sys.argv[1]); "
+                    "conn.execute('UPDATE products SET name = ? WHERE id = ?', (sys.argv[2], int(sys.argv[3]))); "
+                    "conn.commit()"
+                ), path, name, str(product_id)], check=True)
+                row = read()
+                if row is None or row[NAME] != name:
+                    problems.append((label, name, row and row[NAME]))
+        finally:
+            pool.close_all()
+            pool.db_file = db_file
+    return problems
+
+
+def _in_thread(work, *args):
+    """work(*args) run on a new thread, so through a newly opened pooled connection"""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(work(*args)))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def main():
+    problems = check_new_connection_refresh()
+    for label, expected, seen in problems:
+        print(f"{label}: expected {expected!r}, catalog has {seen!r}")
+    if problems:
+        sys.exit(1)
+    print("New and reopened connections see commits made by another process")
+
+
+if __name__ == "__main__":
+    main()
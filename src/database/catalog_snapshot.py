@@ -0,0 +1,239 @@
+"""Columnar NumPy copy of the product catalog
+
+CatalogSnapshot holds one array per products column (id, price, quantity,
+min_quantity and a dictionary-encoded category), ordered by id, so
+inventory value, stock status buckets, per-category counts and low stock
+selections are single vectorized passes instead of SQL scans or Python
+loops over rows.
+
+The first refresh() loads every product. Later ones read the
+product_changes log, filled by triggers on products, and re-read only the
+products changed since the last refresh. When the log was pruned past the
+snapshot's position the snapshot loads everything again.
+"""
+import json
+import threading
+
+import numpy as np
+
+# Entries of product_changes kept by prune_product_changes()
+PRODUCT_CHANGES_KEPT = 100_000
+
+# Rows read per fetchmany() on a full load
+LOAD_BATCH = 50_000
+
+SNAPSHOT_COLUMNS = "p.id, p.price, p.quantity, p.min_quantity, COALESCE(p.category_id, 0)"
+
+# Low stock groups, in report order
+OUT_OF_STOCK, LOW_STOCK, OTHER = 1, 2, 3
+
+
+def prune_product_changes(conn, keep=PRODUCT_CHANGES_KEPT):
+    """Delete all but the newest keep entries of the change log"""
+    conn.execute("""
+        DELETE FROM product_changes
+        WHERE seq <= (SELECT seq FROM sqlite_sequence WHERE name = 'product_changes') - ?
+    """, (keep,))
+    conn.commit()
+
+
+def rows_for_ids(conn, ids, columns, joins=""):
+    """Rows of products p (alias p) for the given ids, in the same order, in one query"""
+    return conn.execute(f"""
+        SELECT {columns}
+        FROM json_each(?) j
+        JOIN products p ON p.id = j.value
+        {joins}
+        ORDER BY j.key
+    """, (json.dumps([int(i) for i in ids]),)).fetchall()
+
+
+class CatalogSnapshot:
+    """Product columns as NumPy arrays, kept current from the product_changes log"""
+
+    def __init__(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.price = np.empty(0, dtype=np.float64)
+        self.quantity = np.empty(0, dtype=np.int64)
+        self.min_quantity = np.empty(0, dtype=np.int64)
+        # category_codes index category_keys, which holds category ids (0 for none)
+        self.category_codes = np.empty(0, dtype=np.int32)
+        self.category_keys = np.empty(0, dtype=np.int64)
+        self._category_code_of = {}  # category id -> code
+        self.last_change = None  # seq of the last product_changes entry applied
+        self.loaded = False
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def refresh(self, conn):
+        """Bring the snapshot up to date with the database, returns self
+
+        The log head is read on every call rather than PRAGMA data_version,
+        which does not change for commits made on the same connection.
+        """
+        with self._lock:
+            head = self._log_head(conn)
+            if self.loaded and head <= self.last_change:
+                return self
+            oldest = conn.execute("SELECT MIN(seq) FROM product_changes").fetchone()[0]
+            # Entries after last_change were pruned before this snapshot read them
+            if not self.loaded or oldest is None or oldest > self.last_change + 1:
+                self.load(conn, head)
+            else:
+                changed = [row[0] for row in conn.execute(
+                    "SELECT DISTINCT product_id FROM product_changes WHERE seq > ? AND seq <= ?",
+                    (self.last_change, head),
+                )]
+                self.apply_changes(conn, changed)
+                self.last_change = head
+            # Trim the log now and then, never inside someone else's transaction
+            if oldest is not None and head - oldest > 2 * PRODUCT_CHANGES_KEPT and not conn.in_transaction:
+                prune_product_changes(conn)
+        return self
+
+    def _log_head(self, conn):
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'product_changes'").fetchone()
+        return row[0] if row else 0
+
+    def load(self, conn, head=None):
+        """Read every product into fresh arrays"""
+        with self._lock:
+            head = self._log_head(conn) if head is None else head
+            cursor = conn.execute(f"SELECT {SNAPSHOT_COLUMNS} FROM products p ORDER BY p.id")
+            batches = []
+            while True:
+                rows = cursor.fetchmany(LOAD_BATCH)
+                if not rows:
+                    break
+                batches.append(np.array(rows, dtype=np.float64).reshape(-1, 5))
+            table = np.concatenate(batches) if batches else np.empty((0, 5))
+
+            self.ids = table[:, 0].astype(np.int64)
+            self.price = table[:, 1].copy()
+            self.quantity = table[:, 2].astype(np.int64)
+            self.min_quantity = table[:, 3].astype(np.int64)
+            self.category_keys, codes = np.unique(table[:, 4].astype(np.int64), return_inverse=True)
+            self.category_codes = codes.astype(np.int32)
+            self._category_code_of = {int(key): code for code, key in enumerate(self.category_keys)}
+            self.last_change = head
+            self.loaded = True
+
+    def _encode_categories(self, category_ids):
+        """Codes of category ids, adding unseen ids to the dictionary"""
+        for key in set(category_ids.tolist()) - set(self._category_code_of):
+            self._category_code_of[key] = len(self.category_keys)
+            self.category_keys = np.append(self.category_keys, key)
+        return np.array([self._category_code_of[key] for key in category_ids.tolist()], dtype=np.int32)
+
+    def apply_changes(self, conn, product_ids):
+        """Re-read the given products: update, insert or drop their rows"""
+        if not product_ids:
+            return
+        rows = rows_for_ids(conn, product_ids, SNAPSHOT_COLUMNS)
+        table = np.array(rows, dtype=np.float64).reshape(-1, 5)
+        present = table[:, 0].astype(np.int64)
+        deleted = np.setdiff1d(np.asarray(product_ids, dtype=np.int64), present)
+
+        with self._lock:
+            positions = np.searchsorted(self.ids, present)
+            known = positions < len(self.ids)
+            known[known] = self.ids[positions[known]] == present[known]
+
+            # Changed rows are overwritten where they are
+            at = positions[known]
+            self.price[at] = table[known, 1]
+            self.quantity[at] = table[known, 2]
+            self.min_quantity[at] = table[known, 3]
+            self.category_codes[at] = self._encode_categories(table[known, 4].astype(np.int64))
+
+            keep = ~np.isin(self.ids, deleted) if len(deleted) else None
+            new = ~known
+            if keep is not None or new.any():
+                columns = [self.ids, self.price, self.quantity, self.min_quantity, self.category_codes]
+                if keep is not None:
+                    columns = [column[keep] for column in columns]
+                if new.any():
+                    added = [
+                        present[new],
+                        table[new, 1],
+                        table[new, 2].astype(np.int64),
+                        table[new, 3].astype(np.int64),
+                        self._encode_categories(table[new, 4].astype(np.int64)),
+                    ]
+                    columns = [np.concatenate((old, extra)) for old, extra in zip(columns, added)]
+                    # New ids are normally above the rest, sort only when they are not
+                    if len(columns[0]) > 1 and not (columns[0][1:] > columns[0][:-1]).all():
+                        order = np.argsort(columns[0], kind='stable')
+                        columns = [column[order] for column in columns]
+                self.ids, self.price, self.quantity, self.min_quantity, self.category_codes = columns
+
+    # Vectorized reads; mask is an optional boolean array selecting products
+
+    def stock_status(self):
+        """Per product 0 low, 1 medium, 2 good (the STOCK_STATUSES buckets)"""
+        return (self.quantity > self.min_quantity).astype(np.int8) + (self.quantity > self.min_quantity * 2)
+
+    def inventory_value(self, mask=None):
+        value = self.price * self.quantity
+        return float(value[mask].sum() if mask is not None else value.sum())
+
+    def stock_status_counts(self, mask=None):
+        """[low, medium, good] product counts"""
+        status = self.stock_status()
+        if mask is not None:
+            status = status[mask]
+        return np.bincount(status, minlength=3).tolist()
+
+    def category_counts(self, mask=None):
+        """{category id (0 for none): product count}"""
+        codes = self.category_codes if mask is None else self.category_codes[mask]
+        counts = np.bincount(codes, minlength=len(self.category_keys))
+        return {int(key): int(count) for key, count in zip(self.category_keys, counts) if count}
+
+    def in_categories(self, category_ids):
+        """Mask of the products in any of the given categories (0 for none)"""
+        codes = [self._category_code_of[key] for key in category_ids if key in self._category_code_of]
+        return np.isin(self.category_codes, codes)
+
+    def below_minimum_ids(self):
+        """Ids of products under their minimum quantity, lowest quantity first"""
+        selected = np.flatnonzero(self.quantity < self.min_quantity)
+        return self.ids[selected[np.argsort(self.quantity[selected], kind='stable')]]
+
+    def low_stock_ids(self, threshold=None):
+        """Ids with quantity <= threshold (default each product's minimum): out of stock, low, then the rest"""
+        limit = self.min_quantity if threshold is None else threshold
+        selected = np.flatnonzero(self.quantity <= limit)
+        quantity = self.quantity[selected]
+        group = np.where(quantity <= 0, OUT_OF_STOCK,
+                         np.where(quantity <= self.min_quantity[selected], LOW_STOCK, OTHER))
+        return self.ids[selected[np.argsort(group, kind='stable')]]
+
+    def restock_quantities(self, target_multiple=2):
+        """(ids, quantities) bringing every low stock product up to target_multiple x its minimum"""
+        shortfall = self.min_quantity * target_multiple - self.quantity
+        low = (self.quantity <= self.min_quantity) & (shortfall > 0)
+        return self.ids[low], shortfall[low]
+
+    def dashboard_data(self, conn):
+        """The load_dashboard_data() numbers computed from the snapshot"""
+        counts = self.category_counts()
+        categories = conn.execute("SELECT id, name FROM category").fetchall()
+        status_counts = self.stock_status_counts()
+        return {
+            'total_products': len(self),
+            'total_value': self.inventory_value(),
+            'low_stock_count': status_counts[0],
+            'category_counts': sorted(
+                ((name, counts.get(category_id, 0)) for category_id, name in categories),
+                key=lambda item: item[1],
+                reverse=True,
+            ),
+            'stock_status_counts': status_counts,
+        }
+
+
+# Shared by the pages and reports of this process
+snapshot = CatalogSnapshot()
@@ -0,0 +1,343 @@
+"""Checkout commit path used by the checkout page
+
+commit_cart() records a whole cart in one BEGIN IMMEDIATE transaction:
+one guarded UPDATE takes the stock for every line and only succeeds when
+each product still has enough, the detail lines go in with executemany
+and are added to the daily sales rollups and the stock ledger, and the
+caller gets a receipt dict back. When another till sold the stock first
+nothing is written and StockConflictError lists the short lines.
+
+Several tills can share one database. A till reserves its cart lines in
+stock_reservations as they are added, so other tills see that stock as
+taken; reservations are released on cancel and lapse RESERVATION_TTL
+seconds after the cart last changed, so a crashed till never holds stock
+for long. reserve_line() changes one line of a cart as it is scanned,
+reserve_cart() makes the reservations match a whole cart at once.
+Loyalty points and totals are incremented in SQL, never written back from
+values read earlier.
+"""
+import os
+import socket
+import sqlite3
+import time
+
+from src.database.sales_analytics import record_purchase
+from src.database.stock_ledger import record_sale
+
+# Loyalty points earned per $100 spent
+POINTS_PER_100 = 10
+
+# Seconds a cart keeps its reserved stock after the last change
+RESERVATION_TTL = 15 * 60
+
+# Identifies this process's reservations
+TILL_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Stock of a product held by other tills' live reservations; uses the
+# :till and :now named parameters
+RESERVED_BY_OTHERS = """
+    (SELECT COALESCE(SUM(r.quantity), 0) FROM stock_reservations r
+     WHERE r.product_id = {product} AND r.till_id != :till AND r.expires_at > :now)
+"""
+
+# The buyer's account, created on their first purchase
+USER_BY_NAME = "SELECT id FROM users WHERE name = ?"
+
+
+class StockConflictError(Exception):
+    """Raised when cart lines ask for more stock than is left at commit time"""
+
+    def __init__(self, conflicts):
+        self.conflicts = conflicts  # [{'id', 'name', 'requested', 'available'}]
+        lines = ", ".join(
+            f"{c['name']} ({c['available']} left, {c['requested']} requested)" for c in conflicts
+        )
+        super().__init__(f"Not enough stock for: {lines}")
+
+
+def create_reservations_table(cursor):
+    """Create stock_reservations (used by the migrations)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stock_reservations (
+            till_id TEXT NOT NULL,
+            product_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL CHECK (quantity > 0),
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (till_id, product_id),
+            FOREIGN KEY (product_id) REFERENCES products (id)
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_stock_reservations_product
+        ON stock_reservations (product_id, expires_at)
+    """)
+
+
+def merge_lines(items):
+    """Combine cart items by product id into [(product_id, name, quantity, unit_price)]"""
+    merged = {}
+    for item in items:
+        if item['id'] in merged:
+            product_id, name, quantity, price = merged[item['id']]
+            merged[item['id']] = (product_id, name, quantity + item['quantity'], price)
+        else:
+            merged[item['id']] = (item['id'], item['name'], item['quantity'], item['price'])
+    return list(merged.values())
+
+
+def points_for(amount):
+    """Loyalty points earned by a purchase of this amount"""
+    return int((amount / 100) * POINTS_PER_100)
+
+
+def _load_cart(cursor, lines):
+    """Put (product_id, quantity) of the lines into the keyed temp.checkout_cart table"""
+    cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS checkout_cart (
+            product_id INTEGER PRIMARY KEY,
+            quantity INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("DELETE FROM temp.checkout_cart")
+    cursor.executemany(
+        "INSERT INTO temp.checkout_cart (product_id, quantity) VALUES (?, ?)",
+        [(product_id, quantity) for product_id, _, quantity, _ in lines],
+    )
+
+
+def _find_conflicts(cursor, lines, till_id, now):
+    """Cart lines whose product is gone or has less unreserved stock than requested"""
+    reserved = RESERVED_BY_OTHERS.format(product='c.product_id')
+    cursor.execute(f"""
+        SELECT c.product_id, p.name, c.quantity, MAX(COALESCE(p.quantity, 0) - {reserved}, 0)
+        FROM temp.checkout_cart c
+        LEFT JOIN products p ON p.id = c.product_id
+        WHERE p.id IS NULL OR p.quantity - {reserved} < c.quantity
+    """, {'till': till_id, 'now': now})
+    names = {product_id: name for product_id, name, _, _ in lines}
+    return [
+        {'id': product_id, 'name': name or names[product_id],
+         'requested': requested, 'available': available}
+        for product_id, name, requested, available in cursor.fetchall()
+    ]
+
+
+def reserve_cart(conn, items, till_id=TILL_ID, ttl=RESERVATION_TTL, now=None):
+    """
+    Make the till's reservations match a cart, all lines or none
+
+    Every line's expiry is pushed back to ttl seconds from now.
+
+    Raises:
+        StockConflictError: Sales and other tills leave too little for a
+        line; the previous reservations are kept
+    """
+    lines = merge_lines(items)
+    now = time.time() if now is None else now
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("DELETE FROM stock_reservations WHERE expires_at <= ?", (now,))
+        _load_cart(cursor, lines)
+        conflicts = _find_conflicts(cursor, lines, till_id, now)
+        if conflicts:
+            conn.rollback()
+            raise StockConflictError(conflicts)
+
+        cursor.execute("DELETE FROM stock_reservations WHERE till_id = ?", (till_id,))
+        cursor.execute("""
+            INSERT INTO stock_reservations (till_id, product_id, quantity, expires_at)
+            SELECT ?, product_id, quantity, ? FROM temp.checkout_cart WHERE quantity > 0
+        """, (till_id, now + ttl))
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+
+def reserve_line(conn, product_id, quantity, name=None, till_id=TILL_ID,
+                 ttl=RESERVATION_TTL, now=None):
+    """
+    Set the till's reservation of one product to quantity, 0 releases it
+
+    The cart's other reservations are kept and their expiry pushed back
+    like reserve_cart() does, without checking or rewriting them, so a
+    scan costs the same however long the cart already is.
+
+    Raises:
+        StockConflictError: Sales and other tills leave too little of the
+        product; the previous reservations are kept
+    """
+    now = time.time() if now is None else now
+    params = {'product': product_id, 'till': till_id, 'now': now}
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("DELETE FROM stock_reservations WHERE expires_at <= ?", (now,))
+        if quantity > 0:
+            cursor.execute(f"""
+                SELECT p.name, MAX(p.quantity - {RESERVED_BY_OTHERS.format(product='p.id')}, 0)
+                FROM products p WHERE p.id = :product
+            """, params)
+            row = cursor.fetchone()
+            if row is None or row[1] < quantity:
+                conn.rollback()
+                raise StockConflictError([{
+                    'id': product_id, 'name': row[0] if row else name,
+                    'requested': quantity, 'available': row[1] if row else 0,
+                }])
+            cursor.execute("""
+                INSERT INTO stock_reservations (till_id, product_id, quantity, expires_at)
+                VALUES (:till, :product, :quantity, :expires)
+                ON CONFLICT (till_id, product_id) DO UPDATE SET quantity = excluded.quantity
+            """, dict(params, quantity=quantity, expires=now + ttl))
+        else:
+            cursor.execute("""
+                DELETE FROM stock_reservations WHERE till_id = :till AND product_id = :product
+            """, params)
+        cursor.execute(
+            "UPDATE stock_reservations SET expires_at = ? WHERE till_id = ?", (now + ttl, till_id)
+        )
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+
+def release_stock(conn, product_id=None, till_id=TILL_ID):
+    """Drop the till's reservation of one product, or all of them"""
+    if product_id is None:
+        conn.execute("DELETE FROM stock_reservations WHERE till_id = ?", (till_id,))
+    else:
+        conn.execute("""
+            DELETE FROM stock_reservations WHERE till_id = ? AND product_id = ?
+        """, (till_id, product_id))
+    conn.commit()
+
+
+def available_stock(conn, product_ids, till_id=TILL_ID, now=None):
+    """{product id: stock not reserved by other tills} for the given products"""
+    params = {'till': till_id, 'now': time.time() if now is None else now}
+    params.update({f"p{i}": product_id for i, product_id in enumerate(product_ids)})
+    placeholders = ", ".join(f":p{i}" for i in range(len(product_ids)))
+    cursor = conn.execute(f"""
+        SELECT p.id, p.quantity - {RESERVED_BY_OTHERS.format(product='p.id')}
+        FROM products p
+        WHERE p.id IN ({placeholders})
+    """, params)
+    return dict(cursor.fetchall())
+
+
+def commit_cart(conn, buyer, items, created_by=1, till_id=TILL_ID, now=None):
+    """
+    Record a purchase, take its stock and credit the buyer's loyalty points
+
+    Args:
+        conn: Open database connection, not inside a transaction
+        buyer (str): Buyer name, a user is created if none has it
+        items (list): Cart items as dicts with id, name, price and quantity
+        created_by (int): Admin recording the sale
+        till_id (str): Till whose reservations the cart may use
+
+    Returns:
+        dict: Receipt with purchase_id, user_id, buyer, lines, total_amount,
+        points_earned and total_points
+
+    Raises:
+        StockConflictError: A line asks for more than is in stock and not
+        reserved by another till; nothing is written
+    """
+    lines = merge_lines(items)
+    if not lines:
+        raise ValueError("Cart is empty")
+    total_amount = sum(quantity * price for _, _, quantity, price in lines)
+    points_earned = points_for(total_amount)
+    now = time.time() if now is None else now
+
+    cursor = conn.cursor()
+    try:
+        # Take the write lock up front so the stock check and the writes see
+        # the same database as every other till
+        cursor.execute("BEGIN IMMEDIATE")
+        _load_cart(cursor, lines)
+
+        # Take the stock for every line, each row only when enough is left
+        # once other tills' reservations are set aside
+        cursor.execute(f"""
+            UPDATE products
+            SET quantity = quantity - (
+                SELECT c.quantity FROM temp.checkout_cart c WHERE c.product_id = products.id
+            )
+            WHERE id IN (SELECT product_id FROM temp.checkout_cart)
+              AND quantity - {RESERVED_BY_OTHERS.format(product='products.id')}
+                  >= (SELECT c.quantity FROM temp.checkout_cart c WHERE c.product_id = products.id)
+        """, {'till': till_id, 'now': now})
+        if cursor.rowcount != len(lines):
+            conflicts = _find_conflicts(cursor, lines, till_id, now)
+            conn.rollback()
+            raise StockConflictError(conflicts)
+
+        # The sold lines no longer need holding
+        cursor.execute("""
+            DELETE FROM stock_reservations
+            WHERE till_id = ? AND product_id IN (SELECT product_id FROM temp.checkout_cart)
+        """, (till_id,))
+
+        cursor.execute(USER_BY_NAME, (buyer,))
+        user = cursor.fetchone()
+        if user:
+            user_id = user[0]
+        else:
+            cursor.execute(
+                "INSERT INTO users (name, created_by) VALUES (?, ?)", (buyer, created_by)
+            )
+            user_id = cursor.lastrowid
+
+        # Increment in SQL so concurrent sales to one buyer all count
+        cursor.execute("""
+            UPDATE users
+            SET loyalty_points = COALESCE(loyalty_points, 0) + ?,
+                total_spent = COALESCE(total_spent, 0) + ?
+            WHERE id = ?
+        """, (points_earned, total_amount, user_id))
+        cursor.execute("SELECT loyalty_points FROM users WHERE id = ?", (user_id,))
+        total_points = cursor.fetchone()[0]
+
+        cursor.execute("""
+            INSERT INTO purchases (user_id, total_amount, points_earned, created_by)
+            VALUES (?, ?, ?, ?)
+        """, (user_id, total_amount, points_earned, created_by))
+        purchase_id = cursor.lastrowid
+
+        # unit_cost keeps the cost at the time of sale for the margin reports
+        cursor.executemany("""
+            INSERT INTO purchase_details
+                (purchase_id, product_id, quantity, unit_price, total_price, unit_cost)
+            VALUES (?, ?, ?, ?, ?, (SELECT cost_price FROM products WHERE id = ?))
+        """, [
+            (purchase_id, product_id, quantity, price, quantity * price, product_id)
+            for product_id, _, quantity, price in lines
+        ])
+        record_purchase(cursor, purchase_id)
+        record_sale(cursor, purchase_id)
+
+        conn.commit()
+    except Exception:
+        # Whatever failed, never leave the write lock held
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+
+    return {
+        'purchase_id': purchase_id,
+        'user_id': user_id,
+        'buyer': buyer,
+        'lines': [
+            {'id': product_id, 'name': name, 'quantity': quantity,
+             'price': price, 'total': quantity * price}
+            for product_id, name, quantity, price in lines
+        ],
+        'total_amount': total_amount,
+        'points_earned': points_earned,
+        'total_points': total_points,
+    }
@@ -0,0 +1,115 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Room for every distinct statement the pages issue so compiled statements
+# survive between page refreshes (sqlite3 defaults to 128)
+CACHED_STATEMENTS = 256
+
+
+class PooledConnection(sqlite3.Connection):
+    """SQLite connection whose close() hands it back to its pool"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = None
+        self.checkouts = 0
+
+    def close(self):
+        """Return the connection to its pool instead of closing it"""
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            super().close()
+
+    def discard(self):
+        """Really close the underlying database connection"""
+        self.pool = None
+        super().close()
+
+
+class ConnectionPool:
+    """Keeps one long-lived connection per thread and reuses it for every checkout
+
+    Checkouts nest: the connection is only reset (open transaction rolled
+    back) once the outermost checkout of a thread is released.
+    """
+
+    def __init__(self, db_file, cached_statements=CACHED_STATEMENTS, pragmas=None):
+        self.db_file = db_file
+        self.cached_statements = cached_statements
+        self.pragmas = dict(pragmas or {})
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}  # thread ident -> connection
+
+    def _connect(self):
+        """Open a new connection for the calling thread"""
+        conn = sqlite3.connect(
+            self.db_file,
+            factory=PooledConnection,
+            cached_statements=self.cached_statements,
+            # Each connection is only used by its own thread, but close_all()
+            # may run from another one
+            check_same_thread=False,
+        )
+        conn.pool = self
+        for pragma, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+
+        with self._lock:
+            self._prune_dead_threads()
+            self._connections[threading.get_ident()] = conn
+        return conn
+
+    def _prune_dead_threads(self):
+        """Close connections left behind by threads that have exited"""
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [ident for ident in self._connections if ident not in alive]:
+            self._connections.pop(ident).discard()
+
+    def acquire(self):
+        """Check out the calling thread's connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or conn.pool is None:
+            conn = self._connect()
+            self._local.conn = conn
+        conn.checkouts += 1
+        return conn
+
+    def release(self, conn):
+        """Give a checked-out connection back to the pool"""
+        if conn.checkouts > 0:
+            conn.checkouts -= 1
+        # Like closing a plain connection, drop whatever was not committed
+        if conn.checkouts == 0 and conn.in_transaction:
+            conn.rollback()
+
+    @contextmanager
+    def connection(self):
+        """Context manager checking out the thread's connection
+
+        Uncommitted changes are rolled back if the block raises.
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self.release(conn)
+
+    def configure(self, pragmas):
+        """Replace the PRAGMAs applied to connections and reopen them lazily"""
+        self.pragmas = dict(pragmas)
+        self.close_all()
+
+    def close_all(self):
+        """Close every pooled connection, e.g. when the application exits"""
+        with self._lock:
+            for conn in self._connections.values():
+                conn.discard()
+            self._connections.clear()
+        self._local = threading.local()
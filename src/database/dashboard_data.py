@@ -0,0 +1,192 @@
+"""Dashboard numbers in one read
+
+load_dashboard_data() returns every dashboard KPI (product count,
+inventory value, low stock count, products per category, stock status
+buckets) from one set of per-category rows. The rows come from the
+dashboard_aggregates table when it exists: triggers on products keep one
+row per category up to date, so loading the dashboard reads a handful of
+rows whatever the catalog size. The inventory value is summed in integer
+cents, so the triggers' running sums never drift from a scan of products.
+Without the table (e.g. while a bulk load has dropped it) the numbers come
+from the in-memory catalog snapshot, or from a single GROUP BY pass over
+products.
+"""
+
+# Stock status buckets, in chart order
+STOCK_STATUSES = ['Low Stock', 'Medium Stock', 'Good Stock']
+
+# Low stock table column -> ORDER BY expression
+LOW_STOCK_SORT_COLUMNS = {
+    'SKU': 'p.reference',
+    'Name': 'p.name',
+    'Current Stock': 'p.quantity',
+    'Min Stock': 'p.min_quantity',
+    'Category': "COALESCE(c.name, '')",
+}
+
+# A products row's inventory value in cents ({row} = NEW, OLD or empty)
+_VALUE_CENTS = "CAST(ROUND({row}price * 100) AS INTEGER) * {row}quantity"
+
+# Per-category row (products without a category use key 0):
+# (category key, product count, inventory value in cents, low, medium, good)
+SCAN_QUERY = f"""
+    SELECT COALESCE(category_id, 0),
+           COUNT(*),
+           COALESCE(SUM({_VALUE_CENTS.format(row="")}), 0),
+           COALESCE(SUM(quantity <= min_quantity), 0),
+           COALESCE(SUM(quantity > min_quantity AND quantity <= min_quantity * 2), 0),
+           COALESCE(SUM(quantity > min_quantity * 2), 0)
+    FROM products
+    GROUP BY COALESCE(category_id, 0)
+"""
+AGGREGATES_QUERY = """
+    SELECT category_key, product_count, inventory_cents, low_stock, medium_stock, good_stock
+    FROM dashboard_aggregates
+"""
+
+# Adds ({sign} = +) or removes ({sign} = -) one products row ({row} = NEW or OLD)
+_APPLY_ROW = """
+    INSERT OR IGNORE INTO dashboard_aggregates (category_key) VALUES (COALESCE({row}.category_id, 0));
+    UPDATE dashboard_aggregates
+    SET product_count = product_count {sign} 1,
+        inventory_cents = inventory_cents {sign} {value},
+        low_stock = low_stock {sign} ({row}.quantity <= {row}.min_quantity),
+        medium_stock = medium_stock {sign} ({row}.quantity > {row}.min_quantity AND {row}.quantity <= {row}.min_quantity * 2),
+        good_stock = good_stock {sign} ({row}.quantity > {row}.min_quantity * 2)
+    WHERE category_key = COALESCE({row}.category_id, 0);
+"""
+
+def _apply_row(sign, row):
+    return _APPLY_ROW.format(sign=sign, row=row, value=_VALUE_CENTS.format(row=f"{row}."))
+
+
+TRIGGERS = {
+    "trg_dashboard_aggregates_insert": (
+        "AFTER INSERT ON products",
+        _apply_row("+", "NEW"),
+    ),
+    "trg_dashboard_aggregates_delete": (
+        "AFTER DELETE ON products",
+        _apply_row("-", "OLD"),
+    ),
+    "trg_dashboard_aggregates_update": (
+        "AFTER UPDATE OF price, quantity, min_quantity, category_id ON products",
+        _apply_row("-", "OLD") + _apply_row("+", "NEW"),
+    ),
+}
+
+
+def create_dashboard_aggregates(cursor):
+    """Create and fill dashboard_aggregates and its triggers (used by the migrations)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS dashboard_aggregates (
+            category_key INTEGER PRIMARY KEY,
+            product_count INTEGER NOT NULL DEFAULT 0,
+            inventory_cents INTEGER NOT NULL DEFAULT 0,
+            low_stock INTEGER NOT NULL DEFAULT 0,
+            medium_stock INTEGER NOT NULL DEFAULT 0,
+            good_stock INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    for name, (event, body) in TRIGGERS.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END")
+    rebuild_dashboard_aggregates(cursor)
+
+
+def rebuild_dashboard_aggregates(cursor):
+    """Recompute every aggregate row from products, e.g. after a bulk load"""
+    cursor.execute("DELETE FROM dashboard_aggregates")
+    cursor.execute(f"""
+        INSERT INTO dashboard_aggregates
+            (category_key, product_count, inventory_cents, low_stock, medium_stock, good_stock)
+        {SCAN_QUERY}
+    """)
+
+
+def recreate_dashboard_aggregates(cursor):
+    """Replace dashboard_aggregates and its triggers with the current ones (used by the migrations)"""
+    drop_dashboard_aggregates(cursor)
+    create_dashboard_aggregates(cursor)
+
+
+def drop_dashboard_aggregates(cursor):
+    """Remove the table and its triggers; the dashboard falls back to scanning products"""
+    for name in TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+    cursor.execute("DROP TABLE IF EXISTS dashboard_aggregates")
+
+
+def aggregates_available(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'dashboard_aggregates'"
+    ).fetchone() is not None
+
+
+def load_dashboard_data(conn, use_aggregates=True, use_snapshot=True):
+    """
+    Every dashboard number from one read of per-category rows
+
+    Args:
+        conn: Open database connection
+        use_aggregates (bool): Read dashboard_aggregates when it exists
+        use_snapshot (bool): Otherwise compute the numbers with the
+            catalog snapshot (see src.database.catalog_snapshot); with
+            both False products are scanned
+
+    Returns:
+        dict: total_products, total_value, low_stock_count, category_counts
+        as [(category name, product count)] largest first, and
+        stock_status_counts in STOCK_STATUSES order
+    """
+    if use_aggregates and aggregates_available(conn):
+        query = AGGREGATES_QUERY
+    elif use_snapshot:
+        # NumPy is only imported when the snapshot is needed
+        from src.database.catalog_snapshot import snapshot
+        return snapshot.refresh(conn).dashboard_data(conn)
+    else:
+        query = SCAN_QUERY
+    rows = conn.execute(query).fetchall()
+    categories = conn.execute("SELECT id, name FROM category").fetchall()
+
+    counts = {row[0]: row[1] for row in rows}
+    category_counts = sorted(
+        ((name, counts.get(category_id, 0)) for category_id, name in categories),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    return {
+        'total_products': sum(row[1] for row in rows),
+        'total_value': sum(row[2] for row in rows) / 100,
+        'low_stock_count': sum(row[3] for row in rows),
+        'category_counts': category_counts,
+        'stock_status_counts': [sum(row[i] for row in rows) for i in (3, 4, 5)],
+    }
+
+
+def low_stock_pager(conn=None):
+    """Pager over the products at or below their minimum stock, lowest stock first"""
+    # db_config imports the migrations, which import this module
+    from src.database.paging import KeysetPager
+
+    return KeysetPager(
+        ["p.reference", "p.name", "p.quantity", "p.min_quantity", "c.name"],
+        "products p LEFT JOIN category c ON p.category_id = c.id",
+        where="p.quantity <= p.min_quantity",
+        key="p.id",
+        sort_columns=LOW_STOCK_SORT_COLUMNS,
+        sort='Current Stock',
+        conn=conn,
+    )
+
+
+def check_dashboard_aggregates(conn):
+    """Category keys whose dashboard_aggregates row disagrees with a scan of products"""
+    scanned = {row[0]: row[1:] for row in conn.execute(SCAN_QUERY)}
+    stored = {row[0]: row[1:] for row in conn.execute(AGGREGATES_QUERY) if row[1]}
+    mismatches = []
+    for key in sorted(set(scanned) | set(stored)):
+        expected, actual = scanned.get(key), stored.get(key)
+        if expected != actual:
+            mismatches.append((key, expected, actual))
+    return mismatches
@@ -2,21 +2,45 @@ import sqlite3
 import os
 from tkinter import messagebox
 from pathlib import Path
+from src.database.connection_pool import ConnectionPool
+from src.database.migrations import migrate
+from src.database.saved_carts import import_parked_carts
+from src.database.storage_profiles import STORAGE_PROFILES, DEFAULT_STORAGE_PROFILE, get_storage_profile
 
 # Get the absolute path to the database file
 DB_FILE = os.path.join(Path(__file__).parent.parent.parent, "database.db")
 
+# Process-wide pool handing out one reusable connection per thread;
+# setup_database() switches it to the configured storage profile
+pool = ConnectionPool(DB_FILE, pragmas=STORAGE_PROFILES[DEFAULT_STORAGE_PROFILE])
+
 def get_db_connection():
-    """Get a connection to the SQLite database"""
+    """Get the calling thread's pooled connection; close() returns it to the pool"""
     try:
-        return sqlite3.connect(DB_FILE)
+        return pool.acquire()
     except sqlite3.Error as err:
         messagebox.showerror("Database Error", f"Could not connect to database: {err}")
         return None
 
-def create_tables():
-    """Create all required tables"""
-    conn = get_db_connection()
+def db_connection():
+    """Context manager checking out the calling thread's pooled connection"""
+    return pool.connection()
+
+def set_storage_profile(name=None):
+    """Apply a storage profile to every pooled connection, returns the profile name
+
+    Without a name the STORE_DB_PROFILE environment variable or the default
+    "till" profile is used.
+    """
+    name, pragmas = get_storage_profile(name)
+    pool.configure(pragmas)
+    return name
+
+def create_tables(conn=None):
+    """Create all required tables, on the given connection or the pooled one"""
+    own = conn is None
+    if own:
+        conn = get_db_connection()
     cursor = conn.cursor()
 
     # Create admin table
@@ -111,61 +135,43 @@ def create_tables():
     """, ('admin', 'admin123', 'admin@example.com', 'admin'))
 
     conn.commit()
-    conn.close()
-
-def update_category_table():
-    """Add description column to category table if it doesn't exist"""
-    conn = get_db_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            # Check if description column exists
-            cursor.execute("PRAGMA table_info(category)")
-            columns = [col[1] for col in cursor.fetchall()]
-            
-            if 'description' not in columns:
-                cursor.execute("ALTER TABLE category ADD COLUMN description TEXT")
-                conn.commit()
-                print("Added description column to category table")
-            
-        except sqlite3.Error as err:
-            print(f"Error updating category table: {err}")
-        finally:
-            conn.close()
-
-def setup_database():
+    if own:
+        conn.close()
+
+def setup_database(storage_profile=None):
     """Initialize the database"""
     try:
         # Create database file if it doesn't exist
         conn = sqlite3.connect(DB_FILE)
         conn.close()
         
-        # Create all tables
+        # Tune every pooled connection (WAL, cache, mmap, ...)
+        set_storage_profile(storage_profile)
+        
+        # Create all tables, then bring them up to the latest schema version
         create_tables()
-        update_category_table()
+        with db_connection() as conn:
+            migrate(conn)
+            # Carts the old checkout parked as files, this database's only
+            import_parked_carts(conn)
         
     except Exception as e:
         messagebox.showerror("Database Error", f"Error setting up database: {e}")
 
 def get_stock_alerts():
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT p.reference, p.name, p.quantity, p.min_quantity, c.name as category
-                FROM products p
-                LEFT JOIN category c ON p.category_id = c.id
-                WHERE p.quantity < p.min_quantity
-                ORDER BY p.quantity ASC
-            """)
-            alerts = cursor.fetchall()
-            conn.close()
-            return alerts
-        except sqlite3.Error as err:
-            messagebox.showerror("Database Error", f"Error fetching stock alerts: {err}")
-            return []
-    return []
+    # The snapshot picks and orders the products, NumPy is only imported here
+    from src.database.catalog_snapshot import snapshot, rows_for_ids
+    try:
+        with db_connection() as conn:
+            ids = snapshot.refresh(conn).below_minimum_ids()
+            return rows_for_ids(
+                conn, ids,
+                "p.reference, p.name, p.quantity, p.min_quantity, c.name as category",
+                joins="LEFT JOIN category c ON p.category_id = c.id",
+            )
+    except sqlite3.Error as err:
+        messagebox.showerror("Database Error", f"Error fetching stock alerts: {err}")
+        return []
 
 if __name__ == "__main__":
     setup_database()
@@ -0,0 +1,270 @@
+"""Demand forecasting and reorder points
+
+A batch job that estimates every product's daily demand from the sales
+rollups (see sales_analytics) and turns it into a reorder point and a
+suggested order quantity:
+
+    daily demand    units per day, exponentially smoothed (SMOOTHING) over
+                    the last SMOOTHING_DAYS days, or the long run average
+                    for products with fewer than MIN_SALES_DAYS sales days
+    long run        average units per day over HISTORY_DAYS, read from the
+                    monthly product rollup
+    demand spread   standard deviation of the last MOVING_AVERAGE_DAYS days
+    safety stock    SERVICE_LEVEL_Z x spread x sqrt(lead time)
+    reorder point   daily demand x lead time + safety stock
+    order quantity  enough for lead time + REVIEW_PERIOD_DAYS of demand plus
+                    the safety stock, once stock is at the reorder point
+
+Only the recent daily rows are read into NumPy: older days carry less than
+1/10000 of the smoothing weight, and the long run comes from one row per
+product and month, so two years of history cost about as much as three
+months. All products are computed at once and the results are written to
+product_forecasts in one transaction. With --apply the reorder point also
+replaces min_quantity of every product with at least MIN_SALES_DAYS recent
+sales days, so the low stock reports and the dashboard follow demand
+instead of a hand-entered number. Run it from a scheduler, e.g. nightly:
+
+    python -m src.database.forecasting --apply
+"""
+import argparse
+import sqlite3
+import time
+from datetime import date
+
+DEFAULT_LEAD_TIME_DAYS = 7
+
+# Days of demand an order covers on top of the lead time
+REVIEW_PERIOD_DAYS = 7
+
+# Weight of the newest day in the smoothed demand
+SMOOTHING = 0.1
+
+# Daily rows read for the smoothing, (1 - SMOOTHING)^91 < 0.0001
+SMOOTHING_DAYS = 91
+
+MOVING_AVERAGE_DAYS = 28
+
+HISTORY_DAYS = 730
+
+# z-score of the service level, 1.65 is about 95% of lead times without a stockout
+SERVICE_LEVEL_Z = 1.65
+
+# Products with fewer recent sales days use the long run average and keep
+# their hand-entered min_quantity
+MIN_SALES_DAYS = 5
+
+
+def create_forecast_tables(cursor):
+    """Add products.lead_time_days and the product_forecasts table (used by the migrations)"""
+    cursor.execute("PRAGMA table_info(products)")
+    if 'lead_time_days' not in [col[1] for col in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE products ADD COLUMN lead_time_days INTEGER")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS product_forecasts (
+            product_id INTEGER PRIMARY KEY,
+            daily_demand REAL NOT NULL,
+            moving_average REAL NOT NULL,
+            long_run_average REAL NOT NULL,
+            demand_std REAL NOT NULL,
+            sales_days INTEGER NOT NULL,
+            lead_time_days INTEGER NOT NULL,
+            reorder_point INTEGER NOT NULL,
+            order_quantity INTEGER NOT NULL,
+            computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def forecast_demand(product_index, age, units, product_count,
+                    smoothing=SMOOTHING, window=MOVING_AVERAGE_DAYS):
+    """
+    Demand statistics of every product from sparse daily sales
+
+    Days without a row count as zero sales, so nothing is expanded into a
+    products x days matrix: each statistic is one weighted np.bincount.
+
+    Args:
+        product_index: Row of each sale's product in the result arrays
+        age: Days between each sale and the forecast day (0 = that day)
+        units: Units sold
+        product_count (int): Length of the result arrays
+
+    Returns:
+        dict of arrays: smoothed, moving_average, demand_std and sales_days
+    """
+    import numpy as np
+
+    def per_product(weights):
+        return np.bincount(product_index, weights=weights, minlength=product_count)
+
+    # The smoothed level after the last day is sum(alpha * (1 - alpha)^age * units)
+    smoothed = per_product(smoothing * (1 - smoothing) ** age * units)
+
+    window_units = np.where(age < window, units, 0.0)
+    mean = per_product(window_units) / window
+    variance = per_product(window_units ** 2) / window - mean ** 2
+    return {
+        'smoothed': smoothed,
+        'moving_average': mean,
+        'demand_std': np.sqrt(np.maximum(variance, 0.0)),
+        'sales_days': np.bincount(product_index, minlength=product_count),
+    }
+
+
+def reorder_plan(daily_demand, demand_std, lead_time, quantity,
+                 z=SERVICE_LEVEL_Z, review_days=REVIEW_PERIOD_DAYS):
+    """(reorder point, order quantity) arrays for the given demand, lead times and stock"""
+    import numpy as np
+
+    safety_stock = z * demand_std * np.sqrt(lead_time)
+    reorder_point = np.ceil(daily_demand * lead_time + safety_stock).astype(np.int64)
+    order_up_to = np.ceil(daily_demand * (lead_time + review_days) + safety_stock).astype(np.int64)
+    order_quantity = np.where(quantity <= reorder_point, np.maximum(order_up_to - quantity, 0), 0)
+    return reorder_point, order_quantity
+
+
+def _positions(product_ids, ids):
+    """(row of each id in the sorted product_ids, mask of the ids found there)"""
+    import numpy as np
+
+    if not len(product_ids):
+        return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+    index = np.minimum(np.searchsorted(product_ids, ids), len(product_ids) - 1)
+    return index, product_ids[index] == ids
+
+
+def run_forecast(conn, as_of=None, apply=False, history_days=HISTORY_DAYS,
+                 default_lead_time=DEFAULT_LEAD_TIME_DAYS):
+    """
+    Forecast every product and store the results
+
+    Args:
+        conn: Open database connection, not inside a transaction
+        as_of (str): Last day of history as YYYY-MM-DD, default today
+        apply (bool): Also set min_quantity to the reorder point of the
+            products with at least MIN_SALES_DAYS recent sales days
+        history_days (int): Days of sales behind the long run average
+        default_lead_time (int): Lead time of products without lead_time_days
+
+    Returns:
+        dict: products, sales_rows (recent product-days read), forecast
+        (products with enough recent sales), to_order (products at or
+        under their reorder point), min_quantity_updated and seconds
+    """
+    import numpy as np
+
+    start = time.perf_counter()
+    as_of = as_of or date.today().isoformat()
+    window_days = max(SMOOTHING_DAYS, MOVING_AVERAGE_DAYS)
+
+    products = np.array(conn.execute(
+        "SELECT id, quantity, COALESCE(lead_time_days, ?) FROM products ORDER BY id",
+        (default_lead_time,),
+    ).fetchall(), dtype=np.int64).reshape(-1, 3)
+    product_ids, quantity, lead_time = products[:, 0], products[:, 1], products[:, 2]
+
+    recent = np.array(conn.execute("""
+        SELECT product_id, julianday(:as_of) - julianday(day), units
+        FROM sales_daily_product
+        WHERE day > date(:as_of, :window) AND day <= :as_of
+    """, {'as_of': as_of, 'window': f"-{window_days} days"}).fetchall(), dtype=np.float64).reshape(-1, 3)
+    # Sales of deleted products are dropped
+    index, known = _positions(product_ids, recent[:, 0].astype(np.int64))
+    stats = forecast_demand(index[known], recent[known, 1], recent[known, 2], len(product_ids))
+
+    # Whole months from history_days back up to the month the recent window starts in
+    months = conn.execute("""
+        SELECT date(:as_of, :history, 'start of month'), date(:as_of, :window, 'start of month')
+    """, {'as_of': as_of, 'history': f"-{history_days} days", 'window': f"-{window_days} days"}).fetchone()
+    long_run_days = max((date.fromisoformat(months[1]) - date.fromisoformat(months[0])).days, 1)
+    totals = np.array(conn.execute("""
+        SELECT product_id, SUM(units)
+        FROM sales_monthly_product
+        WHERE month >= ? AND month < ?
+        GROUP BY product_id
+    """, months).fetchall(), dtype=np.float64).reshape(-1, 2)
+    index, known = _positions(product_ids, totals[:, 0].astype(np.int64))
+    long_run = np.zeros(len(product_ids))
+    long_run[index[known]] = totals[known, 1] / long_run_days
+
+    enough_sales = stats['sales_days'] >= MIN_SALES_DAYS
+    daily_demand = np.where(enough_sales, stats['smoothed'], long_run)
+    reorder_point, order_quantity = reorder_plan(daily_demand, stats['demand_std'], lead_time, quantity)
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("DELETE FROM product_forecasts")
+        cursor.executemany("""
+            INSERT INTO product_forecasts
+                (product_id, daily_demand, moving_average, long_run_average, demand_std,
+                 sales_days, lead_time_days, reorder_point, order_quantity)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, zip(
+            product_ids.tolist(), daily_demand.tolist(), stats['moving_average'].tolist(),
+            long_run.tolist(), stats['demand_std'].tolist(), stats['sales_days'].tolist(),
+            lead_time.tolist(), reorder_point.tolist(), order_quantity.tolist(),
+        ))
+        updated = 0
+        if apply:
+            cursor.execute("""
+                UPDATE products
+                SET min_quantity = f.reorder_point
+                FROM product_forecasts f
+                WHERE f.product_id = products.id
+                  AND f.sales_days >= ?
+                  AND products.min_quantity != f.reorder_point
+            """, (MIN_SALES_DAYS,))
+            updated = cursor.rowcount
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+    return {
+        'products': len(product_ids),
+        'sales_rows': len(recent),
+        'forecast': int(enough_sales.sum()),
+        'to_order': int((order_quantity > 0).sum()),
+        'min_quantity_updated': updated,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def reorder_suggestions(conn, limit=None):
+    """[(product id, reference, name, quantity, reorder point, order quantity)] largest order first"""
+    query = """
+        SELECT p.id, p.reference, p.name, p.quantity, f.reorder_point, f.order_quantity
+        FROM product_forecasts f
+        JOIN products p ON p.id = f.product_id
+        WHERE f.order_quantity > 0
+        ORDER BY f.order_quantity DESC
+    """
+    params = ()
+    if limit:
+        query += " LIMIT ?"
+        params = (limit,)
+    return conn.execute(query, params).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Forecast demand and compute reorder points")
+    parser.add_argument("--as-of", help="last day of history (YYYY-MM-DD), default today")
+    parser.add_argument("--apply", action="store_true", help="set min_quantity to the reorder points")
+    parser.add_argument("--history-days", type=int, default=HISTORY_DAYS,
+                        help="days of sales behind the long run average")
+    parser.add_argument("--lead-time", type=int, default=DEFAULT_LEAD_TIME_DAYS,
+                        help="lead time in days of products without one")
+    args = parser.parse_args()
+
+    # db_config imports the migrations, which import this module
+    from src.database.db_config import db_connection
+    with db_connection() as conn:
+        result = run_forecast(conn, args.as_of, args.apply, args.history_days, args.lead_time)
+    print(f"{result['products']} products, {result['sales_rows']} recent product-days of sales, "
+          f"{result['forecast']} with enough sales, {result['to_order']} to order, "
+          f"{result['min_quantity_updated']} minimum quantities updated in {result['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
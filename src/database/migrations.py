@@ -0,0 +1,151 @@
+"""Versioned schema migrations
+
+create_tables() lays down the original schema; every later change is a
+numbered migration recorded in the schema_version table. To change the
+schema append a new (version, description, function) entry to MIGRATIONS,
+never edit one that has already shipped.
+"""
+import sqlite3
+from src.database.product_search import create_search_index
+from src.database.checkout import create_reservations_table
+from src.database.dashboard_data import create_dashboard_aggregates, recreate_dashboard_aggregates
+from src.database.sales_analytics import create_sales_rollups
+from src.database.forecasting import create_forecast_tables
+from src.database.stock_ledger import create_stock_checkpoints, create_stock_ledger, date_sales_by_utc_day
+from src.database.saved_carts import create_saved_carts
+
+
+def _add_category_description(cursor):
+    # Databases created before the column existed in create_tables()
+    cursor.execute("PRAGMA table_info(category)")
+    columns = [col[1] for col in cursor.fetchall()]
+    if 'description' not in columns:
+        cursor.execute("ALTER TABLE category ADD COLUMN description TEXT")
+
+
+def _add_hot_query_indexes(cursor):
+    statements = [
+        # Category filters and per-category counts
+        "CREATE INDEX IF NOT EXISTS idx_products_category ON products (category_id)",
+        # Purchase history lines and per-product sales
+        "CREATE INDEX IF NOT EXISTS idx_purchase_details_purchase ON purchase_details (purchase_id)",
+        "CREATE INDEX IF NOT EXISTS idx_purchase_details_product ON purchase_details (product_id)",
+        # Purchases per customer and by date
+        "CREATE INDEX IF NOT EXISTS idx_purchases_user ON purchases (user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_purchases_created_at ON purchases (created_at)",
+        # Buyer lookup on every checkout
+        "CREATE INDEX IF NOT EXISTS idx_users_name ON users (name)",
+        # Partial index holding only low-stock rows; used by queries whose
+        # WHERE clause contains the same "quantity <= min_quantity" term
+        """CREATE INDEX IF NOT EXISTS idx_products_low_stock ON products (quantity)
+           WHERE quantity <= min_quantity""",
+    ]
+    for statement in statements:
+        cursor.execute(statement)
+
+
+def _add_sort_indexes(cursor):
+    # The product table pages through these orders with (column, id) keysets;
+    # an index on one column is ordered by (column, rowid), which is that key
+    statements = [
+        "CREATE INDEX IF NOT EXISTS idx_products_name ON products (name)",
+        "CREATE INDEX IF NOT EXISTS idx_products_price ON products (price)",
+        "CREATE INDEX IF NOT EXISTS idx_products_quantity ON products (quantity)",
+    ]
+    for statement in statements:
+        cursor.execute(statement)
+
+
+def _add_purchase_date_sort_index(cursor):
+    # The purchase table pages by (COALESCE(created_at, ''), id); created_at
+    # is nullable and a NULL would break the keyset, so the index is on the
+    # same expression
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_purchases_created_at_sort ON purchases (COALESCE(created_at, ''))"
+    )
+
+def _add_product_change_log(cursor):
+    # Ids of products inserted, updated or deleted, in commit order, so
+    # in-memory copies of the catalog (see catalog_snapshot) can re-read just
+    # those rows; AUTOINCREMENT keeps seq increasing even after pruning
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS product_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_id INTEGER NOT NULL
+        )
+    """)
+    bodies = {
+        "insert": "INSERT INTO product_changes (product_id) VALUES (NEW.id);",
+        "delete": "INSERT INTO product_changes (product_id) VALUES (OLD.id);",
+        # An id change removes the old id as well
+        "update": """INSERT INTO product_changes (product_id) VALUES (NEW.id);
+                     INSERT INTO product_changes (product_id) SELECT OLD.id WHERE OLD.id != NEW.id;""",
+    }
+    for event, body in bodies.items():
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_product_changes_{event} AFTER {event.upper()} ON products
+            BEGIN {body} END
+        """)
+
+
+MIGRATIONS = [
+    (1, "Add description column to category", _add_category_description),
+    (2, "Add indexes for the hot query columns", _add_hot_query_indexes),
+    (3, "Add products_fts full-text search table", create_search_index),
+    (4, "Add indexes for the paged product table sorts", _add_sort_indexes),
+    (5, "Add stock_reservations table for multi-till checkout", create_reservations_table),
+    (6, "Add dashboard_aggregates table maintained by triggers", create_dashboard_aggregates),
+    (7, "Add cost columns and daily sales rollup tables", create_sales_rollups),
+    (8, "Add product_changes log maintained by triggers", _add_product_change_log),
+    (9, "Add lead times and the product_forecasts table", create_forecast_tables),
+    (10, "Add the stock_movements ledger and stock_snapshots", create_stock_ledger),
+    (11, "Add monthly stock_checkpoints for stock as of a date", create_stock_checkpoints),
+    (12, "Add saved_cart_items and cart metadata, moving the saved carts in", create_saved_carts),
+    (13, "Date SALE stock movements by the UTC day of their purchase", date_sales_by_utc_day),
+    (14, "Keep the dashboard inventory value in integer cents", recreate_dashboard_aggregates),
+    (15, "Add an index for the purchase table's date order", _add_purchase_date_sort_index),
+]
+
+
+def get_schema_version(conn):
+    """Return the highest applied migration version, 0 for a fresh database"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Apply every pending migration, each in its own transaction
+
+    Returns the list of versions applied.
+    """
+    current = get_schema_version(conn)
+    applied = []
+    for version, description, apply in MIGRATIONS:
+        if version <= current:
+            continue
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            # Another till may have applied it while we waited for the lock
+            cursor.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,))
+            if cursor.fetchone():
+                conn.rollback()
+                continue
+            apply(cursor)
+            cursor.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (version, description),
+            )
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        print(f"Applied migration {version}: {description}")
+        applied.append(version)
+    return applied
@@ -0,0 +1,257 @@
+"""Paged row sources for the virtual tables
+
+A pager answers count() and rows(start, stop) so a table can show any
+window of a result set without loading it all. KeysetPager reads pages
+from the database, ListPager serves rows that are already in memory (for
+example relevance-ranked search results).
+
+Both pagers share the same contract:
+
+- sort_columns names the columns a result may be ordered by; set_sort()
+  takes one of those names (or None) and rejects anything else, so no text
+  from the UI ever reaches an ORDER BY. The pager's sort and reverse
+  attributes say what it is ordered by now.
+- page(cursor, backwards) reads one page from a cursor, the boundary
+  between two rows, and returns the cursors of the previous and next
+  pages with it, for callers that page without a table.
+"""
+import sqlite3
+from collections import OrderedDict, namedtuple
+from contextlib import nullcontext
+
+from src.database.db_config import db_connection
+
+PAGE_SIZE = 100
+
+# Pages kept per pager, enough for a few screens either side
+MAX_CACHED_PAGES = 20
+
+# A page of rows and the cursors of the pages before and after it, None at either end
+Page = namedtuple('Page', 'rows previous next')
+
+
+class KeysetPager:
+    """Pages through a query ordered by (sort expression, key)
+
+    A page next to a cached one is read with a keyset condition such as
+    "(p.name, p.id) > (?, ?)" so scrolling costs one index seek per page
+    however deep it goes; OFFSET is only used when jumping to a page with
+    no cached neighbour, e.g. dragging the scrollbar.
+
+    Sort expressions must never be NULL (wrap nullable columns in
+    COALESCE), a NULL breaks the row value comparison.
+    """
+
+    def __init__(self, columns, source, where=None, params=(), key="id",
+                 sort_columns=None, sort=None, reverse=False, page_size=PAGE_SIZE, conn=None):
+        self.columns = columns
+        self.source = source
+        self.where = where
+        self.params = tuple(params)
+        self.key = key
+        self.sort_columns = sort_columns or {}
+        self.page_size = page_size
+        self.conn = conn  # Read through the connection pool when None
+        self.sort = None
+        self.reverse = False
+        self.set_sort(sort, reverse)
+
+    def set_sort(self, column, reverse=False):
+        """Order by one of sort_columns (None for the key) and drop cached pages"""
+        if column is not None and column not in self.sort_columns:
+            raise ValueError(f"Cannot sort by {column}")
+        self.sort = column
+        self.reverse = reverse
+        self.reset()
+
+    def reset(self):
+        """Forget the cached count and pages, the next read hits the database"""
+        self._count = None
+        self._pages = OrderedDict()
+
+    def _connection(self):
+        return nullcontext(self.conn) if self.conn else db_connection()
+
+    def _order_terms(self):
+        if self.sort is None:
+            return [self.key]
+        return [self.sort_columns[self.sort], self.key]
+
+    def _query(self, keyset=None, backwards=False):
+        """Build the page query; keyset is (operator, values) after/before a boundary row"""
+        terms = self._order_terms()
+        query = f"SELECT {', '.join(self.columns)}, {', '.join(terms)} FROM {self.source}"
+        conditions = [f"({self.where})"] if self.where else []
+        params = list(self.params)
+        if keyset:
+            operator, values = keyset
+            if len(terms) > 1:
+                # Redundant with the row value, but SQLite only seeks an index
+                # on an expression such as COALESCE(c.name, '') with a plain bound
+                conditions.append(f"{terms[0]} {operator}= ?")
+                params.append(values[0])
+            conditions.append(f"({', '.join(terms)}) {operator} ({', '.join('?' * len(terms))})")
+            params.extend(values)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        descending = self.reverse != backwards
+        direction = "DESC" if descending else "ASC"
+        query += " ORDER BY " + ", ".join(f"{term} {direction}" for term in terms)
+        return query, params
+
+    def _keyset(self, cursor, backwards=False):
+        """Keyset condition of the rows after a cursor, or before it when backwards"""
+        # "Next" means greater when ascending and smaller when descending
+        forward, backward = ("<", ">") if self.reverse else (">", "<")
+        return (backward if backwards else forward), tuple(cursor)
+
+    def _statement(self, keyset=None, backwards=False, limit=None, offset=0):
+        query, params = self._query(keyset, backwards)
+        query += " LIMIT ? OFFSET ?"
+        params.extend([limit or self.page_size, offset])
+        return query, params
+
+    def _select(self, keyset=None, backwards=False, limit=None, offset=0):
+        """Rows in display order, hidden order columns still attached"""
+        query, params = self._statement(keyset, backwards, limit, offset)
+        with self._connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return rows[::-1] if backwards else rows
+
+    def _fetch(self, page):
+        """Read one page next to a cached one, or by offset when there is none"""
+        width = len(self._order_terms())
+        before, after = self._pages.get(page - 1), self._pages.get(page + 1)
+        if before:
+            return self._select(self._keyset(before[-1][-width:]))
+        if after:
+            return self._select(self._keyset(after[0][-width:], backwards=True), backwards=True)
+        return self._select(offset=page * self.page_size)
+
+    def page(self, cursor=None, backwards=False):
+        """
+        One page after a cursor, or before it when backwards
+
+        A cursor is the sort values and key of a boundary row, as returned in
+        Page.previous and Page.next. Without a cursor the page is the first
+        one (the last one when backwards). Each page is one index seek,
+        however deep it is, and nothing is cached.
+
+        Returns:
+            Page: rows without the order columns, previous and next cursors
+        """
+        width = len(self._order_terms())
+        keyset = self._keyset(cursor, backwards) if cursor is not None else None
+        # One row more than a page tells whether there is another page
+        rows = self._select(keyset, backwards, self.page_size + 1)
+        more = len(rows) > self.page_size
+        if more:
+            rows = rows[1:] if backwards else rows[:-1]
+        if not rows:
+            return Page([], None, None)
+        # The cursor's own row lies on the side the page was read from
+        has_previous = more if backwards else cursor is not None
+        has_next = cursor is not None if backwards else more
+        return Page(
+            [row[:-width] for row in rows],
+            tuple(rows[0][-width:]) if has_previous else None,
+            tuple(rows[-1][-width:]) if has_next else None,
+        )
+
+    def page_statement(self, cursor=None, backwards=False):
+        """The (query, parameters) page() runs for a cursor, e.g. to check its plan"""
+        keyset = self._keyset(cursor, backwards) if cursor is not None else None
+        return self._statement(keyset, backwards, self.page_size + 1)
+
+    def count_statement(self):
+        """The (query, parameters) count() runs"""
+        query = f"SELECT COUNT(*) FROM {self.source}"
+        if self.where:
+            query += f" WHERE {self.where}"
+        return query, self.params
+
+    def _page(self, page):
+        if page in self._pages:
+            self._pages.move_to_end(page)
+            return self._pages[page]
+        rows = self._fetch(page)
+        self._pages[page] = rows
+        if len(self._pages) > MAX_CACHED_PAGES:
+            self._pages.popitem(last=False)
+        return rows
+
+    def count(self):
+        """Number of rows in the result"""
+        if self._count is None:
+            query, params = self.count_statement()
+            try:
+                with self._connection() as conn:
+                    self._count = conn.execute(query, params).fetchone()[0]
+            except sqlite3.Error as e:
+                print(f"Error counting rows: {e}")
+                self._count = 0
+        return self._count
+
+    def rows(self, start, stop):
+        """Rows start..stop-1 of the result, without the order columns"""
+        width = len(self._order_terms())
+        stop = min(stop, self.count())
+        if stop <= start:
+            return []
+        result = []
+        try:
+            for page in range(start // self.page_size, (stop - 1) // self.page_size + 1):
+                offset = page * self.page_size
+                rows = self._page(page)
+                result.extend(rows[max(start - offset, 0):stop - offset])
+        except sqlite3.Error as e:
+            print(f"Error loading rows: {e}")
+        return [row[:-width] for row in result]
+
+
+class ListPager:
+    """Pager over rows already in memory, sorted by column index"""
+
+    def __init__(self, rows, sort_columns=None, sort=None, reverse=False, page_size=PAGE_SIZE):
+        self._original = list(rows)
+        self.page_size = page_size
+        self._rows = self._original
+        self.sort_columns = sort_columns or {}
+        self.sort = None
+        self.reverse = False
+        self.set_sort(sort, reverse)
+
+    def set_sort(self, column, reverse=False):
+        """Order by one of sort_columns (a row index), None restores the given order"""
+        if column is None:
+            self._rows = self._original
+        else:
+            if column not in self.sort_columns:
+                raise ValueError(f"Cannot sort by {column}")
+            index = self.sort_columns[column]
+            # NULLs first, then by value, so mixed None/number columns still compare
+            self._rows = sorted(
+                self._original, key=lambda row: (row[index] is not None, row[index]), reverse=reverse
+            )
+        self.sort = column
+        self.reverse = reverse
+
+    def reset(self):
+        pass
+
+    def count(self):
+        return len(self._rows)
+
+    def rows(self, start, stop):
+        return self._rows[start:stop]
+
+    def page(self, cursor=None, backwards=False):
+        """KeysetPager.page() over the list, a cursor is the index of the row after the boundary"""
+        if cursor is None:
+            cursor = len(self._rows) if backwards else 0
+        start = max(cursor - self.page_size, 0) if backwards else cursor
+        rows = self._rows[start:start + self.page_size] if not backwards else self._rows[start:cursor]
+        if not rows:
+            return Page([], None, None)
+        stop = start + len(rows)
+        return Page(rows, start if start > 0 else None, stop if stop < len(self._rows) else None)
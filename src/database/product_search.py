@@ -0,0 +1,302 @@
+"""Product search shared by the product management and checkout pages
+
+Search terms are matched against the products_fts full-text table
+(reference, name, description and category name, trigram tokenized so
+"T00" finds "HT001"). Results are ranked with prefix matches first, then
+bm25 relevance. Tokens shorter than three characters cannot be matched by
+a trigram index: they filter the full-text matches by substring, or on
+their own match SKU and name prefixes through the NOCASE indexes.
+"""
+import sqlite3
+
+# Columns returned by search_products, in order
+PRODUCT_COLUMNS = ('id', 'reference', 'name', 'description', 'price', 'quantity', 'min_quantity', 'category')
+
+# bm25 weights for the reference, name, description and category columns
+BM25_WEIGHTS = (10.0, 5.0, 1.0, 2.0)
+
+# Product table column -> ORDER BY expression for the pagers
+PRODUCT_SORT_COLUMNS = {
+    'ID': 'p.id',
+    'Reference': 'p.reference',
+    'Name': 'p.name',
+    'Description': "COALESCE(p.description, '')",
+    'Price': 'p.price',
+    'Quantity': 'p.quantity',
+    'Min Quantity': 'p.min_quantity',
+    'Category': "COALESCE(c.name, '')",
+}
+
+# Sort options offered by the product search form
+SORT_OPTIONS = {
+    "Relevance": None,
+    "Name (A-Z)": "p.name ASC",
+    "Name (Z-A)": "p.name DESC",
+    "Price (Low-High)": "p.price ASC",
+    "Price (High-Low)": "p.price DESC",
+    "Stock (Low-High)": "p.quantity ASC",
+    "Stock (High-Low)": "p.quantity DESC",
+}
+
+MIN_TRIGRAM_LENGTH = 3
+
+# Where search queries read from: the catalog, or the full-text matches joined to it
+PRODUCT_SOURCE = "products p LEFT JOIN category c ON p.category_id = c.id"
+FTS_SOURCE = "products_fts f JOIN products p ON p.id = f.rowid LEFT JOIN category c ON p.category_id = c.id"
+
+# Rows fetched per keystroke by search-as-you-type
+TYPE_AHEAD_LIMIT = 200
+
+
+def create_search_index(cursor):
+    """Create products_fts with its sync triggers and fill it (used by the migrations)
+
+    Returns False when this SQLite build lacks FTS5 or the trigram tokenizer,
+    in which case searches fall back to LIKE.
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_products_reference_nocase ON products (reference COLLATE NOCASE)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_products_name_nocase ON products (name COLLATE NOCASE)")
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+                reference, name, description, category,
+                tokenize = 'trigram'
+            )
+        """)
+    except sqlite3.OperationalError as err:
+        print(f"Full-text search unavailable, falling back to LIKE: {err}")
+        return False
+
+    # The FTS rowid is the product id
+    triggers = [
+        """CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN
+            INSERT INTO products_fts (rowid, reference, name, description, category)
+            VALUES (NEW.id, NEW.reference, NEW.name, NEW.description,
+                    (SELECT name FROM category WHERE id = NEW.category_id));
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS products_fts_update
+        AFTER UPDATE OF reference, name, description, category_id ON products BEGIN
+            DELETE FROM products_fts WHERE rowid = OLD.id;
+            INSERT INTO products_fts (rowid, reference, name, description, category)
+            VALUES (NEW.id, NEW.reference, NEW.name, NEW.description,
+                    (SELECT name FROM category WHERE id = NEW.category_id));
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN
+            DELETE FROM products_fts WHERE rowid = OLD.id;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS category_fts_rename AFTER UPDATE OF name ON category BEGIN
+            UPDATE products_fts SET category = NEW.name
+            WHERE rowid IN (SELECT id FROM products WHERE category_id = NEW.id);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS category_fts_delete AFTER DELETE ON category BEGIN
+            UPDATE products_fts SET category = NULL
+            WHERE rowid IN (SELECT id FROM products WHERE category_id = OLD.id);
+        END""",
+    ]
+    for trigger in triggers:
+        cursor.execute(trigger)
+
+    rebuild_search_index(cursor)
+    return True
+
+
+def rebuild_search_index(cursor):
+    """Refill products_fts from products, e.g. after a bulk load without the triggers"""
+    cursor.execute("DELETE FROM products_fts")
+    cursor.execute("""
+        INSERT INTO products_fts (rowid, reference, name, description, category)
+        SELECT p.id, p.reference, p.name, p.description, c.name
+        FROM products p
+        LEFT JOIN category c ON p.category_id = c.id
+    """)
+
+
+def fts_available(conn):
+    """Check whether the products_fts table exists in this database"""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'"
+    ).fetchone() is not None
+
+
+def _quote(token):
+    """Quote a token as an FTS5 string so punctuation in SKUs is taken literally"""
+    return '"' + token.replace('"', '""') + '"'
+
+
+def _escape_like(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def filter_conditions(category=None, stock_status=None):
+    """SQL conditions and parameters for the category and stock status filters"""
+    conditions, params = [], []
+    if category and category != "All":
+        conditions.append("c.name = ?")
+        params.append(category)
+
+    if stock_status == "Low Stock":
+        conditions.append("p.quantity > 0 AND p.quantity <= p.min_quantity")
+    elif stock_status == "In Stock":
+        conditions.append("p.quantity > p.min_quantity")
+    return conditions, params
+
+
+def _search_conditions(tokens, use_fts, category=None, stock_status=None):
+    """Conditions and parameters narrowing the products beyond the full-text match"""
+    long_tokens = [t for t in tokens if len(t) >= MIN_TRIGRAM_LENGTH]
+    short_tokens = [t for t in tokens if len(t) < MIN_TRIGRAM_LENGTH]
+    conditions, params = [], []
+
+    for token in short_tokens:
+        if long_tokens:
+            # The other tokens already narrowed the rows, look anywhere in them
+            conditions.append("(p.reference LIKE ? ESCAPE '\\' OR p.name LIKE ? ESCAPE '\\' OR c.name LIKE ? ESCAPE '\\')")
+            pattern = f"%{_escape_like(token)}%"
+            params.extend([pattern, pattern, pattern])
+        else:
+            # Match the start of the SKU or name through the NOCASE indexes
+            conditions.append("(p.reference LIKE ? ESCAPE '\\' OR p.name LIKE ? ESCAPE '\\')")
+            pattern = f"{_escape_like(token)}%"
+            params.extend([pattern, pattern])
+
+    if not use_fts:
+        # Without the full-text table every token is a plain substring match
+        for token in long_tokens:
+            conditions.append("(p.name LIKE ? ESCAPE '\\' OR p.reference LIKE ? ESCAPE '\\')")
+            pattern = f"%{_escape_like(token)}%"
+            params.extend([pattern, pattern])
+
+    filters, filter_params = filter_conditions(category, stock_status)
+    return conditions + filters, params + filter_params
+
+
+def search_source(conn, search_term=None, category=None, stock_status=None):
+    """
+    The products a search matches, as the parts of a query
+
+    Used by search_products() and by the pagers, which add their own columns
+    and order.
+
+    Returns:
+        tuple: (FROM clause, WHERE conditions, parameters); the products and
+        category tables are aliased p and c
+    """
+    tokens = (search_term or "").split()
+    long_tokens = [t for t in tokens if len(t) >= MIN_TRIGRAM_LENGTH]
+    use_fts = bool(long_tokens) and fts_available(conn)
+    conditions, params = _search_conditions(tokens, use_fts, category, stock_status)
+    if use_fts:
+        match = " AND ".join(_quote(t) for t in long_tokens)
+        return FTS_SOURCE, ["products_fts MATCH ?"] + conditions, [match] + params
+    return PRODUCT_SOURCE, conditions, params
+
+
+def search_statements(conn, search_term=None, category=None, stock_status=None, sort_by=None):
+    """
+    The queries of a search, in the order their rows are returned
+
+    A sorted search (or one without a term) is a single query; a relevance
+    search is the SKU prefix, name prefix and full-text stages. None of them
+    carries a LIMIT, search_products() adds it.
+
+    Returns:
+        list: (query, parameters) per stage, rows laid out as PRODUCT_COLUMNS
+    """
+    tokens = (search_term or "").split()
+    select = "SELECT p.id, p.reference, p.name, p.description, p.price, p.quantity, p.min_quantity, c.name"
+    source, conditions, params = search_source(conn, search_term, category, stock_status)
+    use_fts = source == FTS_SOURCE
+
+    def where(extra=()):
+        terms = conditions + list(extra)
+        return " WHERE " + " AND ".join(terms) if terms else ""
+
+    order_by = SORT_OPTIONS.get(sort_by) if isinstance(sort_by, str) else None
+    if order_by or not tokens:
+        query = f"{select} FROM {source}{where()}"
+        query += f" ORDER BY {order_by}, p.id" if order_by else " ORDER BY p.name ASC"
+        return [(query, params)]
+
+    # Relevance: SKUs starting with the whole term, then names starting with
+    # it, then the remaining matches by bm25. Each stage walks an index and
+    # stops at the limit, so a short prefix matching most of the catalog
+    # costs no more than a precise one.
+    prefix = f"{_escape_like(search_term.strip())}%"
+    stages = [
+        (
+            ["p.reference LIKE ? ESCAPE '\\'"],
+            [prefix],
+            " ORDER BY p.reference COLLATE NOCASE",
+        ),
+        (
+            ["p.name LIKE ? ESCAPE '\\'", "NOT p.reference LIKE ? ESCAPE '\\'"],
+            [prefix, prefix],
+            " ORDER BY p.name COLLATE NOCASE",
+        ),
+    ]
+    # A field starting with the whole term contains every long token, so
+    # these stages skip the full-text match and walk the NOCASE indexes
+    filters, filter_params = _search_conditions(tokens, use_fts, category, stock_status)
+    statements = [
+        (f"{select} FROM {PRODUCT_SOURCE} WHERE " + " AND ".join(filters + stage_conditions) + stage_order,
+         filter_params + stage_params)
+        for stage_conditions, stage_params, stage_order in stages
+    ]
+
+    query = select + f" FROM {source}" + where(["NOT (p.reference LIKE ? ESCAPE '\\' OR p.name LIKE ? ESCAPE '\\')"])
+    query += " ORDER BY "
+    if use_fts:
+        query += f"bm25(products_fts, {', '.join(str(w) for w in BM25_WEIGHTS)}), "
+    query += "p.name"
+    statements.append((query, params + [prefix, prefix]))
+    return statements
+
+
+def search_products(conn, search_term=None, category=None, stock_status=None, sort_by=None, limit=None):
+    """
+    Search products
+
+    Args:
+        conn: Open database connection
+        search_term (str): Text to find in the SKU, name, description or category
+        category (str): Category name to filter products ('All' or None for any)
+        stock_status (str): 'In Stock', 'Low Stock' or 'All'
+        sort_by (str): One of SORT_OPTIONS; relevance when omitted and a term is given
+        limit (int): Maximum number of rows
+
+    Returns:
+        list: Rows laid out as PRODUCT_COLUMNS
+    """
+    rows = []
+    for query, params in search_statements(conn, search_term, category, stock_status, sort_by):
+        if limit:
+            query += " LIMIT ?"
+            params = params + [limit - len(rows)]
+        rows.extend(conn.execute(query, params).fetchall())
+        if limit and len(rows) >= limit:
+            break
+    return rows
+
+
+def products_pager(search_term=None, category=None, stock_status=None, sort=None, reverse=False, conn=None):
+    """Pager over the products matching a search and filters, ordered by one of PRODUCT_SORT_COLUMNS"""
+    # Imported here, the migrations import this module before the pool exists
+    from src.database.db_config import db_connection
+    from src.database.paging import KeysetPager
+
+    if conn is None:
+        with db_connection() as pooled:
+            source, conditions, params = search_source(pooled, search_term, category, stock_status)
+    else:
+        source, conditions, params = search_source(conn, search_term, category, stock_status)
+    return KeysetPager(
+        ["p.id", "p.reference", "p.name", "p.description", "p.price", "p.quantity", "p.min_quantity", "c.name"],
+        source,
+        where=" AND ".join(conditions) or None,
+        params=params,
+        key="p.id",
+        sort_columns=PRODUCT_SORT_COLUMNS,
+        sort=sort,
+        reverse=reverse,
+        conn=conn,
+    )
@@ -0,0 +1,67 @@
+"""Purchase history query shared by the purchase table and the benchmarks
+
+Each purchase row carries its items as "name, qty | name, qty", built by
+a correlated GROUP_CONCAT subquery. Pages are read newest first with a
+(created_at, id) keyset, so a page costs one query whatever the size of
+the history; created_at is nullable, so the keyset and its index use
+COALESCE(created_at, ''). The date filters are UTC days of created_at, like the sales
+rollups and the stock ledger.
+"""
+from src.database.paging import KeysetPager
+
+# Columns of a purchase history row
+PURCHASE_COLUMNS = [
+    "p.id",
+    "a.username",
+    "u.name",
+    "p.created_at",
+    "p.total_amount",
+    """(SELECT GROUP_CONCAT(item, ' | ') FROM (
+            SELECT pr.name || ', ' || pd.quantity AS item
+            FROM purchase_details pd
+            JOIN products pr ON pd.product_id = pr.id
+            WHERE pd.purchase_id = p.id
+            ORDER BY pr.name
+        ))""",
+]
+
+PURCHASE_SOURCE = """purchases p
+    LEFT JOIN admin a ON p.created_by = a.id
+    LEFT JOIN users u ON p.user_id = u.id"""
+
+# Purchase table column -> ORDER BY expression
+PURCHASE_SORT_COLUMNS = {
+    'ID': 'p.id',
+    'Date': "COALESCE(p.created_at, '')",
+    'Total Amount': 'p.total_amount',
+}
+
+
+def purchases_pager(date_from=None, date_to=None, conn=None):
+    """
+    Pager over the purchase history, newest first
+
+    Args:
+        date_from (str): First day to include, YYYY-MM-DD
+        date_to (str): Last day to include, YYYY-MM-DD
+        conn: Connection to read from, the shared pool when omitted
+    """
+    conditions, params = [], []
+    if date_from:
+        conditions.append("p.created_at >= ?")
+        params.append(date_from)
+    if date_to:
+        conditions.append("p.created_at < date(?, '+1 day')")
+        params.append(date_to)
+
+    return KeysetPager(
+        PURCHASE_COLUMNS,
+        PURCHASE_SOURCE,
+        where=" AND ".join(conditions) or None,
+        params=params,
+        key="p.id",
+        sort_columns=PURCHASE_SORT_COLUMNS,
+        sort='Date',
+        reverse=True,
+        conn=conn,
+    )
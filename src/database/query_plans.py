@@ -0,0 +1,120 @@
+"""EXPLAIN QUERY PLAN regression check for the hot queries
+
+named_queries() returns the statements the pages and the checkout run, built
+by the same constants and pagers as their call sites, so the check follows
+the queries when they change. Each must be answered through an index. Run
+with
+
+    python -m src.database.query_plans
+
+which exits non-zero and lists the offending plan steps if any named query
+falls back to a full table scan.
+"""
+import re
+import sqlite3
+import sys
+
+from src.database import product_search
+from src.database.catalog import PRODUCT_BY_ID, PRODUCTS_IN_CATEGORY
+from src.database.checkout import USER_BY_NAME
+from src.database.dashboard_data import low_stock_pager
+from src.database.purchase_history import purchases_pager
+from src.database.saved_carts import LIST_SAVED_CARTS, RESTORE_CART
+from src.database.stock_ledger import (
+    CLOSED_MONTH_INVENTORY, MOVEMENTS_AFTER, STOCK_LEVEL, movements_pager,
+)
+
+# Search text typed at the checkout: a short prefix and a full-text term
+SEARCH_SAMPLES = {"short": "ha", "fulltext": "hammer"}
+
+# Names of the stages of a relevance search, in search_statements() order
+SEARCH_STAGES = ("sku_prefix", "name_prefix", "rest")
+
+
+def named_queries(conn):
+    """{name: (sql, sample parameters)} of the statements the call sites run"""
+    queries = {
+        # CheckoutFrame.complete_purchase through checkout.commit_cart
+        "user_by_name": (USER_BY_NAME, ("Mike Johnson",)),
+        # CatalogCache.put_products
+        "product_by_id": (PRODUCT_BY_ID, (1,)),
+        # CategoriesFrame.delete_category
+        "products_in_category": (PRODUCTS_IN_CATEGORY, (1,)),
+        # PurchaseHistory pages, with the items subquery of each row
+        "purchases_page": purchases_pager("2025-01-01", conn=conn).page_statement(("2025-02-01", 1)),
+        "purchases_count": purchases_pager("2025-01-01", conn=conn).count_statement(),
+        # ProductTable pages sorted by a column
+        "products_page_by_name": product_search.products_pager(
+            sort='Name', conn=conn).page_statement(("Hammer", 1)),
+        "products_page_by_price": product_search.products_pager(
+            sort='Price', reverse=True, conn=conn).page_statement((10.0, 1)),
+        # The dashboard low stock table
+        "low_stock_page": low_stock_pager(conn).page_statement((0, 1)),
+        "low_stock_count": low_stock_pager(conn).count_statement(),
+        # StockManager.movements_pager, newest first
+        "stock_movements_page": movements_pager(conn=conn).page_statement(("2025-01-01", 1000)),
+        # stock_ledger.stock_level
+        "stock_level": (STOCK_LEVEL, {'product_id': 1, 'day': "2025-02-01"}),
+        # stock_ledger.inventory_as_of a day in a closed month, e.g. a month-end valuation
+        "inventory_closed_month": (
+            CLOSED_MONTH_INVENTORY.format(movements=MOVEMENTS_AFTER.format(after="date > :day")),
+            {'day': "2025-01-15", 'last': "2025-01-31", 'moment': None},
+        ),
+        # The checkout's saved cart list and loading one of them
+        "saved_carts_list": (LIST_SAVED_CARTS, ()),
+        "saved_cart_restore": (RESTORE_CART, {'cart': 1, 'till': "till", 'now': 0}),
+    }
+
+    # product_search.search_products, by relevance and sorted by a column
+    for sample, term in SEARCH_SAMPLES.items():
+        statements = product_search.search_statements(conn, term)
+        for stage, statement in zip(SEARCH_STAGES, statements):
+            queries[f"product_search_{sample}_{stage}"] = statement
+    queries["product_search_by_price"], = product_search.search_statements(
+        conn, SEARCH_SAMPLES["fulltext"], sort_by="Price (Low-High)")
+    return queries
+
+
+# A plan step reading every row of a table; "SCAN t USING [COVERING] INDEX"
+# walks an index instead and is accepted
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+
+def explain(conn, sql, params=()):
+    """Return the plan step descriptions of a query"""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def find_full_scans(conn, queries=None):
+    """Return {query name: [full scan plan steps]} for queries that scan a table"""
+    offenders = {}
+    for name, (sql, params) in (queries or named_queries(conn)).items():
+        scans = [step for step in explain(conn, sql, params) if FULL_SCAN.match(step)]
+        if scans:
+            offenders[name] = scans
+    return offenders
+
+
+def main():
+    from src.database.db_config import DB_FILE
+    from src.database.migrations import migrate
+
+    # Check against an in-memory copy brought up to the latest schema
+    source = sqlite3.connect(DB_FILE)
+    conn = sqlite3.connect(":memory:")
+    source.backup(conn)
+    source.close()
+    migrate(conn)
+    conn.execute("ANALYZE")
+
+    queries = named_queries(conn)
+    offenders = find_full_scans(conn, queries)
+    for name, scans in offenders.items():
+        print(f"{name}: {'; '.join(scans)}")
+    if offenders:
+        sys.exit(1)
+    print(f"All {len(queries)} named queries use an index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Sales analytics over daily rollups
+
+Reports read these rollup tables instead of purchase_details:
+
+- sales_daily: one row per day
+- sales_daily_category: one row per day and category (0 for none), the
+  category the product had when the sale was recorded
+- sales_daily_product: one row per day and product
+- sales_monthly_product: one row per month and product, since a busy shop
+  sells most products only a few times a day and the daily product rows
+  are almost as many as the detail lines
+
+record_purchase() adds a purchase to them inside the checkout transaction,
+so the rollups are always as current as the sales, and a year of reports
+reads at most a few hundred rows per category or product instead of every
+detail line. Margin is revenue minus cost for the lines whose product had
+a cost_price when it was sold; costed_revenue is the revenue of those lines.
+Days and months are UTC days of purchases.created_at (CURRENT_TIMESTAMP),
+the same days the purchase history filters on and the stock ledger dates
+its SALE movements by.
+"""
+from datetime import date, timedelta
+
+# Report bucket -> expression turning a YYYY-MM-DD {day} into the bucket start (weeks start on Monday)
+PERIODS = {
+    'day': "{day}",
+    'week': "date({day}, '-6 days', 'weekday 1')",
+    'month': "strftime('%Y-%m-01', {day})",
+    'year': "strftime('%Y-01-01', {day})",
+}
+
+# Summed measures of every rollup row
+MEASURES = ["purchases", "units", "revenue", "cost", "costed_revenue"]
+
+ROLLUPS = {
+    "sales_daily": ["day"],
+    "sales_daily_category": ["day", "category_key"],
+    "sales_daily_product": ["day", "product_id"],
+    "sales_monthly_product": ["month", "product_id"],
+}
+
+# Bounds used for an open date range
+FIRST_DAY, LAST_DAY = "1900-01-01", "2999-12-31"
+
+# Per detail line: day, category key, product, units, revenue, cost, costed revenue
+_DETAIL_LINES = """
+    SELECT date(p.created_at) AS day,
+           strftime('%Y-%m-01', p.created_at) AS month,
+           COALESCE(pr.category_id, 0) AS category_key,
+           d.product_id,
+           d.purchase_id,
+           d.quantity AS units,
+           d.total_price AS revenue,
+           COALESCE(d.quantity * d.unit_cost, 0) AS cost,
+           CASE WHEN d.unit_cost IS NULL THEN 0 ELSE d.total_price END AS costed_revenue
+    FROM purchase_details d
+    JOIN purchases p ON p.id = d.purchase_id
+    LEFT JOIN products pr ON pr.id = d.product_id
+"""
+
+
+def create_sales_rollups(cursor):
+    """Add the cost columns and the rollup tables, filled from the sales so far (used by the migrations)"""
+    cursor.execute("PRAGMA table_info(products)")
+    if 'cost_price' not in [col[1] for col in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE products ADD COLUMN cost_price REAL")
+    cursor.execute("PRAGMA table_info(purchase_details)")
+    if 'unit_cost' not in [col[1] for col in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE purchase_details ADD COLUMN unit_cost REAL")
+
+    for table, keys in ROLLUPS.items():
+        key_columns = ", ".join(f"{key} {'INTEGER' if key.endswith('_id') or key.endswith('_key') else 'TEXT'} NOT NULL" for key in keys)
+        measure_columns = ", ".join(
+            f"{measure} {'INTEGER' if measure in ('purchases', 'units') else 'REAL'} NOT NULL DEFAULT 0"
+            for measure in MEASURES
+        )
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                {key_columns},
+                {measure_columns},
+                PRIMARY KEY ({", ".join(keys)})
+            ) WITHOUT ROWID
+        """)
+    # Product reports walk one product's days
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sales_daily_product_product
+        ON sales_daily_product (product_id, day)
+    """)
+    rebuild_sales_rollups(cursor)
+
+
+def _rollup_insert(table, keys, where):
+    """INSERT adding the detail lines matching where to one rollup table"""
+    columns = ", ".join(keys + MEASURES)
+    updates = ", ".join(f"{measure} = {measure} + excluded.{measure}" for measure in MEASURES)
+    return f"""
+        INSERT INTO {table} ({columns})
+        SELECT {", ".join(keys)}, COUNT(DISTINCT purchase_id), SUM(units), SUM(revenue), SUM(cost), SUM(costed_revenue)
+        FROM ({_DETAIL_LINES} {where})
+        GROUP BY {", ".join(keys)}
+        ON CONFLICT ({", ".join(keys)}) DO UPDATE SET {updates}
+    """
+
+
+def record_purchase(cursor, purchase_id):
+    """Add one purchase's lines to the rollups, call it in the transaction that inserted them"""
+    for table, keys in ROLLUPS.items():
+        cursor.execute(_rollup_insert(table, keys, "WHERE d.purchase_id = ?"), (purchase_id,))
+
+
+def record_purchases_from(cursor, first_purchase_id):
+    """Add every purchase from first_purchase_id on to the rollups, e.g. after a bulk load"""
+    for table, keys in ROLLUPS.items():
+        cursor.execute(_rollup_insert(table, keys, "WHERE d.purchase_id >= ?"), (first_purchase_id,))
+
+
+def rebuild_sales_rollups(cursor):
+    """Recompute the rollups from every purchase, e.g. after importing history"""
+    for table, keys in ROLLUPS.items():
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(_rollup_insert(table, keys, "WHERE 1"))
+
+
+def _report(conn, table, group_by, select, joins="", date_from=None, date_to=None, order_by=None):
+    """Sum the measures of a rollup table between two YYYY-MM-DD days, grouped by an expression"""
+    conditions, params = [], []
+    if date_from:
+        conditions.append("s.day >= ?")
+        params.append(date_from)
+    if date_to:
+        conditions.append("s.day <= ?")
+        params.append(date_to)
+    query = f"""
+        SELECT {select}, SUM(s.purchases), SUM(s.units), SUM(s.revenue),
+               SUM(s.costed_revenue) - SUM(s.cost), SUM(s.costed_revenue)
+        FROM {table} s {joins}
+    """
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" GROUP BY {group_by} ORDER BY {order_by or group_by}"
+    return conn.execute(query, params).fetchall()
+
+
+def sales_by_period(conn, period='day', date_from=None, date_to=None):
+    """[(period start, purchases, units, revenue, margin, costed revenue)] oldest first"""
+    bucket = PERIODS[period].format(day="s.day")
+    return _report(conn, "sales_daily", bucket, bucket, date_from=date_from, date_to=date_to)
+
+
+def sales_by_category(conn, date_from=None, date_to=None):
+    """[(category name, purchases, units, revenue, margin, costed revenue)] by revenue"""
+    return _report(
+        conn, "sales_daily_category", "s.category_key", "COALESCE(c.name, 'Uncategorized')",
+        joins="LEFT JOIN category c ON c.id = s.category_key",
+        date_from=date_from, date_to=date_to, order_by="SUM(s.revenue) DESC",
+    )
+
+
+def _whole_months(date_from, date_to):
+    """(first month start, end month start) of the calendar months inside [date_from, date_to]
+
+    Both are the day after date_to when no whole month fits, so the days
+    before the first month cover the whole range.
+    """
+    first, last = date.fromisoformat(date_from), date.fromisoformat(date_to)
+    if first.day != 1:
+        first = (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+    after = last + timedelta(days=1)
+    end = after if after.day == 1 else last.replace(day=1)
+    if end <= first:
+        first = end = after
+    return first.isoformat(), end.isoformat()
+
+
+def sales_by_product(conn, date_from=None, date_to=None, limit=None):
+    """[(product id, reference, name, purchases, units, revenue, margin, costed revenue)] by revenue
+
+    Whole months come from sales_monthly_product, only the days before the
+    first and after the last whole month from sales_daily_product.
+    """
+    date_from, date_to = date_from or FIRST_DAY, date_to or LAST_DAY
+    month_from, month_end = _whole_months(date_from, date_to)
+    measures = ", ".join(MEASURES)
+    query = f"""
+        SELECT s.product_id, p.reference, p.name, SUM(s.purchases), SUM(s.units), SUM(s.revenue),
+               SUM(s.costed_revenue) - SUM(s.cost), SUM(s.costed_revenue)
+        FROM (
+            SELECT product_id, {measures} FROM sales_monthly_product
+            WHERE month >= :month_from AND month < :month_end
+            UNION ALL
+            SELECT product_id, {measures} FROM sales_daily_product
+            WHERE (day >= :date_from AND day < :month_from) OR (day >= :month_end AND day <= :date_to)
+        ) s
+        LEFT JOIN products p ON p.id = s.product_id
+        GROUP BY s.product_id
+        ORDER BY SUM(s.revenue) DESC
+    """
+    params = {'date_from': date_from, 'date_to': date_to, 'month_from': month_from, 'month_end': month_end}
+    if limit:
+        query += " LIMIT :limit"
+        params['limit'] = limit
+    return conn.execute(query, params).fetchall()
+
+
+def year_over_year(conn, year, period='month'):
+    """[(bucket, revenue this year, revenue the year before)] for a calendar year
+
+    Buckets are 'MM' for months and 'MM-DD' for days, so both years line up.
+    """
+    label = {'month': "strftime('%m', s.day)", 'day': "strftime('%m-%d', s.day)"}[period]
+    rows = conn.execute(f"""
+        SELECT {label},
+               SUM(CASE WHEN s.day >= :start THEN s.revenue ELSE 0 END),
+               SUM(CASE WHEN s.day < :start THEN s.revenue ELSE 0 END)
+        FROM sales_daily s
+        WHERE s.day >= :previous AND s.day < :end
+        GROUP BY 1
+        ORDER BY 1
+    """, {'start': f"{year}-01-01", 'previous': f"{year - 1}-01-01", 'end': f"{year + 1}-01-01"})
+    return rows.fetchall()
+
+
+def sales_by_period_from_details(conn, period='day', date_from=None, date_to=None):
+    """sales_by_period computed from purchase_details, to check and time the rollups against"""
+    bucket = PERIODS[period].format(day="day")
+    conditions, params = [], []
+    if date_from:
+        conditions.append("day >= ?")
+        params.append(date_from)
+    if date_to:
+        conditions.append("day <= ?")
+        params.append(date_to)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return conn.execute(f"""
+        SELECT {bucket}, COUNT(DISTINCT purchase_id), SUM(units), SUM(revenue),
+               SUM(costed_revenue) - SUM(cost), SUM(costed_revenue)
+        FROM ({_DETAIL_LINES}) {where}
+        GROUP BY 1
+        ORDER BY 1
+    """, params).fetchall()
+
+
+def check_sales_rollups(conn):
+    """Days whose sales_daily row disagrees with purchase_details"""
+    expected = {row[0]: row[1:] for row in sales_by_period_from_details(conn)}
+    stored = {row[0]: row[1:] for row in sales_by_period(conn)}
+    mismatches = []
+    for day in sorted(set(expected) | set(stored)):
+        want, got = expected.get(day), stored.get(day)
+        # (purchases, units, revenue, margin, costed revenue); money is a float sum
+        if want is None or got is None or want[:2] != got[:2] \
+                or any(abs(a - b) > 0.005 for a, b in zip(want[2:], got[2:])):
+            mismatches.append((day, want, got))
+    return mismatches
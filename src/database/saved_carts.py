@@ -0,0 +1,269 @@
+"""Parked carts
+
+A till parks a cart as one saved_carts row holding what the list of
+parked carts shows (when, buyer, lines, units and total) and its lines in
+saved_cart_items, so listing the parked carts is one indexed query over
+the headers however many carts there are and whatever they hold.
+
+Restoring a cart reads its lines against the catalog in one query: the
+current name and price of each product, the stock other tills have not
+reserved, and the products deleted since it was parked. Markdown is only
+written on demand by export_markdown(), in the format the checkout page
+used to park carts in src/saves. The migration moves the JSON of the older
+saved_carts rows into the new tables; the markdown files belong to the
+shop's own database, so setup_database() imports them once with
+import_parked_carts() and moves them out of the way.
+"""
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+from src.database.checkout import RESERVED_BY_OTHERS, TILL_ID, merge_lines
+
+# Where the checkout page used to park carts as markdown files
+SAVES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "saves")
+
+# Subdirectory of SAVES_DIR the imported files are moved to
+IMPORTED_DIR = "imported"
+
+# The parked carts newest first, read from the headers only
+LIST_SAVED_CARTS = """
+    SELECT id, datetime(created_at, 'localtime'), buyer, line_count, item_count, total
+    FROM saved_carts
+    ORDER BY created_at DESC, id DESC
+"""
+
+# A parked cart's lines against the catalog; :cart, :till and :now named parameters
+RESTORE_CART = f"""
+    SELECT i.product_id, COALESCE(p.name, i.name), p.price, i.quantity, i.unit_price,
+           p.quantity - {RESERVED_BY_OTHERS.format(product='p.id')}
+    FROM saved_cart_items i
+    LEFT JOIN products p ON p.id = i.product_id
+    WHERE i.cart_id = :cart
+    ORDER BY i.line
+"""
+
+
+def create_saved_carts(cursor):
+    """Add the cart metadata columns and saved_cart_items, moving the parked carts in (used by the migrations)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS saved_carts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            cart_data TEXT
+        )
+    """)
+    cursor.execute("PRAGMA table_info(saved_carts)")
+    columns = [col[1] for col in cursor.fetchall()]
+    for column, definition in [
+        ('buyer', "TEXT"),
+        ('till_id', "TEXT"),
+        ('line_count', "INTEGER NOT NULL DEFAULT 0"),
+        ('item_count', "INTEGER NOT NULL DEFAULT 0"),
+        ('total', "REAL NOT NULL DEFAULT 0"),
+    ]:
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE saved_carts ADD COLUMN {column} {definition}")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_saved_carts_created_at ON saved_carts (created_at)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS saved_cart_items (
+            cart_id INTEGER NOT NULL,
+            line INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            unit_price REAL NOT NULL,
+            PRIMARY KEY (cart_id, line),
+            FOREIGN KEY (cart_id) REFERENCES saved_carts (id)
+        ) WITHOUT ROWID
+    """)
+
+    # Rows saved with the whole cart as a JSON list of {id, name, price, quantity}
+    cursor.execute("""
+        INSERT INTO saved_cart_items (cart_id, line, product_id, name, quantity, unit_price)
+        SELECT s.id, MIN(j.key), json_extract(j.value, '$.id'), json_extract(j.value, '$.name'),
+               SUM(json_extract(j.value, '$.quantity')), json_extract(j.value, '$.price')
+        FROM saved_carts s, json_each(s.cart_data) j
+        WHERE s.cart_data IS NOT NULL AND json_valid(s.cart_data)
+        GROUP BY s.id, json_extract(j.value, '$.id')
+    """)
+    cursor.execute("""
+        UPDATE saved_carts
+        SET line_count = t.lines, item_count = t.units, total = t.total
+        FROM (
+            SELECT cart_id, COUNT(*) AS lines, SUM(quantity) AS units, ROUND(SUM(quantity * unit_price), 2) AS total
+            FROM saved_cart_items
+            GROUP BY cart_id
+        ) t
+        WHERE t.cart_id = saved_carts.id AND saved_carts.cart_data IS NOT NULL
+    """)
+    cursor.execute("UPDATE saved_carts SET cart_data = NULL WHERE cart_data IS NOT NULL")
+
+
+def _insert_cart(cursor, items, buyer=None, till_id=None, created_at=None):
+    """Insert a cart's header and lines, returns its id"""
+    lines = merge_lines(items)
+    cursor.execute("""
+        INSERT INTO saved_carts (created_at, buyer, till_id, line_count, item_count, total)
+        VALUES (COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?, ?, ?)
+    """, (
+        created_at, buyer or None, till_id, len(lines),
+        sum(quantity for _, _, quantity, _ in lines),
+        round(sum(quantity * price for _, _, quantity, price in lines), 2),
+    ))
+    cart_id = cursor.lastrowid
+    cursor.executemany("""
+        INSERT INTO saved_cart_items (cart_id, line, product_id, name, quantity, unit_price)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, [(cart_id, line, *fields) for line, fields in enumerate(lines)])
+    return cart_id
+
+
+def import_markdown_carts(cursor, directory):
+    """Park every cart_*.md file of a directory that export_markdown() or the old checkout wrote
+
+    Returns:
+        list: names of the files parked, malformed ones are skipped
+    """
+    imported = []
+    for filename in sorted(os.listdir(directory)):
+        if not (filename.startswith("cart_") and filename.endswith(".md")):
+            continue
+        try:
+            with open(os.path.join(directory, filename), encoding='utf-8') as f:
+                content = f.read()
+            start = content.index("<cart_data>") + len("<cart_data>")
+            items = json.loads(content[start:content.index("</cart_data>")])
+            # cart_YYYYmmdd_HHMMSS.md, local time; created_at is UTC like CURRENT_TIMESTAMP
+            saved = datetime.strptime(filename[5:20], "%Y%m%d_%H%M%S").astimezone(timezone.utc)
+            # A malformed cart fails in merge_lines(), before anything is inserted
+            _insert_cart(cursor, items, created_at=saved.strftime("%Y-%m-%d %H:%M:%S"))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Skipping saved cart {filename}: {e!r}")
+            continue
+        imported.append(filename)
+    return imported
+
+
+def import_parked_carts(conn, directory=SAVES_DIR):
+    """
+    Park the markdown carts the old checkout left in directory, once
+
+    Only meant for the shop's own database (see setup_database()): the
+    files hold product ids of its catalog. They are moved to the
+    IMPORTED_DIR subdirectory after the commit, so the next start does not
+    park them again; skipped files stay where they are.
+
+    Returns:
+        int: number of carts parked
+    """
+    if not os.path.isdir(directory):
+        return 0
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        imported = import_markdown_carts(cursor, directory)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    if imported:
+        done = os.path.join(directory, IMPORTED_DIR)
+        os.makedirs(done, exist_ok=True)
+        for filename in imported:
+            os.replace(os.path.join(directory, filename), os.path.join(done, filename))
+    return len(imported)
+
+
+def save_cart(conn, items, buyer=None, till_id=TILL_ID):
+    """Park a cart of {'id', 'name', 'price', 'quantity'} items, returns the saved cart id"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cart_id = _insert_cart(cursor, items, buyer, till_id)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    return cart_id
+
+
+def list_saved_carts(conn, limit=None):
+    """[(id, saved at in local time, buyer, lines, units, total)] newest first, without reading any line"""
+    query = LIST_SAVED_CARTS
+    params = ()
+    if limit:
+        query += " LIMIT ?"
+        params = (limit,)
+    return conn.execute(query, params).fetchall()
+
+
+def restore_cart(conn, cart_id, till_id=TILL_ID, now=None):
+    """
+    A parked cart's lines checked against the catalog, in one query
+
+    Returns:
+        list: {'id', 'name', 'price', 'quantity', 'saved_price', 'available'}
+        per line in cart order; price and available are None when the
+        product was deleted, available is the stock other tills have not
+        reserved
+    """
+    now = datetime.now().timestamp() if now is None else now
+    cursor = conn.execute(RESTORE_CART, {'cart': cart_id, 'till': till_id, 'now': now})
+    return [
+        {'id': product_id, 'name': name, 'price': price, 'quantity': quantity,
+         'saved_price': saved_price, 'available': available}
+        for product_id, name, price, quantity, saved_price, available in cursor.fetchall()
+    ]
+
+
+def delete_saved_cart(conn, cart_id):
+    """Remove a parked cart and its lines"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("DELETE FROM saved_cart_items WHERE cart_id = ?", (cart_id,))
+        cursor.execute("DELETE FROM saved_carts WHERE id = ?", (cart_id,))
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+
+def export_markdown(conn, cart_id):
+    """
+    A parked cart as markdown: a table of its lines, the total and the
+    cart as JSON, which import_markdown_carts() reads back
+
+    Returns:
+        tuple: (suggested file name, content), (None, None) for an unknown cart
+    """
+    header = conn.execute(
+        "SELECT datetime(created_at, 'localtime'), buyer, total FROM saved_carts WHERE id = ?", (cart_id,)
+    ).fetchone()
+    if header is None:
+        return None, None
+    saved_at, buyer, total = header
+    items = [
+        {'id': product_id, 'name': name, 'price': price, 'quantity': quantity}
+        for product_id, name, quantity, price in conn.execute("""
+            SELECT product_id, name, quantity, unit_price FROM saved_cart_items
+            WHERE cart_id = ? ORDER BY line
+        """, (cart_id,))
+    ]
+
+    content = f"# Saved Cart - {saved_at}\n\n"
+    if buyer:
+        content += f"Buyer: {buyer}\n\n"
+    content += "## Items\n\n"
+    content += "| Product | Quantity | Price | Total |\n"
+    content += "|---------|-----------|-------|-------|\n"
+    for item in items:
+        content += (f"| {item['name']} | {item['quantity']} | ${item['price']:.2f} "
+                    f"| ${item['quantity'] * item['price']:.2f} |\n")
+    content += f"\n## Total Amount: ${total:.2f}\n"
+    content += "\n<cart_data>\n" + json.dumps(items, indent=2) + "\n</cart_data>"
+
+    stamp = datetime.strptime(saved_at, "%Y-%m-%d %H:%M:%S").strftime("%Y%m%d_%H%M%S")
+    return f"cart_{stamp}.md", content
@@ -1,5 +1,7 @@
+import argparse
 import sqlite3
 import os
+from datetime import date, datetime, timedelta
 from pathlib import Path
 import random
 
@@ -55,12 +57,12 @@ def seed_categories(cursor):
         categories,
     )
     print("Categories table seeded successfully!")
-    return {
-        name: cursor.execute(
-            "SELECT id FROM category WHERE name = ?", (name,)
-        ).fetchone()[0]
-        for name, _, _ in categories
-    }
+    names = [name for name, _, _ in categories]
+    cursor.execute(
+        f"SELECT name, id FROM category WHERE name IN ({', '.join('?' for _ in names)})",
+        names,
+    )
+    return dict(cursor.fetchall())
 
 
 def seed_products(cursor, category_map):
@@ -275,14 +277,12 @@ def seed_products(cursor, category_map):
         products,
     )
     print("Products table seeded successfully!")
-    return {
-        ref: (
-            cursor.execute(
-                "SELECT id, price FROM products WHERE reference = ?", (ref,)
-            ).fetchone()
-        )
-        for ref, _, _, _, _, _, _, _ in products
-    }
+    references = [ref for ref, _, _, _, _, _, _, _ in products]
+    cursor.execute(
+        f"SELECT reference, id, price FROM products WHERE reference IN ({', '.join('?' for _ in references)})",
+        references,
+    )
+    return {ref: (product_id, price) for ref, product_id, price in cursor.fetchall()}
 
 
 def seed_users(cursor):
@@ -304,16 +304,24 @@ def seed_users(cursor):
         users,
     )
     print("Users table seeded successfully!")
-    return {
-        name: cursor.execute("SELECT id FROM users WHERE name = ?", (name,)).fetchone()[
-            0
-        ]
-        for name, _, _, _, _, _ in users
-    }
+    # Names are not unique, the oldest user with the name gets the purchases
+    names = [name for name, _, _, _, _, _ in users]
+    cursor.execute(
+        f"SELECT name, MIN(id) FROM users WHERE name IN ({', '.join('?' for _ in names)}) GROUP BY name",
+        names,
+    )
+    return dict(cursor.fetchall())
 
 
 def seed_purchases(cursor, user_map, product_map):
     """Seed purchases and purchase_details tables"""
+    from src.database.sales_analytics import record_purchases_from
+
+    # Ids are assigned here so the detail lines need no lastrowid round trip
+    first_purchase_id = _next_id(cursor, "purchases")
+    purchase_id = first_purchase_id
+    purchases, details = [], []
+
     # Generate purchases for each user
     for user_name, user_id in user_map.items():
         # Create 3-5 purchases for each user
@@ -323,43 +331,255 @@ def seed_purchases(cursor, user_map, product_map):
                 list(product_map.items()), random.randint(2, 5)
             )
             purchase_total = 0
-            purchase_details = []
 
             # Calculate purchase details
             for product_ref, (product_id, price) in purchase_products:
                 quantity = random.randint(1, 3)
                 total_price = price * quantity
                 purchase_total += total_price
-                purchase_details.append((product_id, quantity, price, total_price))
+                details.append((purchase_id, product_id, quantity, price, total_price))
 
-            # Create purchase record
             points_earned = int(purchase_total // 10)  # 1 point per $10 spent
-            cursor.execute(
-                """
-                INSERT INTO purchases (user_id, total_amount, points_earned, created_by)
-                VALUES (?, ?, ?, ?)
-            """,
-                (user_id, purchase_total, points_earned, 1),
-            )
+            purchases.append((purchase_id, user_id, purchase_total, points_earned, 1))
+            purchase_id += 1
 
-            purchase_id = cursor.lastrowid
-
-            # Create purchase details
-            cursor.executemany(
-                """
-                INSERT INTO purchase_details 
-                (purchase_id, product_id, quantity, unit_price, total_price)
-                VALUES (?, ?, ?, ?, ?)
-            """,
-                [
-                    (purchase_id, prod_id, qty, price, total)
-                    for prod_id, qty, price, total in purchase_details
-                ],
-            )
+    cursor.executemany(
+        """
+        INSERT INTO purchases (id, user_id, total_amount, points_earned, created_by)
+        VALUES (?, ?, ?, ?, ?)
+    """,
+        purchases,
+    )
+    cursor.executemany(
+        """
+        INSERT INTO purchase_details
+        (purchase_id, product_id, quantity, unit_price, total_price)
+        VALUES (?, ?, ?, ?, ?)
+    """,
+        details,
+    )
+
+    # Keep the sales reports in step when the rollups exist
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sales_daily'")
+    if cursor.fetchone():
+        record_purchases_from(cursor, first_purchase_id)
 
     print("Purchases and purchase details tables seeded successfully!")
 
 
+def seed_opening_balances(cursor):
+    """Record the seeded products' stock as opening balances in the stock ledger"""
+    from src.database.stock_ledger import record_opening_balances
+
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stock_movements'")
+    if cursor.fetchone():
+        record_opening_balances(cursor)
+        print("Stock ledger opening balances seeded successfully!")
+
+
+def _next_id(cursor, table):
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}")
+    return cursor.fetchone()[0]
+
+
+def _columns(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [col[1] for col in cursor.fetchall()]
+
+
+# Vocabulary for generated names
+PRODUCT_WORDS = [
+    "Hammer", "Drill", "Cordless", "Wrench", "Pipe", "Saw", "Circular", "Screw",
+    "Anchor", "Hinge", "Cabinet", "Glove", "Safety", "Glasses", "Brush", "Roller",
+    "Tape", "Wire", "Stripper", "Level", "Chisel", "Clamp", "Bolt", "Nut", "Washer",
+    "Valve", "Fitting", "Switch", "Outlet", "Ladder", "Sander", "Grinder", "Blade",
+]
+FIRST_NAMES = ["Mike", "Sarah", "Tom", "Lisa", "Bill", "Anna", "Omar", "Nadia", "Karim", "Julie", "Sam", "Leila"]
+LAST_NAMES = ["Johnson", "Wilson", "Anderson", "Cooper", "Martinez", "Haddad", "Benali", "Smith", "Moreau", "Khan"]
+
+def generate_synthetic_data(conn, products=10_000, categories=50, customers=1_000,
+                            purchases=10_000, movements=10_000, items_per_purchase=4,
+                            start="2023-01-01", end="2024-12-31", seed=42):
+    """
+    Add a large random but reproducible data set to a migrated database
+
+    Ids are assigned here from the current MAX(id), so the same seed on the
+    same database always gives the same rows. Purchases are spread evenly
+    over [start, end] in date order and the customers' loyalty points and
+    totals follow their purchases. Everything goes through a BulkLoader (see
+    src.database.bulk_load), which also brings the search index, dashboard
+    aggregates and sales rollups up to date at the end. When the stock
+    ledger exists every purchase line is a SALE movement, the random
+    movements are deliveries and write-offs, and each new product gets the
+    opening balance that makes its quantity the sum of its movements.
+
+    Args:
+        conn: Open database connection, not inside a transaction
+        products, categories, customers, purchases, movements (int): Rows to add
+        items_per_purchase (int): Average detail lines per purchase
+        start, end (str): First and last day of the purchases and movements
+        seed (int): Random seed
+
+    Returns:
+        dict: Rows added per table
+    """
+    from src.database.bulk_load import BulkLoader
+    from src.database.stock_ledger import IN, OUT, OPENING, record_sales_from
+
+    rng = random.Random(seed)
+    cursor = conn.cursor()
+    first_day = date.fromisoformat(start)
+    span_seconds = ((date.fromisoformat(end) - first_day).days + 1) * 86400
+    first_moment = datetime.combine(first_day, datetime.min.time())
+
+    def moment(offset):
+        return (first_moment + timedelta(seconds=offset)).strftime("%Y-%m-%d %H:%M:%S")
+
+    has_cost = "cost_price" in _columns(cursor, "products")
+    has_unit_cost = "unit_cost" in _columns(cursor, "purchase_details")
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stock_movements'")
+    has_movements = cursor.fetchone() is not None
+
+    with BulkLoader(conn) as loader:
+        category_start = loader.next_id("category")
+        category_ids = list(range(category_start, category_start + categories))
+        loader.insert("category", ["id", "name", "description", "created_by"], (
+            (category_id, f"Generated Category {category_id}", f"{rng.choice(PRODUCT_WORDS)} range", 1)
+            for category_id in category_ids
+        ))
+        category_ids = category_ids or [None]
+
+        product_start = loader.next_id("products")
+        catalog = []  # (id, price, cost price)
+
+        def product_rows():
+            for product_id in range(product_start, product_start + products):
+                words = rng.sample(PRODUCT_WORDS, 3)
+                price = round(rng.uniform(1, 500), 2)
+                cost_price = round(price * rng.uniform(0.4, 0.8), 2)
+                catalog.append((product_id, price, cost_price if has_cost else None))
+                row = (
+                    product_id,
+                    f"GEN{product_id:07d}",
+                    f"{words[0]} {words[1]} - {rng.randint(1, 99)}{rng.choice(['mm', 'in', 'pc', 'V'])}",
+                    f"{words[2]} series",
+                    price,
+                    rng.randint(0, 200),
+                    rng.randint(1, 30),
+                    rng.choice(category_ids),
+                    1,
+                )
+                yield row + (cost_price,) if has_cost else row
+
+        loader.insert(
+            "products",
+            ["id", "reference", "name", "description", "price", "quantity", "min_quantity",
+             "category_id", "created_by"] + (["cost_price"] if has_cost else []),
+            product_rows(),
+        )
+        if not catalog:
+            cursor.execute("SELECT id, price, cost_price FROM products" if has_cost
+                           else "SELECT id, price, NULL FROM products")
+            catalog = cursor.fetchall()
+
+        customer_start = loader.next_id("users")
+        customer_ids = list(range(customer_start, customer_start + customers))
+        loader.insert("users", ["id", "name", "phone", "email", "created_by"], (
+            (customer_id,
+             f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {customer_id}",
+             f"555-{customer_id % 10000:04d}",
+             f"customer{customer_id}@email.com",
+             1)
+            for customer_id in customer_ids
+        ))
+        if not customer_ids:
+            cursor.execute("SELECT id FROM users")
+            customer_ids = [row[0] for row in cursor.fetchall()]
+
+        purchase_start = loader.next_id("purchases")
+        if purchases and catalog and customer_ids:
+            # Sorted offsets so purchase ids follow their dates, as at a real till
+            offsets = sorted(rng.randrange(span_seconds) for _ in range(purchases))
+            spent = {}  # customer id -> (points, total)
+            for batch_start in range(0, purchases, loader.batch_size):
+                purchase_rows, detail_rows = [], []
+                for index in range(batch_start, min(batch_start + loader.batch_size, purchases)):
+                    purchase_id = purchase_start + index
+                    total = 0.0
+                    for product_id, price, cost_price in rng.sample(
+                            catalog, min(len(catalog), rng.randint(1, 2 * items_per_purchase - 1))):
+                        quantity = rng.randint(1, 5)
+                        total += quantity * price
+                        row = (purchase_id, product_id, quantity, price, quantity * price)
+                        detail_rows.append(row + (cost_price,) if has_unit_cost else row)
+                    customer_id = rng.choice(customer_ids)
+                    points = int(total / 10)
+                    old_points, old_total = spent.get(customer_id, (0, 0.0))
+                    spent[customer_id] = (old_points + points, old_total + total)
+                    purchase_rows.append((purchase_id, customer_id, total, points, 1, moment(offsets[index])))
+                loader.insert(
+                    "purchases",
+                    ["id", "user_id", "total_amount", "points_earned", "created_by", "created_at"],
+                    purchase_rows,
+                )
+                loader.insert(
+                    "purchase_details",
+                    ["purchase_id", "product_id", "quantity", "unit_price", "total_price"]
+                    + (["unit_cost"] if has_unit_cost else []),
+                    detail_rows,
+                )
+            cursor.executemany("""
+                UPDATE users SET loyalty_points = loyalty_points + ?, total_spent = total_spent + ? WHERE id = ?
+            """, ((points, total, customer_id) for customer_id, (points, total) in spent.items()))
+            conn.commit()
+
+        if has_movements:
+            first_movement = loader.next_id("stock_movements")
+            record_sales_from(cursor, purchase_start)
+
+            # Three deliveries for every write-off; dates are days, as the stock forms enter them
+            def movement_rows():
+                for _ in range(movements if catalog else 0):
+                    movement_type = rng.choice([IN, IN, IN, OUT])
+                    quantity = rng.randint(1, 50)
+                    yield (rng.choice(catalog)[0], quantity if movement_type == IN else -quantity,
+                           movement_type, moment(rng.randrange(span_seconds))[:10],
+                           "Delivery" if movement_type == IN else "Damaged")
+
+            loader.insert("stock_movements", ["product_id", "quantity_change", "movement_type", "date", "note"],
+                          movement_rows())
+
+            # New products open with what keeps their generated quantity, or with
+            # nothing when their sales were larger; then quantities follow the ledger
+            cursor.execute(f"""
+                INSERT INTO stock_movements (product_id, quantity_change, movement_type, date, note)
+                SELECT p.id, MAX(p.quantity - COALESCE(SUM(m.quantity_change), 0), 0),
+                       '{OPENING}', date(:start, '-1 day'), 'Opening balance'
+                FROM products p
+                LEFT JOIN stock_movements m ON m.product_id = p.id
+                WHERE p.id >= :first_product
+                GROUP BY p.id
+                HAVING MAX(p.quantity - COALESCE(SUM(m.quantity_change), 0), 0) != 0
+            """, {'start': start, 'first_product': product_start})
+            cursor.execute("""
+                UPDATE products SET quantity = l.quantity
+                FROM (
+                    SELECT product_id, SUM(quantity_change) AS quantity
+                    FROM stock_movements
+                    WHERE product_id IN (SELECT product_id FROM stock_movements WHERE id >= ?)
+                    GROUP BY product_id
+                ) l
+                WHERE l.product_id = products.id AND products.quantity != l.quantity
+            """, (first_movement,))
+            conn.commit()
+            loader.counts["stock_movements"] = conn.execute(
+                "SELECT COUNT(*) FROM stock_movements WHERE id >= ?", (first_movement,)
+            ).fetchone()[0]
+
+    return {table: loader.counts.get(table, 0)
+            for table in ("category", "products", "users", "purchases", "purchase_details", "stock_movements")}
+
+
 def seed_database():
     """Main function to seed all tables"""
     conn = get_db_connection()
@@ -373,6 +593,7 @@ def seed_database():
         seed_admin(cursor)
         category_map = seed_categories(cursor)
         product_map = seed_products(cursor, category_map)
+        seed_opening_balances(cursor)
         user_map = seed_users(cursor)
         seed_purchases(cursor, user_map, product_map)
 
@@ -386,5 +607,44 @@ def seed_database():
         conn.close()
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Seed the database with sample or generated data")
+    parser.add_argument("--synthetic", action="store_true",
+                        help="add a generated data set instead of the hand-written samples")
+    parser.add_argument("--database", default=DB_FILE, help="database file to fill")
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--customers", type=int, default=1_000)
+    parser.add_argument("--purchases", type=int, default=10_000)
+    parser.add_argument("--movements", type=int, default=10_000)
+    parser.add_argument("--start", default="2023-01-01", help="first day of the generated history")
+    parser.add_argument("--end", default="2024-12-31", help="last day of the generated history")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if not args.synthetic:
+        seed_database()
+        return
+
+    from src.database.db_config import create_tables
+    from src.database.migrations import migrate
+
+    conn = sqlite3.connect(args.database)
+    try:
+        # A new file gets the base schema first, the migrations build on it
+        create_tables(conn)
+        migrate(conn)
+        counts = generate_synthetic_data(
+            conn, args.products, args.categories, args.customers, args.purchases,
+            args.movements, start=args.start, end=args.end, seed=args.seed,
+        )
+        print("Generated " + ", ".join(f"{count} {table}" for table, count in counts.items()))
+    except sqlite3.Error as err:
+        print(f"Error generating data: {err}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+
 if __name__ == "__main__":
-    seed_database()
+    main()
@@ -0,0 +1,619 @@
+"""Append-only stock ledger
+
+Every change to products.quantity is also a row of stock_movements, in the
+same transaction: deliveries and write-offs from the stock forms, sales from
+checkout, edits of the product form and the opening balance of products
+created with stock. quantity_change is signed (negative for stock leaving)
+and date is the business day of the movement, which the stock forms let
+users backdate. Days are UTC days, like CURRENT_TIMESTAMP, the sales
+rollups and the purchase history, so a sale near midnight falls on the same
+day in the ledger and in the sales reports. Triggers reject updates and
+deletes, so the ledger only grows; a wrong movement is corrected by another
+one.
+
+Replaying the whole log for a stock level gets slower with every sale, so
+take_snapshots() stores each product's level at the end of a day in
+stock_snapshots, and a level is the latest snapshot plus the movements dated
+after it. A trigger adds backdated movements to the snapshots after their
+date, so a snapshot is never stale. Take snapshots from a scheduler, e.g.
+nightly, and check the ledger against products.quantity the same way:
+
+    python -m src.database.stock_ledger snapshot
+    python -m src.database.stock_ledger check
+
+Stock as of a past moment comes from monthly checkpoints: close_months()
+stores every product's quantity at the end of each finished month in
+stock_checkpoints, with its cost and price at the time of closing. The
+inventory at any moment is then one query over the catalog (see
+inventory_as_of): the checkpoint closing its month less the movements after
+it, valued at the prices of that close. While the month is still open the
+current quantities and prices stand in for the checkpoint, which
+check_stock_ledger() keeps honest. Like the snapshots, the checkpoints
+follow backdated movements through a trigger. Close the finished months
+from the same scheduler:
+
+    python -m src.database.stock_ledger close
+"""
+import argparse
+import calendar
+import sqlite3
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+# movement_type values
+OPENING, IN, OUT, SALE, ADJUST = "OPENING", "IN", "OUT", "SALE", "ADJUST"
+MOVEMENT_TYPES = [OPENING, IN, OUT, SALE, ADJUST]
+
+# Today's date for movements entered without one, a UTC day like every ledger date
+TODAY = "date('now')"
+
+# Per product: (product id, day of its latest snapshot on or before :day, quantity then)
+LATEST_SNAPSHOTS = """
+    SELECT product_id, MAX(day) AS day, quantity
+    FROM stock_snapshots
+    WHERE day <= :day
+    GROUP BY product_id
+"""
+
+# Per product: quantity at the end of :day, from the latest snapshot and the movements after it
+STOCK_LEVELS = f"""
+    SELECT p.id AS product_id,
+           COALESCE(s.quantity, 0) + COALESCE((
+               SELECT SUM(m.quantity_change)
+               FROM stock_movements m
+               WHERE m.product_id = p.id AND m.date > COALESCE(s.day, '') AND m.date <= :day
+           ), 0) AS quantity
+    FROM products p
+    LEFT JOIN ({LATEST_SNAPSHOTS}) s ON s.product_id = p.id
+"""
+
+# One product's quantity at the end of :day, from its latest snapshot and the movements after it
+STOCK_LEVEL = """
+    SELECT COALESCE(s.quantity, 0) + COALESCE((
+        SELECT SUM(m.quantity_change)
+        FROM stock_movements m
+        WHERE m.product_id = :product_id AND m.date > COALESCE(s.day, '') AND m.date <= :day
+    ), 0)
+    FROM (SELECT 1)
+    LEFT JOIN (
+        SELECT day, quantity FROM stock_snapshots
+        WHERE product_id = :product_id AND day <= :day
+        ORDER BY day DESC LIMIT 1
+    ) s
+"""
+
+# Columns of a stock movement row, in stock table order
+MOVEMENT_COLUMNS = [
+    "sm.id",
+    "p.reference",
+    "p.name",
+    "sm.quantity_change",
+    "sm.movement_type",
+    "sm.date",
+    "sm.note",
+    "p.quantity AS current_stock",
+]
+MOVEMENT_SOURCE = "stock_movements sm JOIN products p ON sm.product_id = p.id"
+
+# Stock table column -> ORDER BY expression
+MOVEMENT_SORT_COLUMNS = {
+    'ID': 'sm.id',
+    'Reference': 'p.reference',
+    'Product': 'p.name',
+    'Quantity Change': 'sm.quantity_change',
+    'Type': 'sm.movement_type',
+    'Date': 'sm.date',
+    'Note': "COALESCE(sm.note, '')",
+    'Current Stock': 'p.quantity',
+}
+
+# Bound used for "every movement", dates entered in the future included
+LAST_DAY = "9999-12-31"
+
+# Per product: the movements after :day, or after :moment on :day, up to :last
+MOVEMENTS_AFTER = """
+    SELECT product_id, SUM(quantity_change) AS change
+    FROM stock_movements
+    WHERE date >= :day AND date <= :last AND ({after})
+    GROUP BY product_id
+"""
+
+# Per product: (product id, reference, name, quantity, unit cost, unit price)
+# at a moment in a closed month, from the checkpoint closing it (:last) ...
+CLOSED_MONTH_INVENTORY = """
+    SELECT c.product_id, p.reference, p.name,
+           c.quantity - COALESCE(t.change, 0) AS quantity, c.unit_cost, c.unit_price
+    FROM stock_checkpoints c
+    JOIN products p ON p.id = c.product_id
+    LEFT JOIN ({movements}) t ON t.product_id = c.product_id
+    WHERE c.month_end = :last
+"""
+
+# ... or at a moment in the open month, from the current quantities and prices
+OPEN_MONTH_INVENTORY = """
+    SELECT p.id AS product_id, p.reference, p.name,
+           p.quantity - COALESCE(t.change, 0) AS quantity,
+           p.cost_price AS unit_cost, p.price AS unit_price
+    FROM products p
+    LEFT JOIN ({movements}) t ON t.product_id = p.id
+"""
+
+
+def create_stock_ledger(cursor):
+    """Create stock_movements and stock_snapshots and open every product's balance (used by the migrations)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stock_movements (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_id INTEGER NOT NULL,
+            quantity_change INTEGER NOT NULL,
+            movement_type TEXT NOT NULL,
+            date TEXT NOT NULL,
+            note TEXT,
+            purchase_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (product_id) REFERENCES products (id),
+            FOREIGN KEY (purchase_id) REFERENCES purchases (id)
+        )
+    """)
+    # A product's movements by day: stock levels, snapshots and the product filter
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_stock_movements_product_date
+        ON stock_movements (product_id, date)
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_stock_movements_date ON stock_movements (date)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stock_snapshots (
+            product_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            PRIMARY KEY (product_id, day)
+        ) WITHOUT ROWID
+    """)
+    _create_append_only_triggers(cursor)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_stock_movements_snapshots AFTER INSERT ON stock_movements
+        BEGIN
+            UPDATE stock_snapshots SET quantity = quantity + NEW.quantity_change
+            WHERE product_id = NEW.product_id AND day >= NEW.date;
+        END
+    """)
+    record_opening_balances(cursor)
+
+
+def _create_append_only_triggers(cursor):
+    for event in ("UPDATE", "DELETE"):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_stock_movements_no_{event.lower()}
+            BEFORE {event} ON stock_movements
+            BEGIN SELECT RAISE(ABORT, 'stock_movements is append-only'); END
+        """)
+
+
+def create_stock_checkpoints(cursor):
+    """Create the monthly checkpoint tables and close the finished months (used by the migrations)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stock_checkpoint_months (
+            month_end TEXT PRIMARY KEY,
+            closed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # Month first, so a month's checkpoints of the whole catalog are one range
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stock_checkpoints (
+            month_end TEXT NOT NULL,
+            product_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            unit_cost REAL,
+            unit_price REAL NOT NULL,
+            PRIMARY KEY (month_end, product_id)
+        ) WITHOUT ROWID
+    """)
+    # A product's checkpoints, for the trigger
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_stock_checkpoints_product
+        ON stock_checkpoints (product_id, month_end)
+    """)
+    # A backdated movement changes every closed month from its date on; a
+    # product created after a close gets its row in that month first
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_stock_movements_checkpoints AFTER INSERT ON stock_movements
+        BEGIN
+            INSERT OR IGNORE INTO stock_checkpoints (month_end, product_id, quantity, unit_cost, unit_price)
+            SELECT m.month_end, p.id, 0, p.cost_price, p.price
+            FROM stock_checkpoint_months m
+            JOIN products p ON p.id = NEW.product_id
+            WHERE m.month_end >= NEW.date;
+            UPDATE stock_checkpoints SET quantity = quantity + NEW.quantity_change
+            WHERE product_id = NEW.product_id AND month_end >= NEW.date;
+        END
+    """)
+    _close_months(cursor, _last_finished_month())
+
+
+def date_sales_by_utc_day(cursor):
+    """Move SALE movements dated by the local day of their purchase to its UTC day (used by the migrations)"""
+    cursor.execute("""
+        CREATE TEMP TABLE redated_sales AS
+        SELECT m.id, m.product_id, m.quantity_change AS change, m.date AS old, date(p.created_at) AS new
+        FROM stock_movements m
+        JOIN purchases p ON p.id = m.purchase_id
+        WHERE m.movement_type = ? AND m.date != date(p.created_at)
+    """, (SALE,))
+    # The snapshots and checkpoints between the two days counted the movement
+    # on the wrong side of it
+    for table, day in (("stock_snapshots", "day"), ("stock_checkpoints", "month_end")):
+        cursor.execute(f"""
+            UPDATE {table}
+            SET quantity = quantity + (
+                SELECT COALESCE(SUM(CASE WHEN r.new <= {table}.{day} AND {table}.{day} < r.old THEN r.change
+                                         WHEN r.old <= {table}.{day} AND {table}.{day} < r.new THEN -r.change
+                                         ELSE 0 END), 0)
+                FROM temp.redated_sales r WHERE r.product_id = {table}.product_id
+            )
+            WHERE product_id IN (SELECT product_id FROM temp.redated_sales)
+        """)
+    # The one rewrite of the ledger, so its guard is lifted for it
+    cursor.execute("DROP TRIGGER IF EXISTS trg_stock_movements_no_update")
+    cursor.execute("""
+        UPDATE stock_movements SET date = (SELECT r.new FROM temp.redated_sales r WHERE r.id = stock_movements.id)
+        WHERE id IN (SELECT id FROM temp.redated_sales)
+    """)
+    _create_append_only_triggers(cursor)
+    cursor.execute("DROP TABLE temp.redated_sales")
+
+
+def _month_end(day):
+    """Last day of the month of a date"""
+    return day.replace(day=calendar.monthrange(day.year, day.month)[1])
+
+
+def _today():
+    """Today's UTC date"""
+    return datetime.now(timezone.utc).date()
+
+
+def _last_finished_month():
+    """Last day of the month before this one"""
+    return _today().replace(day=1) - timedelta(days=1)
+
+
+def _close_months(cursor, through):
+    """Checkpoint every month after the last closed one up to the month ending on or before through"""
+    last = cursor.execute("SELECT MAX(month_end) FROM stock_checkpoint_months").fetchone()[0]
+    if last:
+        month_end = _month_end(date.fromisoformat(last) + timedelta(days=1))
+    else:
+        first = cursor.execute("SELECT MIN(date) FROM stock_movements").fetchone()[0]
+        if first is None:
+            return []
+        month_end = _month_end(date.fromisoformat(first))
+
+    closed = []
+    while month_end <= through:
+        # The previous month's checkpoint plus this month's movements
+        cursor.execute("""
+            INSERT INTO stock_checkpoints (month_end, product_id, quantity, unit_cost, unit_price)
+            SELECT :month_end, p.id, COALESCE(b.quantity, 0) + COALESCE(t.change, 0), p.cost_price, p.price
+            FROM products p
+            LEFT JOIN stock_checkpoints b ON b.month_end = :previous AND b.product_id = p.id
+            LEFT JOIN (
+                SELECT product_id, SUM(quantity_change) AS change
+                FROM stock_movements
+                WHERE date > COALESCE(:previous, '') AND date <= :month_end
+                GROUP BY product_id
+            ) t ON t.product_id = p.id
+        """, {'month_end': month_end.isoformat(), 'previous': last})
+        cursor.execute("INSERT INTO stock_checkpoint_months (month_end) VALUES (?)", (month_end.isoformat(),))
+        last = month_end.isoformat()
+        closed.append(last)
+        month_end = _month_end(month_end + timedelta(days=1))
+    return closed
+
+
+def record_opening_balances(cursor, day=None):
+    """Give every product with stock and no movement yet an OPENING movement of its quantity
+
+    Used after products are created or loaded with a quantity; returns the
+    number of movements added.
+    """
+    cursor.execute(f"""
+        INSERT INTO stock_movements (product_id, quantity_change, movement_type, date, note)
+        SELECT p.id, p.quantity, '{OPENING}', COALESCE(?, {TODAY}), 'Opening balance'
+        FROM products p
+        WHERE p.quantity != 0
+          AND NOT EXISTS (SELECT 1 FROM stock_movements m WHERE m.product_id = p.id)
+    """, (day,))
+    return cursor.rowcount
+
+
+def record_movements(cursor, movements):
+    """Append (product id, quantity change, movement type, date, note) rows; None as date is today"""
+    cursor.executemany(f"""
+        INSERT INTO stock_movements (product_id, quantity_change, movement_type, date, note)
+        VALUES (?, ?, ?, COALESCE(?, {TODAY}), ?)
+    """, movements)
+
+
+def _sales_insert(where):
+    """INSERT of one SALE movement per product of the purchases matching where"""
+    return f"""
+        INSERT INTO stock_movements (product_id, quantity_change, movement_type, date, purchase_id)
+        SELECT d.product_id, -SUM(d.quantity), '{SALE}', date(p.created_at), p.id
+        FROM purchase_details d
+        JOIN purchases p ON p.id = d.purchase_id
+        {where}
+        GROUP BY p.id, d.product_id
+    """
+
+
+def record_sale(cursor, purchase_id):
+    """Append the SALE movements of a purchase, call it in the transaction that inserted its lines"""
+    cursor.execute(_sales_insert("WHERE d.purchase_id = ?"), (purchase_id,))
+
+
+def record_sales_from(cursor, first_purchase_id):
+    """Append the SALE movements of every purchase from first_purchase_id on, e.g. after a bulk load"""
+    cursor.execute(_sales_insert("WHERE p.id >= ?"), (first_purchase_id,))
+
+
+def take_snapshots(conn, day=None):
+    """
+    Store every product's stock level at the end of a day
+
+    Each level is the product's previous snapshot plus the movements between
+    the two days, so the cost is the tail since the last snapshot, not the
+    whole ledger.
+
+    Args:
+        conn: Open database connection, not inside a transaction
+        day (str): YYYY-MM-DD, default today
+
+    Returns:
+        dict: products snapshotted, day and seconds
+    """
+    start = time.perf_counter()
+    day = day or _today().isoformat()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(f"""
+            INSERT OR REPLACE INTO stock_snapshots (product_id, day, quantity)
+            SELECT product_id, :day, quantity FROM ({STOCK_LEVELS})
+        """, {'day': day})
+        count = cursor.rowcount
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    return {'products': count, 'day': day, 'seconds': time.perf_counter() - start}
+
+
+def stock_level(conn, product_id, day=None):
+    """A product's quantity at the end of day (YYYY-MM-DD), every movement when day is None"""
+    return conn.execute(STOCK_LEVEL, {'day': day or LAST_DAY, 'product_id': product_id}).fetchone()[0]
+
+
+def stock_levels(conn, day=None):
+    """{product id: quantity at the end of day}, every movement when day is None"""
+    return dict(conn.execute(STOCK_LEVELS, {'day': day or LAST_DAY}).fetchall())
+
+
+def replay_stock_levels(conn, day=None):
+    """stock_levels() summed over the whole ledger, to check and time the snapshots against"""
+    return dict(conn.execute("""
+        SELECT p.id, COALESCE(SUM(m.quantity_change), 0)
+        FROM products p
+        LEFT JOIN stock_movements m ON m.product_id = p.id AND m.date <= :day
+        GROUP BY p.id
+    """, {'day': day or LAST_DAY}).fetchall())
+
+
+def movement_conditions(filters):
+    """WHERE conditions and parameters for the stock movement filters"""
+    conditions = []
+    params = []
+    if filters:
+        if filters.get('product_id'):
+            conditions.append("p.id = ?")
+            params.append(filters['product_id'])
+
+        if filters.get('movement_type'):
+            conditions.append("sm.movement_type = ?")
+            params.append(filters['movement_type'])
+
+        if filters.get('date_from'):
+            conditions.append("sm.date >= ?")
+            params.append(filters['date_from'])
+
+        if filters.get('date_to'):
+            conditions.append("sm.date <= ?")
+            params.append(filters['date_to'])
+    return conditions, params
+
+
+def movements_pager(filters=None, sort='Date', reverse=True, conn=None):
+    """Pager over the stock movements ordered by one of MOVEMENT_SORT_COLUMNS, newest first by default"""
+    # db_config imports the migrations, which import this module
+    from src.database.paging import KeysetPager
+
+    conditions, params = movement_conditions(filters)
+    return KeysetPager(
+        MOVEMENT_COLUMNS,
+        MOVEMENT_SOURCE,
+        where=" AND ".join(conditions) or None,
+        params=params,
+        key="sm.id",
+        sort_columns=MOVEMENT_SORT_COLUMNS,
+        sort=sort,
+        reverse=reverse,
+        conn=conn,
+    )
+
+
+def close_months(conn, through=None):
+    """
+    Store every product's quantity, cost and price at the end of each finished month
+
+    Months are closed in order from the month after the last closed one (the
+    month of the first movement on a new database), each from the previous
+    checkpoint plus its own movements.
+
+    Args:
+        conn: Open database connection, not inside a transaction
+        through (str): YYYY-MM-DD, months ending after it stay open; default
+            the end of last month
+
+    Returns:
+        dict: months closed (their last days) and seconds
+    """
+    start = time.perf_counter()
+    through = date.fromisoformat(through) if through else _last_finished_month()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        closed = _close_months(cursor, through)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    return {'months': closed, 'seconds': time.perf_counter() - start}
+
+
+def _inventory_query(conn, moment):
+    """(catalog query, parameters) of the inventory at a date, datetime, their ISO text or None for now"""
+    if moment is None:
+        moment = datetime.now(timezone.utc)
+    elif isinstance(moment, str):
+        moment = date.fromisoformat(moment) if len(moment) == 10 else datetime.fromisoformat(moment)
+    if isinstance(moment, datetime):
+        # A naive moment is local time; the movement dates and created_at are UTC
+        moment = moment.astimezone(timezone.utc)
+        params = {'day': moment.date().isoformat(), 'moment': moment.strftime("%Y-%m-%d %H:%M:%S")}
+        after = "date > :day OR created_at > :moment"
+    else:
+        # A date means the end of that day
+        params = {'day': moment.isoformat(), 'moment': None}
+        after = "date > :day"
+
+    close = conn.execute(
+        "SELECT MIN(month_end) FROM stock_checkpoint_months WHERE month_end >= ?", (params['day'],)
+    ).fetchone()[0]
+    if close:
+        query = CLOSED_MONTH_INVENTORY
+        params['last'] = close
+    else:
+        query = OPEN_MONTH_INVENTORY
+        params['last'] = LAST_DAY
+    return query.format(movements=MOVEMENTS_AFTER.format(after=after)), params
+
+
+def inventory_as_of(conn, moment=None, in_stock=False):
+    """
+    Quantity and value of every product at a moment, in one query
+
+    Args:
+        conn: Open database connection
+        moment: date (end of that UTC day), datetime (naive ones are local
+            time), their ISO text, or None for now
+        in_stock (bool): Leave out the products with no stock then
+
+    Returns:
+        list: (product id, reference, name, quantity, unit cost, unit price,
+        value at cost, value at price) by product id; the value at cost is
+        None for products without a cost price
+    """
+    inventory, params = _inventory_query(conn, moment)
+    query = f"""
+        SELECT product_id, reference, name, quantity, unit_cost, unit_price,
+               quantity * unit_cost, quantity * unit_price
+        FROM ({inventory})
+    """
+    if in_stock:
+        query += " WHERE quantity != 0"
+    return conn.execute(query + " ORDER BY product_id", params).fetchall()
+
+
+def inventory_valuation(conn, moment=None):
+    """
+    Totals of inventory_as_of() computed in the database
+
+    Returns:
+        dict: products (with stock), units, cost_value (of the products
+        with a cost price), retail_value and the day
+    """
+    inventory, params = _inventory_query(conn, moment)
+    row = conn.execute(f"""
+        SELECT COUNT(*), COALESCE(SUM(quantity), 0),
+               COALESCE(SUM(quantity * unit_cost), 0), COALESCE(SUM(quantity * unit_price), 0)
+        FROM ({inventory})
+        WHERE quantity != 0
+    """, params).fetchone()
+    return {
+        'products': row[0],
+        'units': row[1],
+        'cost_value': row[2],
+        'retail_value': row[3],
+        'day': params['day'],
+    }
+
+
+def check_stock_ledger(conn, replay=False):
+    """
+    Products whose quantity disagrees with the ledger, in one query
+
+    Args:
+        conn: Open database connection
+        replay (bool): Sum every movement instead of starting from the
+            snapshots, which also checks the snapshots
+
+    Returns:
+        list: (product id, reference, products.quantity, ledger quantity)
+    """
+    if replay:
+        levels = """
+            SELECT p.id AS product_id, COALESCE(SUM(m.quantity_change), 0) AS quantity
+            FROM products p
+            LEFT JOIN stock_movements m ON m.product_id = p.id
+            GROUP BY p.id
+        """
+    else:
+        levels = STOCK_LEVELS
+    return conn.execute(f"""
+        SELECT p.id, p.reference, p.quantity, l.quantity
+        FROM products p
+        JOIN ({levels}) l ON l.product_id = p.id
+        WHERE p.quantity != l.quantity
+        ORDER BY p.id
+    """, {'day': LAST_DAY}).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stock ledger snapshots, month closing and consistency check")
+    parser.add_argument("command", choices=["snapshot", "close", "check"])
+    parser.add_argument("--day", help="snapshot day, or last day to close months through (YYYY-MM-DD)")
+    parser.add_argument("--replay", action="store_true", help="check against the whole ledger, snapshots included")
+    args = parser.parse_args()
+
+    # db_config imports the migrations, which import this module
+    from src.database.db_config import db_connection
+    with db_connection() as conn:
+        if args.command == "snapshot":
+            result = take_snapshots(conn, args.day)
+            print(f"Snapshot of {result['products']} products for {result['day']} in {result['seconds']:.2f}s")
+            return
+        if args.command == "close":
+            result = close_months(conn, args.day)
+            months = ", ".join(result['months']) or "none"
+            print(f"Closed months ending {months} in {result['seconds']:.2f}s")
+            return
+        mismatches = check_stock_ledger(conn, args.replay)
+    for product_id, reference, quantity, ledger in mismatches:
+        print(f"{reference} (id {product_id}): quantity {quantity}, ledger {ledger}")
+    if mismatches:
+        sys.exit(1)
+    print("Every product's quantity matches the stock ledger")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import os
+
+# Environment variable selecting the storage profile (e.g. STORE_DB_PROFILE=back-office)
+STORAGE_PROFILE_ENV = "STORE_DB_PROFILE"
+DEFAULT_STORAGE_PROFILE = "till"
+
+# PRAGMAs applied to every pooled connection. All profiles use WAL so a
+# checkout commit never blocks readers; they differ in durability and memory.
+# busy_timeout comes first so switching to WAL can wait for other tills, and
+# cache_size is negative to mean KiB rather than pages.
+STORAGE_PROFILES = {
+    # Point-of-sale terminal: low latency commits, modest memory footprint.
+    # synchronous=NORMAL in WAL mode only fsyncs at checkpoints and stays
+    # corruption-safe; a power cut can at worst lose the last few commits.
+    "till": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    # Reporting and catalogue maintenance: larger caches for scans, full
+    # durability since commits are rare.
+    "back-office": {
+        "busy_timeout": 10000,
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    # Seeding and imports: durability traded for throughput, re-run on failure
+    "bulk-import": {
+        "busy_timeout": 30000,
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -256000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def get_storage_profile(name=None):
+    """Resolve a profile name (argument, then environment, then default) to its PRAGMAs"""
+    name = name or os.environ.get(STORAGE_PROFILE_ENV) or DEFAULT_STORAGE_PROFILE
+    if name not in STORAGE_PROFILES:
+        raise ValueError(
+            f"Unknown storage profile '{name}', expected one of: {', '.join(STORAGE_PROFILES)}"
+        )
+    return name, STORAGE_PROFILES[name]
+
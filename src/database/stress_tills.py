@@ -0,0 +1,182 @@
+"""Multi-till checkout stress test
+
+Runs several till processes against one copy of the database, each
+reserving and selling random carts of a few scarce products to a small
+set of shared buyers, then checks nothing was oversold, no loyalty
+update was lost and the daily sales rollups match the sales:
+
+    python -m src.database.stress_tills --tills 4 --carts 200
+
+Exits with status 1 when a check fails.
+"""
+import argparse
+import multiprocessing
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from src.database import checkout, sales_analytics, stock_ledger
+from src.database.benchmark import copy_database
+from src.database.migrations import migrate
+from src.database.storage_profiles import STORAGE_PROFILES
+
+BUYERS = [f"Stress Buyer {n}" for n in range(5)]
+
+
+def connect(path):
+    """Open the test database with the till pragmas"""
+    conn = sqlite3.connect(path)
+    for pragma, value in STORAGE_PROFILES["till"].items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+    return conn
+
+
+def run_till(path, till_number, carts, products, seed):
+    """One till: reserve a cart, then sell it or (sometimes) cancel it; returns counters"""
+    rng = random.Random(seed + till_number)
+    till_id = f"stress-till-{till_number}"
+    conn = connect(path)
+    counts = {'sold': 0, 'conflicts': 0, 'cancelled': 0, 'busy': 0}
+    for _ in range(carts):
+        items = [
+            {'id': product_id, 'name': name, 'price': price, 'quantity': rng.randint(1, 3)}
+            for product_id, name, price in rng.sample(products, rng.randint(1, 3))
+        ]
+        try:
+            checkout.reserve_cart(conn, items, till_id=till_id)
+            if rng.random() < 0.1:
+                checkout.release_stock(conn, till_id=till_id)
+                counts['cancelled'] += 1
+                continue
+            checkout.commit_cart(conn, rng.choice(BUYERS), items, till_id=till_id)
+            counts['sold'] += 1
+        except checkout.StockConflictError:
+            counts['conflicts'] += 1
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            counts['busy'] += 1
+    checkout.release_stock(conn, till_id=till_id)
+    conn.close()
+    return counts
+
+
+def snapshot(conn, product_ids):
+    """Stock of the given products and (loyalty_points, total_spent) of the stress buyers"""
+    placeholders = ", ".join("?" * len(product_ids))
+    stock = dict(conn.execute(f"SELECT id, quantity FROM products WHERE id IN ({placeholders})", product_ids))
+    placeholders = ", ".join("?" * len(BUYERS))
+    buyers = {
+        name: (points or 0, spent or 0)
+        for name, points, spent in conn.execute(
+            f"SELECT name, loyalty_points, total_spent FROM users WHERE name IN ({placeholders})", BUYERS
+        )
+    }
+    return stock, buyers
+
+
+def check(conn, before, after, product_ids, first_purchase):
+    """List of problems found comparing the snapshots with the recorded purchases"""
+    problems = []
+    stock_before, buyers_before = before
+    stock_after, buyers_after = after
+
+    sold = dict(conn.execute("""
+        SELECT product_id, SUM(quantity) FROM purchase_details
+        WHERE purchase_id > ? GROUP BY product_id
+    """, (first_purchase,)))
+    for product_id in product_ids:
+        if stock_after[product_id] < 0:
+            problems.append(f"product {product_id} oversold: {stock_after[product_id]} left")
+        taken = stock_before[product_id] - stock_after[product_id]
+        if taken != sold.get(product_id, 0):
+            problems.append(f"product {product_id}: stock fell by {taken} but {sold.get(product_id, 0)} were sold")
+
+    recorded = {
+        name: (points, spent)
+        for name, points, spent in conn.execute(f"""
+            SELECT u.name, SUM(p.points_earned), SUM(p.total_amount)
+            FROM purchases p JOIN users u ON u.id = p.user_id
+            WHERE p.id > ? AND u.name IN ({", ".join("?" * len(BUYERS))})
+            GROUP BY u.name
+        """, (first_purchase, *BUYERS))
+    }
+    for name in BUYERS:
+        points, spent = recorded.get(name, (0, 0))
+        old_points, old_spent = buyers_before.get(name, (0, 0))
+        new_points, new_spent = buyers_after.get(name, (0, 0))
+        if new_points - old_points != points:
+            problems.append(f"{name}: points rose by {new_points - old_points}, purchases earned {points}")
+        if abs((new_spent - old_spent) - spent) > 0.005:
+            problems.append(f"{name}: total_spent rose by {new_spent - old_spent:.2f}, purchases total {spent:.2f}")
+
+    leftover = conn.execute("SELECT COUNT(*) FROM stock_reservations").fetchone()[0]
+    if leftover:
+        problems.append(f"{leftover} reservations left after every till finished")
+
+    for day, expected, actual in sales_analytics.check_sales_rollups(conn):
+        problems.append(f"sales rollup for {day} is {actual}, purchase_details give {expected}")
+
+    for product_id, reference, quantity, ledger in stock_ledger.check_stock_ledger(conn):
+        problems.append(f"product {product_id}: quantity {quantity} but the stock ledger gives {ledger}")
+    return problems
+
+
+def stress(tills=4, carts=200, products=8, stock=60, seed=42):
+    """Run the tills on a database copy, returns (till counters, problems, seconds)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = copy_database(tmp, "stress.db")
+        conn = connect(path)
+        migrate(conn)
+        # A few scarce products so the tills fight over them
+        rows = conn.execute("SELECT id, name, price FROM products ORDER BY id LIMIT ?", (products,)).fetchall()
+        product_ids = [row[0] for row in rows]
+        # Set through the ledger so the stock check at the end starts from a match
+        stock_ledger.record_movements(conn.cursor(), [
+            (product_id, stock - quantity, stock_ledger.ADJUST, None, "Stress test stock")
+            for product_id, quantity in conn.execute(
+                f"SELECT id, quantity FROM products WHERE id IN ({', '.join('?' * len(product_ids))})", product_ids)
+        ])
+        conn.executemany("UPDATE products SET quantity = ? WHERE id = ?", [(stock, pid) for pid in product_ids])
+        conn.execute("DELETE FROM stock_reservations")
+        conn.commit()
+        first_purchase = conn.execute("SELECT COALESCE(MAX(id), 0) FROM purchases").fetchone()[0]
+        before = snapshot(conn, product_ids)
+
+        start = time.perf_counter()
+        with multiprocessing.Pool(tills) as pool:
+            counts = pool.starmap(run_till, [(path, n, carts, rows, seed) for n in range(tills)])
+        elapsed = time.perf_counter() - start
+
+        after = snapshot(conn, product_ids)
+        problems = check(conn, before, after, product_ids, first_purchase)
+        conn.close()
+    return counts, problems, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress test checkout with several tills")
+    parser.add_argument("--tills", type=int, default=4, help="till processes")
+    parser.add_argument("--carts", type=int, default=200, help="carts per till")
+    parser.add_argument("--products", type=int, default=8, help="products the tills share")
+    parser.add_argument("--stock", type=int, default=60, help="starting stock of each product")
+    args = parser.parse_args()
+
+    counts, problems, elapsed = stress(args.tills, args.carts, args.products, args.stock)
+    for number, till in enumerate(counts):
+        print(f"till {number}: {till['sold']} sold, {till['conflicts']} out of stock, "
+              f"{till['cancelled']} cancelled, {till['busy']} busy")
+    print(f"{args.tills * args.carts} carts in {elapsed:.2f}s")
+
+    if problems:
+        print("FAILED")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
+    print("OK: no oversold stock, stock matches sales, every loyalty update and sale counted")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundRunner:
+    """Runs work on a worker thread and hands results back on the Tk thread
+
+    Tk widgets may only be touched from the main loop, so finished jobs are
+    queued and drained with after(). Jobs are grouped by key and only the
+    newest job of a key counts: older ones are skipped if they have not
+    started, told to stop through their cancelled() callable, and their
+    results are dropped.
+    """
+
+    def __init__(self, widget, poll_interval=15, name="background"):
+        self.widget = widget
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._results = queue.Queue()
+        self._generations = {}  # key -> generation of the newest job
+        self._pending = 0
+        self._poll_id = None
+
+    def submit(self, key, work, on_result, on_error=None):
+        """Run work(cancelled) on the worker thread, then on_result(value) on the Tk thread
+
+        cancelled() returns True once a newer job with the same key was
+        submitted, long-running work should check it and give up early.
+        """
+        generation = self._generations.get(key, 0) + 1
+        self._generations[key] = generation
+
+        def cancelled():
+            return self._generations.get(key) != generation
+
+        def run():
+            if cancelled():
+                return None
+            return work(cancelled)
+
+        future = self._executor.submit(run)
+        future.add_done_callback(
+            lambda f: self._results.put((key, generation, f, on_result, on_error))
+        )
+        self._pending += 1
+        self._schedule_poll()
+
+    def cancel(self, key):
+        """Discard the current job of a key"""
+        self._generations[key] = self._generations.get(key, 0) + 1
+
+    def _schedule_poll(self):
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        """Deliver finished jobs on the Tk thread"""
+        self._poll_id = None
+        while True:
+            try:
+                key, generation, future, on_result, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if self._generations.get(key) != generation:
+                continue  # Superseded while running
+            error = future.exception()
+            if error is None:
+                on_result(future.result())
+            elif on_error:
+                on_error(error)
+        if self._pending > 0 and self.widget.winfo_exists():
+            self._schedule_poll()
+
+    def shutdown(self):
+        """Stop polling and let running work finish without delivering it"""
+        self._generations.clear()
+        if self._poll_id is not None:
+            self.widget.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
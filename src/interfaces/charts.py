@@ -0,0 +1,19 @@
+"""Chart helpers shared by the pages that draw matplotlib figures
+
+matplotlib is only imported once a chart is drawn, so it stays out of the
+application start.
+"""
+
+
+def new_figure(figsize=(6, 4)):
+    """Figure for a chart"""
+    from matplotlib.figure import Figure
+    return Figure(figsize=figsize)
+
+
+def draw_figure(fig, parent):
+    """Tk canvas showing a figure"""
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    canvas = FigureCanvasTkAgg(fig, parent)
+    canvas.draw()
+    return canvas
@@ -0,0 +1,114 @@
+"""Dashboard refresh benchmark and memory check
+
+Builds the dashboard on a copy of the database and refreshes it many
+times, changing one product's stock before each refresh so every refresh
+really reloads and redraws the cards, charts and low stock table. The
+loads run synchronously through the same load_changes()/on_refreshed()
+pair the background refresh uses. Fails when
+Python memory (tracemalloc), the Tk widget count or the chart artists grow
+between the first and the last refresh. Tk needs a display, on a headless
+machine run it under Xvfb:
+
+    xvfb-run python -m src.interfaces.dashboard_benchmark --refreshes 1000
+"""
+import argparse
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import customtkinter as ctk
+
+from src.database.benchmark import copy_database, summarize, print_results
+from src.database.db_config import db_connection, pool
+from src.pages.dashboard import DashboardFrame
+
+# Allowed Python memory growth over the whole run
+MEMORY_BUDGET_BYTES = 512 * 1024
+
+WARMUP_REFRESHES = 20
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def count_artists(frame):
+    """Artists on the dashboard's chart axes"""
+    return sum(
+        len(ax.get_children()) for ax in (frame.category_ax, frame.stock_ax)
+    ) + len(frame.category_figure.axes) + len(frame.stock_figure.axes)
+
+
+def check_refresh_memory(refreshes=1000):
+    """Refresh the dashboard repeatedly
+
+    Returns (timings, memory growth, widget growth, artist growth, refresh_stats()).
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        pool.db_file = copy_database(tmp)
+        pool.close_all()
+        root = ctk.CTk()
+        root.withdraw()
+        try:
+            frame = DashboardFrame(root)
+            frame.pack(fill="both", expand=True)
+            frame.stop_auto_refresh()  # Loads below run on this thread
+            with db_connection() as conn:
+                product_id = conn.execute("SELECT MIN(id) FROM products").fetchone()[0]
+
+            def changed_refresh(step):
+                # Alternate the stock so the numbers keep changing
+                with db_connection() as conn:
+                    conn.execute(
+                        "UPDATE products SET quantity = quantity + ? WHERE id = ?",
+                        (1 if step % 2 else -1, product_id),
+                    )
+                    conn.commit()
+                start = time.perf_counter()
+                frame.on_refreshed(frame.load_changes(None))
+                root.update()
+                return time.perf_counter() - start
+
+            for step in range(WARMUP_REFRESHES):
+                changed_refresh(step)
+            gc.collect()
+            tracemalloc.start()
+            memory_before = tracemalloc.get_traced_memory()[0]
+            widgets_before = count_widgets(root)
+            artists_before = count_artists(frame)
+
+            samples = [changed_refresh(step) for step in range(refreshes)]
+
+            gc.collect()
+            memory_growth = tracemalloc.get_traced_memory()[0] - memory_before
+            tracemalloc.stop()
+            widget_growth = count_widgets(root) - widgets_before
+            artist_growth = count_artists(frame) - artists_before
+            stats = frame.refresh_stats()
+        finally:
+            root.destroy()
+            pool.close_all()
+    return samples, memory_growth, widget_growth, artist_growth, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the dashboard repeatedly and check memory")
+    parser.add_argument("--refreshes", type=int, default=1000, help="refreshes to run")
+    args = parser.parse_args()
+
+    samples, memory_growth, widget_growth, artist_growth, stats = check_refresh_memory(args.refreshes)
+    print_results("Dashboard refresh latency", {"in place": summarize(samples)})
+    print(f"\nData loads: {stats['loads']}, mean {stats['mean_ms']:.2f} ms, max {stats['max_ms']:.2f} ms")
+    print(f"\nPython memory growth: {memory_growth / 1024:.1f} KiB, "
+          f"widgets: {widget_growth:+d}, chart artists: {artist_growth:+d}")
+
+    if memory_growth > MEMORY_BUDGET_BYTES or widget_growth > 0 or artist_growth > 0:
+        print("FAILED: the dashboard grows with every refresh")
+        sys.exit(1)
+    print("OK: no growth after the refreshes")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,31 @@
+import importlib
 import customtkinter as ctk
 from tkinter import messagebox
-from src.database.db_config import get_db_connection
+from src.database.db_config import db_connection, pool
+from src.interfaces.page_registry import PageRegistry
 
 # Import components
 from ..pages.sidebar import SidebarFrame
-from ..pages.product import ProductManagementFrame
-from ..pages.categories import CategoriesFrame
-from ..pages.dashboard import DashboardFrame
-from ..pages.checkout import CheckoutFrame
-from ..pages.admin import AdminFrame
-from ..pages.users import UsersFrame
+
+# Sidebar content type -> (module, page class); a page module is only
+# imported the first time its page is opened
+PAGE_CLASSES = {
+    "dashboard": ("src.pages.dashboard", "DashboardFrame"),
+    "products": ("src.pages.product", "ProductManagementFrame"),
+    "categories": ("src.pages.categories", "CategoriesFrame"),
+    "checkout": ("src.pages.checkout", "CheckoutFrame"),
+    "sales": ("src.pages.sales", "SalesFrame"),
+    "admin": ("src.pages.admin", "AdminFrame"),
+    "users": ("src.pages.users", "UsersFrame"),
+}
+
+
+def page_factory(module_name, class_name):
+    """Callable building a page, importing its module on first use"""
+    def build(parent):
+        page_class = getattr(importlib.import_module(module_name), class_name)
+        return page_class(parent)
+    return build
 
 
 class ProfileDialog(ctk.CTkToplevel):
@@ -89,27 +105,26 @@ class ProfileDialog(ctk.CTkToplevel):
             return
 
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
+            with db_connection() as conn:
+                cursor = conn.cursor()
 
-            # Verify current password
-            cursor.execute(
-                "SELECT password FROM users WHERE username = ?", (self.master.username,)
-            )
-            stored_password = cursor.fetchone()[0]
+                # Verify current password
+                cursor.execute(
+                    "SELECT password FROM users WHERE username = ?", (self.master.username,)
+                )
+                stored_password = cursor.fetchone()[0]
 
-            if current != stored_password:  # In a real app, use proper password hashing
-                messagebox.showerror("Error", "Current password is incorrect")
-                return
+                if current != stored_password:  # In a real app, use proper password hashing
+                    messagebox.showerror("Error", "Current password is incorrect")
+                    return
 
-            # Update password
-            cursor.execute(
-                "UPDATE users SET password = ? WHERE username = ?",
-                (new, self.master.username),
-            )
+                # Update password
+                cursor.execute(
+                    "UPDATE users SET password = ? WHERE username = ?",
+                    (new, self.master.username),
+                )
 
-            conn.commit()
-            conn.close()
+                conn.commit()
 
             messagebox.showinfo("Success", "Password changed successfully")
             self.destroy()
@@ -122,9 +137,6 @@ class MainWindow(ctk.CTk):
     def __init__(self):
         super().__init__()
 
-        # Initialize database connection
-        self.db_connection = get_db_connection()
-
         # Configure the window
         self.title("Hardware Store Management")
         self.geometry("1200x800")
@@ -145,32 +157,25 @@ class MainWindow(ctk.CTk):
         self.content_frame.grid_columnconfigure(0, weight=1)
         self.content_frame.grid_rowconfigure(0, weight=1)
 
+        # Pages are built on first visit and kept for the next ones
+        self.pages = PageRegistry(
+            self.content_frame,
+            {name: page_factory(*page) for name, page in PAGE_CLASSES.items()},
+        )
+
         # Show initial content
         self.show_content("dashboard")
 
     def show_content(self, content_type):
-        # Clear existing content
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-
-        # Show the selected content
-        if content_type == "dashboard":
-            DashboardFrame(self.content_frame).pack(fill="both", expand=True)
-        elif content_type == "products":
-            ProductManagementFrame(self.content_frame).pack(fill="both", expand=True)
-        elif content_type == "categories":
-            CategoriesFrame(self.content_frame).pack(fill="both", expand=True)
-        elif content_type == "checkout":
-            CheckoutFrame(self.content_frame).pack(fill="both", expand=True)
-        elif content_type == "admin":
-            AdminFrame(self.content_frame).pack(fill="both", expand=True)
-        elif content_type == "users":
-            UsersFrame(self.content_frame).pack(fill="both", expand=True)
+        """Show the page of a sidebar entry, reusing it if it was built before"""
+        if content_type in PAGE_CLASSES:
+            return self.pages.show(content_type)
 
     def on_closing(self):
-        # Close database connection
-        if hasattr(self, "db_connection") and self.db_connection:
-            self.db_connection.close()
+        # Destroy the pages first so they can release what they hold
+        self.pages.clear()
+        # Close the pooled database connections
+        pool.close_all()
         self.quit()
 
     def run(self):
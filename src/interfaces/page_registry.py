@@ -0,0 +1,69 @@
+from collections import OrderedDict
+
+# Pages with charts or big tables; at most MAX_HEAVY_PAGES of them stay built
+HEAVY_PAGES = {"dashboard", "products", "checkout", "sales"}
+MAX_HEAVY_PAGES = 2
+
+
+class PageRegistry:
+    """Builds each page on its first visit and keeps it for the next ones
+
+    Switching tabs hides the current page (grid_remove) and raises the
+    requested one instead of destroying and rebuilding it. A page that is
+    shown again gets its on_show() called, if it has one, to pick up changes
+    made elsewhere. When more than max_heavy heavy pages are built the least
+    recently shown one is destroyed, unless its is_busy() says it holds
+    unsaved work (e.g. a checkout cart).
+    """
+
+    def __init__(self, container, factories, heavy=HEAVY_PAGES, max_heavy=MAX_HEAVY_PAGES):
+        self.container = container
+        self.factories = factories  # name -> callable(parent) building the page
+        self.heavy = set(heavy)
+        self.max_heavy = max_heavy
+        self.pages = OrderedDict()  # name -> page, least recently shown first
+        self.current = None
+
+    def show(self, name):
+        """Show a page, building it on first use; returns the page"""
+        page = self.pages.get(name)
+        if page is None:
+            page = self.factories[name](self.container)
+            self.pages[name] = page
+            fresh = True
+        else:
+            self.pages.move_to_end(name)
+            fresh = False
+
+        if self.current is not None and self.current != name and self.current in self.pages:
+            self.pages[self.current].grid_remove()
+        page.grid(row=0, column=0, sticky="nsew")
+        page.tkraise()
+        self.current = name
+
+        if not fresh and hasattr(page, "on_show"):
+            page.on_show()
+        self.evict()
+        return page
+
+    def evict(self):
+        """Destroy the least recently shown heavy pages beyond max_heavy"""
+        heavy = [name for name in self.pages if name in self.heavy]
+        for name in heavy[:max(0, len(heavy) - self.max_heavy)]:
+            page = self.pages[name]
+            if name == self.current or (hasattr(page, "is_busy") and page.is_busy()):
+                continue
+            del self.pages[name]
+            page.destroy()
+
+    def forget(self, name):
+        """Destroy a page so the next visit builds it again"""
+        page = self.pages.pop(name, None)
+        if page is not None:
+            page.destroy()
+            if self.current == name:
+                self.current = None
+
+    def clear(self):
+        for name in list(self.pages):
+            self.forget(name)
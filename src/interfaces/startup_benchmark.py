@@ -0,0 +1,114 @@
+"""Startup benchmark
+
+Imports main.py in a fresh interpreter under `python -X importtime`,
+reports the total import time and the slowest modules, and fails when the
+imports go over the budget or pull in a module that should only load after
+login (the page modules, matplotlib and NumPy):
+
+    python -m src.interfaces.startup_benchmark --budget-ms 400
+
+With a display it also times importing main.py and drawing the login
+window (--window).
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.parent
+
+# Time to import everything the login window needs
+IMPORT_BUDGET_MS = 400
+
+# Modules that must not load before the login window is shown
+DEFERRED_MODULES = ("matplotlib", "numpy", "src.interfaces.hub", "src.pages.dashboard", "src.pages.product", "src.pages.checkout",
+                    "src.pages.sales")
+
+LOGIN_WINDOW_SCRIPT = """
+import time
+start = time.perf_counter()
+import main
+app = main.App()
+app.update()
+print(time.perf_counter() - start)
+app.destroy()
+"""
+
+
+def import_times(module="main"):
+    """[(module, self us, cumulative us, depth)] for importing a module in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    entries = []
+    errors = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            errors.append(line)
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Header line
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(fields[0]), int(fields[1]), depth))
+    if result.returncode != 0:
+        raise RuntimeError("\n".join(errors) or f"import {module} failed")
+    return entries
+
+
+def time_login_window():
+    """Seconds from importing main.py to the login window being drawn"""
+    result = subprocess.run(
+        [sys.executable, "-c", LOGIN_WINDOW_SCRIPT], cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure application startup imports")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS, help="import time budget")
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--window", action="store_true", help="also time drawing the login window")
+    args = parser.parse_args()
+
+    try:
+        entries = import_times()
+    except RuntimeError as e:
+        print(f"Could not import main.py:\n{e}")
+        sys.exit(1)
+
+    total_ms = sum(cumulative for _, _, cumulative, depth in entries if depth == 0) / 1000
+    print(f"\nImporting main.py: {total_ms:.1f} ms over {len(entries)} modules")
+    print(f"{'module':<50}{'self ms':>10}{'cumulative ms':>15}")
+    for name, own, cumulative, _ in sorted(entries, key=lambda e: e[2], reverse=True)[:args.top]:
+        print(f"{name:<50}{own / 1000:>10.1f}{cumulative / 1000:>15.1f}")
+
+    failed = False
+    loaded = {name for name, _, _, _ in entries}
+    early = sorted(name for name in loaded if name.startswith(DEFERRED_MODULES))
+    if early:
+        print(f"\nLoaded before login: {', '.join(early)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"\nOVER the {args.budget_ms:.0f} ms import budget")
+        failed = True
+    else:
+        print(f"\nWithin the {args.budget_ms:.0f} ms import budget")
+
+    if args.window:
+        if not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+            print("No display, skipping the login window timing")
+        else:
+            print(f"Time to login window: {time_login_window() * 1000:.1f} ms")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Tab switch latency benchmark
+
+Builds the main window on a copy of the database and times sidebar
+switches: the first visit of each page, which is what every click cost
+when pages were rebuilt, against revisits served by the page registry.
+Tk needs a display, on a headless machine run it under Xvfb:
+
+    xvfb-run python -m src.interfaces.tab_benchmark --rounds 20
+"""
+import argparse
+import tempfile
+import time
+
+from src.database.benchmark import copy_database, summarize, print_results
+from src.database.db_config import pool
+from src.interfaces.hub import MainWindow, PAGE_CLASSES
+
+
+def time_switch(window, content_type):
+    """Seconds to show a page and let Tk draw it"""
+    start = time.perf_counter()
+    window.show_content(content_type)
+    window.update()
+    return time.perf_counter() - start
+
+
+def benchmark_tab_switches(rounds=20):
+    """First visit and revisit latency of every page"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        pool.db_file = copy_database(tmp)
+        pool.close_all()
+        window = MainWindow()
+        window.withdraw()
+        try:
+            names = list(PAGE_CLASSES)
+            # Keep every page so cycling through all of them measures the
+            # cached path rather than the LRU evictions
+            window.pages.max_heavy = len(names)
+            # The dashboard is already built by the constructor
+            window.pages.forget("dashboard")
+            for name in names:
+                results[f"first {name}"] = summarize([time_switch(window, name)])
+
+            revisits = {name: [] for name in names}
+            for _ in range(rounds):
+                for name in names:
+                    revisits[name].append(time_switch(window, name))
+            for name in names:
+                results[f"revisit {name}"] = summarize(revisits[name])
+        finally:
+            window.destroy()
+            pool.close_all()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time switching between the main window pages")
+    parser.add_argument("--rounds", type=int, default=20, help="times each page is revisited")
+    args = parser.parse_args()
+    print_results("Tab switch latency", benchmark_tab_switches(args.rounds))
+
+
+if __name__ == "__main__":
+    main()
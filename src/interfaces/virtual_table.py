@@ -0,0 +1,208 @@
+import customtkinter as ctk
+from tkinter import ttk
+
+# Row height used until the Treeview style reports one
+DEFAULT_ROW_HEIGHT = 20
+
+
+class VirtualTable(ctk.CTkFrame):
+    """Treeview that only creates items for the rows on screen
+
+    Rows come from a pager (see src.database.paging) and the vertical
+    scrollbar maps onto the whole result, so a 100k-row result costs as many
+    Tk items as fit in the window. Items are reused as the view scrolls and
+    the selection follows the row key (the key_index value of a row), not
+    the item, so it survives scrolling and refreshes.
+    """
+
+    def __init__(self, parent, columns, pager=None, key_index=0, format_row=None, row_tags=None,
+                 height=None, sortable=True, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.columns = columns
+        self.pager = pager
+        self.key_index = key_index
+        self.format_row = format_row
+        self.row_tags = row_tags
+        self.sortable = sortable
+
+        self.first = 0  # Index of the top visible row
+        self.visible = height or 20
+        self.fixed_height = height is not None
+        self._rows = []  # Rows currently shown
+        self._items = []  # Reused Treeview item ids
+        self._selected_key = None
+
+        names = list(columns.keys())
+        self.tree = ttk.Treeview(self, columns=names, show='headings', selectmode='browse', height=self.visible)
+        for col in names:
+            options = columns[col]
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by_column(c))
+            self.tree.column(col, width=options.get('width', 100), anchor=options.get('anchor', 'w'))
+
+        # The vertical scrollbar drives self.first, the Treeview never scrolls itself
+        self.y_scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.on_scroll)
+        x_scrollbar = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=x_scrollbar.set)
+
+        self.y_scrollbar.pack(side="right", fill="y")
+        x_scrollbar.pack(side="bottom", fill="x")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<MouseWheel>', self.on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll_rows(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_rows(3))
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        self.tree.bind('<Up>', lambda e: self.move_selection(-1))
+        self.tree.bind('<Down>', lambda e: self.move_selection(1))
+        self.tree.bind('<Prior>', lambda e: self.move_selection(-self.visible))
+        self.tree.bind('<Next>', lambda e: self.move_selection(self.visible))
+        self.tree.bind('<Home>', lambda e: self.move_selection(-self.total()))
+        self.tree.bind('<End>', lambda e: self.move_selection(self.total()))
+
+        if pager:
+            self.render()
+
+    def total(self):
+        return self.pager.count() if self.pager else 0
+
+    def set_pager(self, pager, keep_position=False):
+        """Show a new result from the top (or the current row index), keeping the selected key"""
+        self.pager = pager
+        if not keep_position:
+            self.first = 0
+        self.render()
+        self.update_headings()
+
+    def refresh(self):
+        """Re-read the current result and redraw at the same position"""
+        if self.pager:
+            self.pager.reset()
+        self.render()
+
+    def render(self):
+        """Fill the reused items with the visible window of rows"""
+        total = self.total()
+        self.first = max(0, min(self.first, total - self.visible))
+        self._rows = self.pager.rows(self.first, self.first + self.visible) if self.pager else []
+
+        while len(self._items) < len(self._rows):
+            self._items.append(self.tree.insert('', 'end'))
+        if len(self._items) > len(self._rows):
+            self.tree.delete(*self._items[len(self._rows):])
+            del self._items[len(self._rows):]
+
+        selected = None
+        for item, row in zip(self._items, self._rows):
+            values = self.format_row(row) if self.format_row else row
+            tags = self.row_tags(row) if self.row_tags else ()
+            self.tree.item(item, values=list(values), tags=tags)
+            if self._selected_key is not None and row[self.key_index] == self._selected_key:
+                selected = item
+
+        # Mirror the selection without losing the key of an off-screen row
+        if selected:
+            self.tree.selection_set(selected)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+        if total:
+            self.y_scrollbar.set(self.first / total, min(1.0, (self.first + self.visible) / total))
+        else:
+            self.y_scrollbar.set(0.0, 1.0)
+
+    def on_resize(self, event):
+        """Show as many rows as fit in the new height"""
+        if self.fixed_height:
+            return
+        style = ttk.Style()
+        row_height = int(style.lookup('Treeview', 'rowheight') or DEFAULT_ROW_HEIGHT)
+        # One row's worth of the height goes to the headings
+        visible = max(1, event.height // row_height - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
+
+    def on_scroll(self, action, amount, unit=None):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')"""
+        if action == 'moveto':
+            self.first = int(float(amount) * self.total())
+            self.render()
+        elif action == 'scroll':
+            step = self.visible if unit == 'pages' else 1
+            self.scroll_rows(int(amount) * step)
+
+    def on_mousewheel(self, event):
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def scroll_rows(self, count):
+        self.first += count
+        self.render()
+
+    def on_select(self, event):
+        selection = self.tree.selection()
+        if selection and selection[0] in self._items:
+            row = self._rows[self._items.index(selection[0])]
+            self._selected_key = row[self.key_index]
+
+    def move_selection(self, count):
+        """Move the selection by count rows, scrolling it into view"""
+        if not self.total():
+            return "break"
+        index = self.selected_index()
+        index = 0 if index is None else max(0, min(index + count, self.total() - 1))
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + self.visible:
+            self.first = index - self.visible + 1
+        self.render()
+        row = self._rows[index - self.first] if 0 <= index - self.first < len(self._rows) else None
+        if row:
+            self.select_key(row[self.key_index])
+        return "break"
+
+    def selected_index(self):
+        """Absolute index of the selected row if it is on screen"""
+        selection = self.tree.selection()
+        if selection and selection[0] in self._items:
+            return self.first + self._items.index(selection[0])
+        return None
+
+    def select_key(self, key):
+        self._selected_key = key
+        self.render()
+
+    def selected_row(self):
+        """The selected row as returned by the pager, None when nothing is selected"""
+        selection = self.tree.selection()
+        if selection and selection[0] in self._items:
+            return self._rows[self._items.index(selection[0])]
+        return None
+
+    def select_at(self, y):
+        """Select the row under a y coordinate (for context menus), returns it"""
+        item = self.tree.identify_row(y)
+        if not item or item not in self._items:
+            return None
+        row = self._rows[self._items.index(item)]
+        self.select_key(row[self.key_index])
+        return row
+
+    def sort_by_column(self, column):
+        """Sort by clicking on column header, a second click reverses"""
+        if not self.sortable or not self.pager or column not in self.pager.sort_columns:
+            return
+        reverse = self.pager.sort == column and not self.pager.reverse
+        self.pager.set_sort(column, reverse)
+        self.first = 0
+        self.render()
+        self.update_headings()
+
+    def update_headings(self):
+        """Show the sort order in the column headers"""
+        sort = self.pager.sort if self.pager else None
+        for col in self.columns:
+            if col == sort:
+                self.tree.heading(col, text=f"{col} {'↓' if self.pager.reverse else '↑'}")
+            else:
+                self.tree.heading(col, text=col)
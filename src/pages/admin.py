@@ -1,6 +1,6 @@
 import customtkinter as ctk
 from tkinter import ttk, messagebox
-from src.database.db_config import get_db_connection
+from src.database.db_config import db_connection
 
 class AdminFrame(ctk.CTkFrame):
     def __init__(self, parent, **kwargs):
@@ -145,22 +145,19 @@ class AdminFrame(ctk.CTkFrame):
             messagebox.showerror("Error", "Username and password are required!")
             return
         
-        conn = get_db_connection()
-        if conn:
-            cursor = conn.cursor()
-            try:
+        try:
+            with db_connection() as conn:
+                cursor = conn.cursor()
                 cursor.execute("""
                     INSERT INTO admin (username, password, email, role)
                     VALUES (?, ?, ?, ?)
                 """, (username, password, email, role))
                 conn.commit()
-                messagebox.showinfo("Success", "Admin created successfully!")
-                self.refresh_table()  # Refresh the table
-                self.clear_create_entries()
-            except Exception as e:
-                messagebox.showerror("Error", f"Error creating admin: {e}")
-            finally:
-                conn.close()
+            messagebox.showinfo("Success", "Admin created successfully!")
+            self.refresh_table()  # Refresh the table
+            self.clear_create_entries()
+        except Exception as e:
+            messagebox.showerror("Error", f"Error creating admin: {e}")
     
     def load_admin(self):
         try:
@@ -169,11 +166,11 @@ class AdminFrame(ctk.CTkFrame):
                 messagebox.showerror("Error", "Please enter an admin ID")
                 return
             
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT username, email, role FROM admin WHERE id = ?", (admin_id,))
-            admin = cursor.fetchone()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("SELECT username, email, role FROM admin WHERE id = ?", (admin_id,))
+                admin = cursor.fetchone()
             
             if admin:
                 self.update_username_entry.delete(0, 'end')
@@ -185,8 +182,6 @@ class AdminFrame(ctk.CTkFrame):
             else:
                 messagebox.showerror("Error", "Admin not found")
             
-            conn.close()
-            
         except Exception as e:
             messagebox.showerror("Error", f"Error loading admin: {e}")
     
@@ -202,24 +197,23 @@ class AdminFrame(ctk.CTkFrame):
                 messagebox.showerror("Error", "All fields except password are required")
                 return
             
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            if password:
-                cursor.execute("""
-                    UPDATE admin 
-                    SET username = ?, password = ?, email = ?, role = ?
-                    WHERE id = ?
-                """, (username, password, email, role, admin_id))
-            else:
-                cursor.execute("""
-                    UPDATE admin 
-                    SET username = ?, email = ?, role = ?
-                    WHERE id = ?
-                """, (username, email, role, admin_id))
-            
-            conn.commit()
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                if password:
+                    cursor.execute("""
+                        UPDATE admin 
+                        SET username = ?, password = ?, email = ?, role = ?
+                        WHERE id = ?
+                    """, (username, password, email, role, admin_id))
+                else:
+                    cursor.execute("""
+                        UPDATE admin 
+                        SET username = ?, email = ?, role = ?
+                        WHERE id = ?
+                    """, (username, email, role, admin_id))
+                
+                conn.commit()
             
             self.clear_update_entries()
             self.refresh_table()
@@ -238,41 +232,42 @@ class AdminFrame(ctk.CTkFrame):
             if not messagebox.askyesno("Confirm", "Are you sure you want to delete this admin?"):
                 return
             
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("DELETE FROM admin WHERE id = ?", (admin_id,))
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("DELETE FROM admin WHERE id = ?", (admin_id,))
+                deleted = cursor.rowcount
+                if deleted:
+                    conn.commit()
             
-            if cursor.rowcount == 0:
+            if deleted == 0:
                 messagebox.showerror("Error", "Admin not found")
             else:
-                conn.commit()
                 self.delete_id_entry.delete(0, 'end')
                 self.refresh_table()
                 messagebox.showinfo("Success", "Admin deleted successfully")
             
-            conn.close()
-            
         except Exception as e:
             messagebox.showerror("Error", f"Error deleting admin: {e}")
     
+    def on_show(self):
+        self.refresh_table()
+    
     def refresh_table(self):
         # Clear the table
         for item in self.tree.get_children():
             self.tree.delete(item)
         
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT id, username, email, role FROM admin")
-            admins = cursor.fetchall()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("SELECT id, username, email, role FROM admin")
+                admins = cursor.fetchall()
             
             for admin in admins:
                 self.tree.insert('', 'end', values=admin)
             
-            conn.close()
-            
         except Exception as e:
             messagebox.showerror("Error", f"Error refreshing table: {e}")
     
@@ -0,0 +1,177 @@
+"""Cart model of the checkout page
+
+A Cart holds its lines by product id, so adding a scanned product,
+changing a quantity or removing a line finds it in O(1) instead of
+walking a list, and keeps the subtotal, unit count and therefore tax and
+points up to date with each change instead of summing the cart again. The
+subtotal is counted in cents so thousands of changes never drift.
+
+Views subscribe to the cart and get (event, line) for every change:
+'added', 'changed' and 'removed' carry the line, 'reset' (after clear()
+or replace()) carries None and means everything may have changed.
+
+items() gives the {'id', 'name', 'price', 'quantity'} dicts that
+checkout.commit_cart(), checkout.reserve_cart() and saved_carts take.
+"""
+from src.database.checkout import points_for
+
+# Share of the subtotal added as sales tax; prices are charged as they are
+# (commit_cart records the subtotal), so none is added by default
+TAX_RATE = 0.0
+
+
+def to_cents(amount):
+    return int(round(amount * 100))
+
+
+class CartLine:
+    """One product of a cart"""
+
+    __slots__ = ('id', 'name', 'price', 'quantity', 'cents')
+
+    def __init__(self, product_id, name, price, quantity):
+        self.id = product_id
+        self.name = name
+        self.price = price
+        self.quantity = quantity
+        self.cents = to_cents(price)  # Unit price in cents
+
+    @property
+    def total(self):
+        return self.cents * self.quantity / 100
+
+    def as_item(self):
+        return {'id': self.id, 'name': self.name, 'price': self.price, 'quantity': self.quantity}
+
+
+class Cart:
+    """Cart lines by product id with running totals and change events"""
+
+    def __init__(self, tax_rate=TAX_RATE):
+        self.tax_rate = tax_rate
+        self._lines = {}  # product id -> CartLine, in the order they were added
+        self._subtotal_cents = 0
+        self._units = 0
+        self._listeners = []
+
+    # Events
+
+    def subscribe(self, callback):
+        """Call callback(event, line) after every change"""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, event, line=None):
+        for callback in list(self._listeners):
+            callback(event, line)
+
+    # Reads
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __bool__(self):
+        return bool(self._lines)
+
+    def __iter__(self):
+        return iter(self._lines.values())
+
+    def __contains__(self, product_id):
+        return product_id in self._lines
+
+    def get(self, product_id):
+        """The line of a product, None when it is not in the cart"""
+        return self._lines.get(product_id)
+
+    def quantity(self, product_id):
+        line = self._lines.get(product_id)
+        return line.quantity if line else 0
+
+    @property
+    def units(self):
+        return self._units
+
+    @property
+    def subtotal(self):
+        return self._subtotal_cents / 100
+
+    @property
+    def tax(self):
+        return self._tax_cents() / 100
+
+    @property
+    def total(self):
+        return (self._subtotal_cents + self._tax_cents()) / 100
+
+    def _tax_cents(self):
+        return round(self._subtotal_cents * self.tax_rate)
+
+    @property
+    def points(self):
+        """Loyalty points the cart earns, as commit_cart() credits them"""
+        return points_for(self.subtotal)
+
+    def items(self):
+        """The lines as {'id', 'name', 'price', 'quantity'} dicts"""
+        return [line.as_item() for line in self._lines.values()]
+
+    # Changes
+
+    def add(self, product_id, name, price, quantity=1):
+        """Add quantity of a product, to its line when it has one; returns the line"""
+        line = self._lines.get(product_id)
+        if line is None:
+            line = self._lines[product_id] = CartLine(product_id, name, price, 0)
+            event = 'added'
+        else:
+            event = 'changed'
+        self._adjust(line, quantity)
+        self._notify(event, line)
+        return line
+
+    def set_quantity(self, product_id, quantity):
+        """Set a line's quantity, 0 or less removes it; returns the line or None"""
+        line = self._lines.get(product_id)
+        if line is None:
+            raise KeyError(product_id)
+        if quantity <= 0:
+            self.remove(product_id)
+            return None
+        self._adjust(line, quantity - line.quantity)
+        self._notify('changed', line)
+        return line
+
+    def remove(self, product_id):
+        """Drop a product's line, returns it or None when it was not in the cart"""
+        line = self._lines.pop(product_id, None)
+        if line is not None:
+            self._subtotal_cents -= line.cents * line.quantity
+            self._units -= line.quantity
+            self._notify('removed', line)
+        return line
+
+    def clear(self):
+        self._reset([])
+
+    def replace(self, items):
+        """Make the cart hold these {'id', 'name', 'price', 'quantity'} items instead"""
+        self._reset(items)
+
+    def _reset(self, items):
+        self._lines = {}
+        self._subtotal_cents = 0
+        self._units = 0
+        for item in items:
+            line = self._lines.get(item['id'])
+            if line is None:
+                line = self._lines[item['id']] = CartLine(item['id'], item['name'], item['price'], 0)
+            self._adjust(line, item['quantity'])
+        self._notify('reset')
+
+    def _adjust(self, line, change):
+        line.quantity += change
+        self._subtotal_cents += line.cents * change
+        self._units += change
@@ -1,6 +1,17 @@
 import customtkinter as ctk
-from tkinter import ttk, messagebox
-from src.database.db_config import get_db_connection
+from tkinter import messagebox
+from src.database.db_config import db_connection
+from src.database.paging import KeysetPager
+from src.database.catalog import PRODUCTS_IN_CATEGORY, catalog
+from src.interfaces.virtual_table import VirtualTable
+
+# Category table column -> ORDER BY expression
+CATEGORY_SORT_COLUMNS = {
+    'ID': 'id',
+    'Name': 'name',
+    'Description': "COALESCE(description, '')",
+    'Product Count': 'product_count',
+}
 
 class CategoriesFrame(ctk.CTkFrame):
     def __init__(self, parent, **kwargs):
@@ -78,21 +89,10 @@ class CategoriesFrame(ctk.CTkFrame):
         self.table_frame.grid_rowconfigure(0, weight=1)
         self.table_frame.grid_columnconfigure(0, weight=1)
         
-        columns = ('ID', 'Name', 'Description', 'Product Count')
-        self.tree = ttk.Treeview(self.table_frame, columns=columns, show='headings')
-        
-        # Define headings
-        for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=150)
-        
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(self.table_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        
-        # Pack the table and scrollbar
-        self.tree.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        columns = {col: {'width': 150} for col in ('ID', 'Name', 'Description', 'Product Count')}
+        self.table = VirtualTable(self.table_frame, columns)
+        self.table.pack(fill="both", expand=True)
+        self.tree = self.table.tree
         
         # Show create form by default
         self.show_form("create")
@@ -123,16 +123,16 @@ class CategoriesFrame(ctk.CTkFrame):
                 messagebox.showerror("Error", "Category name is required")
                 return
             
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO category (name, description)
-                VALUES (?, ?)
-            """, (name, description))
-            
-            conn.commit()
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    INSERT INTO category (name, description)
+                    VALUES (?, ?)
+                """, (name, description))
+                
+                conn.commit()
+                catalog.put_category(cursor.lastrowid, name)
             
             self.clear_create_entries()
             self.refresh_table()
@@ -148,17 +148,16 @@ class CategoriesFrame(ctk.CTkFrame):
                 messagebox.showerror("Error", "Please enter a category ID")
                 return
             
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT name, description
-                FROM category
-                WHERE id = ?
-            """, (int(category_id),))
-            
-            category = cursor.fetchone()
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    SELECT name, description
+                    FROM category
+                    WHERE id = ?
+                """, (int(category_id),))
+                
+                category = cursor.fetchone()
             
             if category:
                 self.update_name_entry.delete(0, 'end')
@@ -181,17 +180,18 @@ class CategoriesFrame(ctk.CTkFrame):
                 messagebox.showerror("Error", "Category ID and name are required")
                 return
             
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                UPDATE category
-                SET name = ?, description = ?
-                WHERE id = ?
-            """, (new_name, new_description, int(category_id)))
-            
-            conn.commit()
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    UPDATE category
+                    SET name = ?, description = ?
+                    WHERE id = ?
+                """, (new_name, new_description, int(category_id)))
+                
+                conn.commit()
+                if cursor.rowcount:
+                    catalog.put_category(int(category_id), new_name)
             
             self.clear_update_entries()
             self.refresh_table()
@@ -207,28 +207,25 @@ class CategoriesFrame(ctk.CTkFrame):
                 messagebox.showerror("Error", "Please enter a category ID")
                 return
             
-            # Check if category has products
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT COUNT(*) FROM products WHERE category_id = ?
-            """, (int(category_id),))
-            
-            product_count = cursor.fetchone()[0]
-            
-            if product_count > 0:
-                if not messagebox.askyesno("Warning", 
-                    f"This category has {product_count} products. Deleting it will set their category to NULL. Continue?"):
-                    conn.close()
-                    return
-            
-            cursor.execute("""
-                DELETE FROM category WHERE id = ?
-            """, (int(category_id),))
-            
-            conn.commit()
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                # Check if category has products
+                cursor.execute(PRODUCTS_IN_CATEGORY, (int(category_id),))
+                
+                product_count = cursor.fetchone()[0]
+                
+                if product_count > 0:
+                    if not messagebox.askyesno("Warning", 
+                        f"This category has {product_count} products. Deleting it will set their category to NULL. Continue?"):
+                        return
+                
+                cursor.execute("""
+                    DELETE FROM category WHERE id = ?
+                """, (int(category_id),))
+                
+                conn.commit()
+                catalog.remove_category(int(category_id))
             
             self.delete_id_entry.delete(0, 'end')
             self.refresh_table()
@@ -237,32 +234,23 @@ class CategoriesFrame(ctk.CTkFrame):
         except Exception as e:
             messagebox.showerror("Error", f"Error deleting category: {e}")
     
+    def on_show(self):
+        self.table.refresh()
+    
     def refresh_table(self):
-        # Clear the current table
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Get categories with product count
-            cursor.execute("""
-                SELECT c.id, c.name, c.description,
-                       COUNT(p.id) as product_count
+        sort = self.table.pager.sort if self.table.pager else 'Name'
+        reverse = self.table.pager.reverse if self.table.pager else False
+        # Categories with product count
+        self.table.set_pager(KeysetPager(
+            ["id", "name", "description", "product_count"],
+            """(SELECT c.id, c.name, c.description, COUNT(p.id) AS product_count
                 FROM category c
                 LEFT JOIN products p ON c.id = p.category_id
-                GROUP BY c.id
-                ORDER BY c.name
-            """)
-            
-            for row in cursor.fetchall():
-                self.tree.insert('', 'end', values=row)
-                
-            conn.close()
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error refreshing table: {e}")
+                GROUP BY c.id)""",
+            sort_columns=CATEGORY_SORT_COLUMNS,
+            sort=sort,
+            reverse=reverse,
+        ), keep_position=True)
     
     def clear_create_entries(self):
         self.name_entry.delete(0, 'end')
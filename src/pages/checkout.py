@@ -1,16 +1,25 @@
 import customtkinter as ctk
 from tkinter import ttk, messagebox, filedialog
-from src.database.db_config import get_db_connection
-import json
-from datetime import datetime
-import os
+from src.database.db_config import db_connection
+from src.database import product_search, checkout, saved_carts
+from src.pages.cart import Cart
+from src.database.catalog import catalog, NAME
+from src.interfaces.background import BackgroundRunner
+
+# Delay after the last keystroke before searching
+SEARCH_DEBOUNCE_MS = 150
 
 class CheckoutFrame(ctk.CTkFrame):
     def __init__(self, parent, **kwargs):
         super().__init__(parent, fg_color="transparent", **kwargs)
         
         self.parent = parent  # Store parent reference
-        self.cart_items = []  # List to store cart items
+        self.cart = Cart()  # Lines by product id with running totals
+        
+        # Product searches run off the Tk thread
+        self.search_runner = BackgroundRunner(self, name="checkout-search")
+        self._search_after_id = None
+        self._searched_term = None
         
         # Configure grid with better spacing
         self.grid_columnconfigure(0, weight=4)  # Products list (wider)
@@ -42,6 +51,8 @@ class CheckoutFrame(ctk.CTkFrame):
             width=200
         )
         self.search_entry.pack(side="left", padx=(5,10))
+        self.search_entry.bind('<KeyRelease>', self.schedule_search)
+        self.search_entry.bind('<Return>', lambda e: self.search_products())
         
         ctk.CTkButton(
             search_frame,
@@ -138,6 +149,8 @@ class CheckoutFrame(ctk.CTkFrame):
         self.cart_tree.column('Total', width=100, minwidth=80)
         
         self.cart_tree.pack(fill="both", expand=True)
+        self.cart_tree.bind('<Double-1>', self.edit_cart_quantity)
+        self.cart.subscribe(self.on_cart_changed)
         
         # Remove from cart button
         ctk.CTkButton(
@@ -151,7 +164,7 @@ class CheckoutFrame(ctk.CTkFrame):
         # Total amount label
         self.total_label = ctk.CTkLabel(
             self.cart_frame,
-            text="Total: $0.00",
+            text="Total: $0.00\n0 items, 0 points",
             font=("Arial", 16, "bold")
         )
         self.total_label.pack(pady=5)
@@ -211,56 +224,100 @@ class CheckoutFrame(ctk.CTkFrame):
         # Clear search entry
         if hasattr(self, 'search_entry'):
             self.search_entry.delete(0, 'end')
-            
-        # Clear the current table
-        for item in self.products_tree.get_children():
-            self.products_tree.delete(item)
-            
-        try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, name, price, quantity FROM products")
-            products = cursor.fetchall()
-            
-            for product in products:
-                self.products_tree.insert('', 'end', values=product)
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load products: {str(e)}")
-        finally:
-            if conn:
-                conn.close()
+        
+        self.search_products()
+    
+    def schedule_search(self, event=None):
+        """Search once typing pauses for SEARCH_DEBOUNCE_MS"""
+        # Ignore keys that did not change the text (arrows, Return, ...)
+        if self.search_entry.get().strip() == self._searched_term:
+            return
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(SEARCH_DEBOUNCE_MS, self.search_products)
     
     def search_products(self):
-        """Search products based on search entry"""
-        search_term = self.search_entry.get().strip().lower()
-        
-        # Clear the current table
-        for item in self.products_tree.get_children():
-            self.products_tree.delete(item)
-            
+        """Search products based on search entry, on the background worker"""
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+            self._search_after_id = None
+        
+        search_term = self.search_entry.get().strip()
+        self._searched_term = search_term
+        # Type-ahead only needs the best matches, an empty search lists everything
+        limit = product_search.TYPE_AHEAD_LIMIT if search_term else None
+        
+        def run_search(cancelled):
+            if not search_term:
+                # The whole catalog by name, straight from the cache
+                return catalog.all_products(NAME)
+            with db_connection() as conn:
+                # Abort the query as soon as a newer keystroke supersedes it
+                conn.set_progress_handler(cancelled, 1000)
+                try:
+                    return product_search.search_products(conn, search_term, limit=limit)
+                finally:
+                    conn.set_progress_handler(None, 0)
+        
+        self.search_runner.submit(
+            "search",
+            run_search,
+            self.show_products,
+            lambda e: messagebox.showerror("Error", f"Failed to search products: {str(e)}")
+        )
+    
+    def show_products(self, products):
+        """Fill the products table with search results"""
+        self.products_tree.delete(*self.products_tree.get_children())
+        for product in products:
+            # ID, Name, Price, Stock
+            self.products_tree.insert('', 'end', values=(product[0], product[2], product[4], product[5]))
+    
+    def on_show(self):
+        """Re-run the current search so stock levels are current"""
+        self.search_products()
+    
+    def is_busy(self):
+        """A cart in progress keeps the page alive"""
+        return bool(self.cart)
+    
+    def destroy(self):
+        self.search_runner.shutdown()
+        self.cart.unsubscribe(self.on_cart_changed)
+        self.release_reservations()
+        super().destroy()
+
+    def reserve_items(self, items):
+        """Hold stock for items as this till's cart, warns and returns False when short"""
+        return self._reserve(lambda conn: checkout.reserve_cart(conn, items))
+
+    def reserve_line(self, product_id, quantity, name):
+        """Hold quantity of one product for the cart, warns and returns False when short"""
+        return self._reserve(lambda conn: checkout.reserve_line(conn, product_id, quantity, name))
+
+    def _reserve(self, reserve):
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Search in name and description
-            cursor.execute("""
-                SELECT id, name, price, quantity 
-                FROM products 
-                WHERE LOWER(name) LIKE ? OR LOWER(reference) LIKE ?
-            """, (f'%{search_term}%', f'%{search_term}%'))
-            
-            products = cursor.fetchall()
-            
-            for product in products:
-                self.products_tree.insert('', 'end', values=product)
-                
+            with db_connection() as conn:
+                reserve(conn)
+            return True
+        except checkout.StockConflictError as e:
+            # Sold or held by another till since the list was loaded
+            details = "\n".join(f"{c['name']}: {c['available']} available" for c in e.conflicts)
+            messagebox.showwarning("Warning", f"Not enough stock available\n\n{details}")
+            self.refresh_products()
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to search products: {str(e)}")
-        finally:
-            if conn:
-                conn.close()
-                
+            print(f"Error reserving stock: {e}")
+            messagebox.showerror("Error", f"Error reserving stock: {e}")
+        return False
+
+    def release_reservations(self, product_id=None):
+        """Give back the stock this till holds, for one product or the whole cart"""
+        try:
+            with db_connection() as conn:
+                checkout.release_stock(conn, product_id)
+        except Exception as e:
+            print(f"Error releasing reserved stock: {e}")
+    
     def add_to_cart(self):
         selected_item = self.products_tree.selection()
         if not selected_item:
@@ -284,26 +341,16 @@ class CheckoutFrame(ctk.CTkFrame):
                 messagebox.showwarning("Warning", "Not enough stock available")
                 return
             
-            # Check if item already in cart
-            for item in self.cart_items:
-                if item['id'] == product_id:
-                    new_quantity = item['quantity'] + quantity
-                    if new_quantity > available_stock:
-                        messagebox.showwarning("Warning", "Not enough stock available")
-                        return
-                    item['quantity'] = new_quantity
-                    self.update_cart_display()
-                    return
-            
-            # Add new item to cart
-            self.cart_items.append({
-                'id': product_id,
-                'name': product_name,
-                'price': product_price,
-                'quantity': quantity
-            })
+            # Quantity of the line once this is added, the product may already be in the cart
+            new_quantity = self.cart.quantity(product_id) + quantity
+            if new_quantity > available_stock:
+                messagebox.showwarning("Warning", "Not enough stock available")
+                return
             
-            self.update_cart_display()
+            # Add to the cart once the stock is held for this till
+            if not self.reserve_line(product_id, new_quantity, product_name):
+                return
+            self.cart.add(product_id, product_name, product_price, quantity)
             
         except ValueError:
             messagebox.showwarning("Warning", "Please enter a valid quantity")
@@ -314,37 +361,67 @@ class CheckoutFrame(ctk.CTkFrame):
             messagebox.showwarning("Warning", "Please select an item to remove")
             return
         
-        item_index = self.cart_tree.index(selected_item[0])
-        if 0 <= item_index < len(self.cart_items):
-            self.cart_items.pop(item_index)
-            self.update_cart_display()
+        # Cart rows are keyed by product id
+        product_id = int(selected_item[0])
+        if self.cart.remove(product_id) is not None:
+            self.release_reservations(product_id)
     
-    def update_cart_display(self):
-        # Clear current items
-        for item in self.cart_tree.get_children():
-            self.cart_tree.delete(item)
-        
-        # Calculate total
-        total = 0
-        
-        # Add items to display
-        for item in self.cart_items:
-            item_total = item['price'] * item['quantity']
-            total += item_total
-            
-            self.cart_tree.insert('', 'end', values=(
-                item['name'],
-                item['quantity'],
-                f"${item['price']:.2f}",
-                f"${item_total:.2f}"
-            ))
+    def edit_cart_quantity(self, event=None):
+        """Ask for a new quantity of the double-clicked cart line, 0 removes it"""
+        selected_item = self.cart_tree.identify_row(event.y) if event else None
+        if not selected_item:
+            return
+        line = self.cart.get(int(selected_item))
+        if line is None:
+            return
+        
+        dialog = ctk.CTkInputDialog(text=f"Quantity of {line.name}:", title="Change Quantity")
+        value = dialog.get_input()
+        if value is None:
+            return
+        try:
+            quantity = int(value)
+        except ValueError:
+            messagebox.showwarning("Warning", "Please enter a valid quantity")
+            return
+        if quantity == line.quantity:
+            return
         
-        # Update total label
-        self.total_label.configure(text=f"Total: ${total:.2f}")
+        if quantity <= 0:
+            self.cart.set_quantity(line.id, 0)
+            self.release_reservations(line.id)
+        # Change the line once the new quantity is held for this till
+        elif self.reserve_line(line.id, quantity, line.name):
+            self.cart.set_quantity(line.id, quantity)
+    
+    def on_cart_changed(self, event, line):
+        """Follow a cart change in the cart table, touching only the row that changed"""
+        if event == 'reset':
+            self.cart_tree.delete(*self.cart_tree.get_children())
+            for cart_line in self.cart:
+                self.cart_tree.insert('', 'end', iid=str(cart_line.id), values=self.cart_row(cart_line))
+        elif event == 'added':
+            self.cart_tree.insert('', 'end', iid=str(line.id), values=self.cart_row(line))
+            self.cart_tree.see(str(line.id))
+        elif event == 'changed':
+            self.cart_tree.item(str(line.id), values=self.cart_row(line))
+        elif event == 'removed':
+            self.cart_tree.delete(str(line.id))
+        
+        # The cart keeps its totals, nothing is summed here
+        text = f"Total: ${self.cart.total:.2f}"
+        if self.cart.tax:
+            text = f"Subtotal: ${self.cart.subtotal:.2f}  Tax: ${self.cart.tax:.2f}  {text}"
+        text += f"\n{self.cart.units} items, {self.cart.points} points"
+        self.total_label.configure(text=text)
+    
+    @staticmethod
+    def cart_row(line):
+        return (line.name, line.quantity, f"${line.price:.2f}", f"${line.total:.2f}")
     
     def complete_purchase(self):
         """Complete the purchase and record it in the database"""
-        if not self.cart_items:
+        if not self.cart:
             messagebox.showwarning("Warning", "Cart is empty")
             return
         
@@ -354,159 +431,59 @@ class CheckoutFrame(ctk.CTkFrame):
             return
         
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Calculate total amount
-            total_amount = sum(item['quantity'] * item['price'] for item in self.cart_items)
-            
-            # Find or create user
-            cursor.execute("SELECT id, loyalty_points, total_spent FROM users WHERE name = ?", (buyer,))
-            user = cursor.fetchone()
-            
-            if user:
-                user_id = user[0]
-                current_points = user[1]
-                current_spent = user[2]
-            else:
-                # Create new user with default admin as creator
-                cursor.execute("INSERT INTO users (name, created_by) VALUES (?, 1)", (buyer,))
-                user_id = cursor.lastrowid
-                current_points = 0
-                current_spent = 0.0
-            
-            # Calculate new loyalty points (10 points per $100 spent)
-            new_points = int((total_amount / 100) * 10)
-            total_points = current_points + new_points
-            total_spent = current_spent + total_amount
-            
-            # Update user's loyalty points and total spent
-            cursor.execute("""
-                UPDATE users 
-                SET loyalty_points = ?, total_spent = ?
-                WHERE id = ?
-            """, (total_points, total_spent, user_id))
-            
-            # Create purchase record
-            cursor.execute("""
-                INSERT INTO purchases (user_id, total_amount, points_earned, created_by)
-                VALUES (?, ?, ?, 1)
-            """, (user_id, total_amount, new_points))
-            
-            purchase_id = cursor.lastrowid
-            
-            # Record individual purchase items
-            for item in self.cart_items:
-                item_total = item['quantity'] * item['price']
-                cursor.execute("""
-                    INSERT INTO purchase_details (
-                        purchase_id, 
-                        product_id, 
-                        quantity, 
-                        unit_price, 
-                        total_price
-                    )
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    purchase_id, 
-                    item['id'], 
-                    item['quantity'], 
-                    item['price'],
-                    item_total
-                ))
-                
-                # Update product quantities
-                cursor.execute("""
-                    UPDATE products
-                    SET quantity = quantity - ?
-                    WHERE id = ?
-                """, (item['quantity'], item['id']))
-            
-            conn.commit()
+            with db_connection() as conn:
+                receipt = checkout.commit_cart(conn, buyer, self.cart.items())
+                catalog.put_products(conn, [line['id'] for line in receipt['lines']])
             
             # Show success message with points earned
             messagebox.showinfo(
                 "Success",
                 f"Purchase completed successfully!\n\n"
-                f"Points earned: {new_points}\n"
-                f"Total points: {total_points}"
+                f"Points earned: {receipt['points_earned']}\n"
+                f"Total points: {receipt['total_points']}"
             )
             
             # Clear cart
-            self.cart_items = []
-            self.update_cart_display()
+            self.cart.clear()
             self.refresh_products()
             
             # Refresh dashboard if it exists
             if hasattr(self.parent, 'show_content'):
                 self.parent.show_content('dashboard')
             
+        except checkout.StockConflictError as e:
+            # Another till sold the stock since it was added to the cart
+            details = "\n".join(
+                f"{c['name']}: {c['available']} left, {c['requested']} in cart" for c in e.conflicts
+            )
+            messagebox.showwarning("Not enough stock", f"Nothing was charged, please adjust the cart:\n\n{details}")
+            self.refresh_products()
         except Exception as e:
             print(f"Error completing purchase: {e}")
             messagebox.showerror("Error", f"Error completing purchase: {e}")
-            if conn:
-                conn.rollback()
-        finally:
-            if conn:
-                conn.close()
     
     def cancel_purchase(self):
         if messagebox.askyesno("Cancel Purchase", "Are you sure you want to cancel this purchase?"):
-            self.cart_items = []
-            self.update_cart_display()
+            self.cart.clear()
+            self.release_reservations()
             self.buyer_name.delete(0, 'end')
 
     def save_cart(self):
-        """Save the current cart as a markdown file"""
-        if not self.cart_items:
+        """Park the current cart in the database"""
+        if not self.cart:
             messagebox.showwarning("Warning", "Cart is empty")
             return
             
         try:
-            # Create saves directory if it doesn't exist
-            saves_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "saves")
-            os.makedirs(saves_dir, exist_ok=True)
-            
-            # Generate filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"cart_{timestamp}.md"
-            filepath = os.path.join(saves_dir, filename)
-            
-            # Calculate total
-            total = sum(item['quantity'] * item['price'] for item in self.cart_items)
-            
-            # Create markdown content
-            content = f"# Saved Cart - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-            content += "## Items\n\n"
-            content += "| Product | Quantity | Price | Total |\n"
-            content += "|---------|-----------|-------|-------|\n"
-            
-            for item in self.cart_items:
-                item_total = item['quantity'] * item['price']
-                content += f"| {item['name']} | {item['quantity']} | ${item['price']:.2f} | ${item_total:.2f} |\n"
-            
-            content += f"\n## Total Amount: ${total:.2f}\n"
-            
-            # Add JSON data for loading
-            content += "\n<cart_data>\n"
-            content += json.dumps(self.cart_items, indent=2)
-            content += "\n</cart_data>"
-            
-            # Save to file
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            messagebox.showinfo("Success", f"Cart saved successfully to {filename}")
+            with db_connection() as conn:
+                cart_id = saved_carts.save_cart(conn, self.cart.items(), self.buyer_name.get().strip())
+            messagebox.showinfo("Success", f"Cart saved successfully as cart #{cart_id}")
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save cart: {str(e)}")
     
     def load_saved_cart(self):
         """Show a window to select and load a saved cart"""
-        # Create saves directory if it doesn't exist
-        saves_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "saves")
-        os.makedirs(saves_dir, exist_ok=True)
-        
         # Create selection window
         select_window = ctk.CTkToplevel(self)
         select_window.title("Select Saved Cart")
@@ -529,7 +506,7 @@ class CheckoutFrame(ctk.CTkFrame):
         list_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
         # Create treeview for saved carts
-        columns = ('Filename', 'Date', 'Items', 'Total')
+        columns = ('Cart', 'Date', 'Buyer', 'Items', 'Total')
         cart_list = ttk.Treeview(list_frame, columns=columns, show='headings', selectmode='browse')
         
         # Add scrollbar
@@ -538,60 +515,27 @@ class CheckoutFrame(ctk.CTkFrame):
         cart_list.configure(yscrollcommand=scrollbar.set)
         
         # Configure columns
-        cart_list.heading('Filename', text='Filename')
-        cart_list.heading('Date', text='Date')
-        cart_list.heading('Items', text='Items')
-        cart_list.heading('Total', text='Total')
-        
-        cart_list.column('Filename', width=150)
-        cart_list.column('Date', width=150)
-        cart_list.column('Items', width=100)
-        cart_list.column('Total', width=100)
+        for col, width in zip(columns, (60, 150, 120, 100, 100)):
+            cart_list.heading(col, text=col)
+            cart_list.column(col, width=width)
         
         cart_list.pack(fill="both", expand=True)
         
-        # Load cart files
-        cart_files = []
-        for filename in os.listdir(saves_dir):
-            if filename.endswith('.md'):
-                filepath = os.path.join(saves_dir, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        # Extract cart data
-                        start = content.find("<cart_data>") + len("<cart_data>")
-                        end = content.find("</cart_data>")
-                        cart_data = json.loads(content[start:end])
-                        
-                        # Calculate totals
-                        total = sum(item['quantity'] * item['price'] for item in cart_data)
-                        num_items = sum(item['quantity'] for item in cart_data)
-                        
-                        # Get file date from filename
-                        date_str = filename[5:-3]  # Remove 'cart_' and '.md'
-                        date = datetime.strptime(date_str, "%Y%m%d_%H%M%S")
-                        
-                        cart_files.append({
-                            'filename': filename,
-                            'filepath': filepath,
-                            'date': date.strftime("%Y-%m-%d %H:%M:%S"),
-                            'items': num_items,
-                            'total': total,
-                            'cart_data': cart_data
-                        })
-                except Exception as e:
-                    print(f"Error loading {filename}: {e}")
-        
-        # Sort by date (newest first)
-        cart_files.sort(key=lambda x: x['filename'], reverse=True)
-        
-        # Add to treeview
-        for cart in cart_files:
-            cart_list.insert('', 'end', values=(
-                cart['filename'],
-                cart['date'],
-                f"{cart['items']} items",
-                f"${cart['total']:.2f}"
+        # Only the headers are read, the lines wait until a cart is loaded
+        try:
+            with db_connection() as conn:
+                carts = saved_carts.list_saved_carts(conn)
+        except Exception as e:
+            print(f"Error loading saved carts: {e}")
+            carts = []
+        
+        for cart_id, saved_at, buyer, lines, units, total in carts:
+            cart_list.insert('', 'end', iid=str(cart_id), values=(
+                f"#{cart_id}",
+                saved_at,
+                buyer or "",
+                f"{units} items",
+                f"${total:.2f}"
             ))
         
         def load_selected_cart():
@@ -599,62 +543,90 @@ class CheckoutFrame(ctk.CTkFrame):
             if not selection:
                 messagebox.showwarning("Warning", "Please select a cart to load")
                 return
-                
-            selected_idx = cart_list.index(selection[0])
-            selected_cart = cart_files[selected_idx]
             
             try:
-                # Verify stock availability
-                conn = get_db_connection()
-                cursor = conn.cursor()
+                cart_id = int(selection[0])
+                with db_connection() as conn:
+                    lines = saved_carts.restore_cart(conn, cart_id)
                 
-                for item in selected_cart['cart_data']:
-                    cursor.execute("SELECT quantity FROM products WHERE id = ?", (item['id'],))
-                    result = cursor.fetchone()
-                    if not result:
-                        messagebox.showwarning(
-                            "Warning", 
-                            f"Product {item['name']} no longer exists in the database"
-                        )
-                        return
-                    
-                    current_stock = result[0]
-                    if current_stock < item['quantity']:
-                        messagebox.showwarning(
-                            "Warning", 
-                            f"Not enough stock for {item['name']}. Available: {current_stock}"
-                        )
-                        return
+                # The catalog may have changed since the cart was parked
+                missing = [line['name'] for line in lines if line['price'] is None]
+                repriced = [line for line in lines if line['price'] is not None and line['price'] != line['saved_price']]
+                short = [line for line in lines if line['price'] is not None and line['available'] < line['quantity']]
+                notes = []
+                if missing:
+                    notes.append("No longer sold, left out:\n" + "\n".join(missing))
+                if repriced:
+                    notes.append("Price changed:\n" + "\n".join(
+                        f"{line['name']}: ${line['saved_price']:.2f} -> ${line['price']:.2f}" for line in repriced))
+                if short:
+                    notes.append("Not enough stock, loaded with what is left:\n" + "\n".join(
+                        f"{line['name']}: {line['quantity']} wanted, {max(line['available'], 0)} left" for line in short))
+                if notes and not messagebox.askyesno("Cart Changed", "\n\n".join(notes) + "\n\nLoad the cart anyway?"):
+                    return
+                
+                items = [
+                    {'id': line['id'], 'name': line['name'], 'price': line['price'],
+                     'quantity': min(line['quantity'], line['available'])}
+                    for line in lines if line['price'] is not None and line['available'] > 0
+                ]
+                if not items:
+                    messagebox.showwarning("Warning", "None of the products of this cart are sold or in stock anymore")
+                    return
+                
+                # Hold the stock for every line, nothing is loaded when one is short
+                if not self.reserve_items(items):
+                    return
                 
                 # Load the cart
-                self.cart_items = selected_cart['cart_data']
-                self.update_cart_display()
+                self.cart.replace(items)
+                buyer = cart_list.set(selection[0], 'Buyer')
+                if buyer:
+                    self.buyer_name.delete(0, 'end')
+                    self.buyer_name.insert(0, buyer)
                 select_window.destroy()
                 messagebox.showinfo("Success", "Cart loaded successfully!")
                 
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load cart: {str(e)}")
-            finally:
-                if conn:
-                    conn.close()
+        
+        def export_selected_cart():
+            selection = cart_list.selection()
+            if not selection:
+                messagebox.showwarning("Warning", "Please select a cart to export")
+                return
+            
+            try:
+                with db_connection() as conn:
+                    filename, content = saved_carts.export_markdown(conn, int(selection[0]))
+                if content is None:
+                    return
+                filepath = filedialog.asksaveasfilename(
+                    parent=select_window,
+                    initialfile=filename,
+                    defaultextension=".md",
+                    filetypes=[("Markdown", "*.md"), ("All files", "*.*")]
+                )
+                if not filepath:
+                    return
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                messagebox.showinfo("Success", f"Cart exported to {filepath}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to export cart: {str(e)}")
         
         def delete_selected_cart():
             selection = cart_list.selection()
             if not selection:
                 messagebox.showwarning("Warning", "Please select a cart to delete")
                 return
-                
-            selected_idx = cart_list.index(selection[0])
-            selected_cart = cart_files[selected_idx]
             
-            if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete {selected_cart['filename']}?"):
+            if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete cart #{selection[0]}?"):
                 try:
-                    # Delete the file
-                    os.remove(selected_cart['filepath'])
+                    with db_connection() as conn:
+                        saved_carts.delete_saved_cart(conn, int(selection[0]))
                     
-                    # Remove from treeview and cart_files
                     cart_list.delete(selection[0])
-                    cart_files.pop(selected_idx)
                     
                     messagebox.showinfo("Success", "Cart deleted successfully!")
                 except Exception as e:
@@ -673,6 +645,13 @@ class CheckoutFrame(ctk.CTkFrame):
             hover_color="#45a049"
         ).pack(side="left", padx=5, expand=True)
         
+        # Export button
+        ctk.CTkButton(
+            buttons_frame,
+            text="Export Markdown",
+            command=export_selected_cart
+        ).pack(side="left", padx=5, expand=True)
+        
         # Delete button
         ctk.CTkButton(
             buttons_frame,
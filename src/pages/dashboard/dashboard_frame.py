@@ -1,9 +1,14 @@
 import customtkinter as ctk
-from tkinter import ttk
+import time
 from datetime import datetime
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from src.database.db_config import get_db_connection
+from src.database.db_config import db_connection
+from src.database.dashboard_data import load_dashboard_data, low_stock_pager, STOCK_STATUSES
+from src.interfaces.background import BackgroundRunner
+from src.interfaces.charts import new_figure, draw_figure
+from src.interfaces.virtual_table import VirtualTable
+
+# How often a shown dashboard checks the database for changes
+DASHBOARD_REFRESH_MS = 5000
 
 class DashboardMetricCard(ctk.CTkFrame):
     def __init__(self, parent, title, value, icon="📊"):
@@ -20,11 +25,31 @@ class DashboardMetricCard(ctk.CTkFrame):
         ctk.CTkLabel(header_frame, text=title, font=("Arial", 14, "bold")).pack(side="left", padx=5)
         
         # Value
-        ctk.CTkLabel(self, text=value, font=("Arial", 24, "bold")).grid(row=1, column=0, padx=10, pady=(0,10))
+        self.value_label = ctk.CTkLabel(self, text=value, font=("Arial", 24, "bold"))
+        self.value_label.grid(row=1, column=0, padx=10, pady=(0,10))
+    
+    def set_value(self, value):
+        """Change the shown value, the label is only touched when it differs"""
+        if self.value_label.cget("text") != value:
+            self.value_label.configure(text=value)
 
 class DashboardFrame(ctk.CTkFrame):
-    def __init__(self, parent):
+    """Dashboard built once, kept live by a background refresh
+
+    Every refresh_interval_ms, while the dashboard is on screen, a worker
+    thread checks PRAGMA data_version and only when the database changed
+    loads the numbers. The result is handed back to the Tk thread, which
+    rewrites the card texts, redraws the existing chart artists and
+    re-reads the low stock table.
+    """
+    
+    def __init__(self, parent, refresh_interval_ms=DASHBOARD_REFRESH_MS):
         super().__init__(parent)
+        self.refresh_interval_ms = refresh_interval_ms
+        self.data_version = None  # data_version of the numbers on screen
+        self.stats = {'loads': 0, 'skipped': 0, 'last_ms': 0.0, 'total_ms': 0.0, 'max_ms': 0.0}
+        self.runner = BackgroundRunner(self, name="dashboard")
+        self._refresh_after_id = None
         
         # Create main container that fills the frame
         self.grid_columnconfigure(0, weight=1)
@@ -36,6 +61,8 @@ class DashboardFrame(ctk.CTkFrame):
         self.scrollable_frame.grid_columnconfigure(0, weight=1)
         
         self.setup_dashboard()
+        self.refresh()
+        self.schedule_refresh()
     
     def setup_dashboard(self):
         """Setup the dashboard layout"""
@@ -48,7 +75,11 @@ class DashboardFrame(ctk.CTkFrame):
             self.scrollable_frame, 
             text="Dashboard", 
             font=("Arial", 24, "bold")
-        ).grid(row=0, column=0, columnspan=3, pady=20)
+        ).grid(row=0, column=0, columnspan=3, pady=(20, 0))
+        
+        # Last refresh time and duration
+        self.status_label = ctk.CTkLabel(self.scrollable_frame, text="Loading...", text_color="gray")
+        self.status_label.grid(row=2, column=0, columnspan=3)
         
         # Create metrics section
         self.create_metrics_section()
@@ -61,31 +92,15 @@ class DashboardFrame(ctk.CTkFrame):
     
     def create_metrics_section(self):
         """Create the metrics cards section"""
-        metrics = self.get_metrics()
-        
-        # Total Products
-        DashboardMetricCard(
-            self.scrollable_frame,
-            "Total Products",
-            str(metrics['total_products']),
-            "📦"
-        ).grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
-        
-        # Total Value
-        DashboardMetricCard(
-            self.scrollable_frame,
-            "Total Inventory Value",
-            f"${metrics['total_value']:,.2f}",
-            "💰"
-        ).grid(row=1, column=1, padx=10, pady=10, sticky="nsew")
-        
-        # Low Stock Items
-        DashboardMetricCard(
-            self.scrollable_frame,
-            "Low Stock Items",
-            str(metrics['low_stock_count']),
-            "⚠️"
-        ).grid(row=1, column=2, padx=10, pady=10, sticky="nsew")
+        self.metric_cards = {}
+        for column, (key, title, icon) in enumerate((
+            ('total_products', "Total Products", "📦"),
+            ('total_value', "Total Inventory Value", "💰"),
+            ('low_stock_count', "Low Stock Items", "⚠️"),
+        )):
+            card = DashboardMetricCard(self.scrollable_frame, title, "", icon)
+            card.grid(row=1, column=column, padx=10, pady=10, sticky="nsew")
+            self.metric_cards[key] = card
     
     def create_charts_section(self):
         """Create the charts section"""
@@ -101,64 +116,22 @@ class DashboardFrame(ctk.CTkFrame):
     
     def create_category_chart(self, parent):
         """Create pie chart showing product distribution by category"""
-        # Get category data
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT c.name, COUNT(p.id) as count
-            FROM category c
-            LEFT JOIN products p ON c.id = p.category_id
-            GROUP BY c.id, c.name
-            ORDER BY count DESC
-        """)
-        data = cursor.fetchall()
-        conn.close()
-        
-        # Create figure
-        fig, ax = plt.subplots(figsize=(6, 4))
-        labels = [row[0] for row in data]
-        sizes = [row[1] for row in data]
-        
-        ax.pie(sizes, labels=labels, autopct='%1.1f%%')
-        ax.set_title('Products by Category')
-        
-        # Create canvas
-        canvas = FigureCanvasTkAgg(fig, parent)
-        canvas.draw()
-        canvas.get_tk_widget().grid(row=0, column=0, padx=10, pady=10)
+        self.category_figure = new_figure()
+        self.category_ax = self.category_figure.add_subplot()
+        self.category_data = None
+        self.category_canvas = draw_figure(self.category_figure, parent)
+        self.category_canvas.get_tk_widget().grid(row=0, column=0, padx=10, pady=10)
     
     def create_stock_status_chart(self, parent):
         """Create bar chart showing stock status"""
-        # Get stock status data
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT 
-                CASE 
-                    WHEN quantity <= min_quantity THEN 'Low Stock'
-                    WHEN quantity <= (min_quantity * 2) THEN 'Medium Stock'
-                    ELSE 'Good Stock'
-                END as status,
-                COUNT(*) as count
-            FROM products
-            GROUP BY status
-        """)
-        data = cursor.fetchall()
-        conn.close()
-        
-        # Create figure
-        fig, ax = plt.subplots(figsize=(6, 4))
-        labels = [row[0] for row in data]
-        values = [row[1] for row in data]
-        
-        ax.bar(labels, values)
+        self.stock_figure = new_figure()
+        ax = self.stock_ax = self.stock_figure.add_subplot()
+        self.stock_bars = ax.bar(STOCK_STATUSES, [0] * len(STOCK_STATUSES))
         ax.set_title('Stock Status Distribution')
         ax.set_ylabel('Number of Products')
-        
-        # Create canvas
-        canvas = FigureCanvasTkAgg(fig, parent)
-        canvas.draw()
-        canvas.get_tk_widget().grid(row=0, column=1, padx=10, pady=10)
+        self.stock_data = None
+        self.stock_canvas = draw_figure(self.stock_figure, parent)
+        self.stock_canvas.get_tk_widget().grid(row=0, column=1, padx=10, pady=10)
     
     def create_low_stock_section(self):
         """Create the low stock items section"""
@@ -174,63 +147,114 @@ class DashboardFrame(ctk.CTkFrame):
         ).pack(pady=10)
         
         # Create table
-        columns = ('SKU', 'Name', 'Current Stock', 'Min Stock', 'Category')
-        tree = ttk.Treeview(low_stock_frame, columns=columns, show='headings', height=5)
-        
-        # Configure columns
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=100)
-        
-        # Get low stock items
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT p.reference, p.name, p.quantity, p.min_quantity, c.name
-            FROM products p
-            LEFT JOIN category c ON p.category_id = c.id
-            WHERE p.quantity <= p.min_quantity
-            ORDER BY p.quantity ASC
-        """)
-        items = cursor.fetchall()
-        conn.close()
-        
-        # Add items to table
-        for item in items:
-            tree.insert('', 'end', values=item)
-        
-        tree.pack(padx=10, pady=10, fill='both', expand=True)
-    
-    def get_metrics(self):
-        """Get dashboard metrics"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get total products
-        cursor.execute("SELECT COUNT(*) FROM products")
-        total_products = cursor.fetchone()[0]
-        
-        # Get total value
-        cursor.execute("SELECT SUM(price * quantity) FROM products")
-        total_value = cursor.fetchone()[0] or 0
-        
-        # Get low stock count
-        cursor.execute("SELECT COUNT(*) FROM products WHERE quantity <= min_quantity")
-        low_stock_count = cursor.fetchone()[0]
-        
-        conn.close()
-        
-        return {
-            'total_products': total_products,
-            'total_value': total_value,
-            'low_stock_count': low_stock_count
-        }
-    
-    def refresh(self):
-        """Refresh dashboard data"""
-        # Clear existing widgets
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-        
-        # Rebuild dashboard
-        self.setup_dashboard()
+        columns = {col: {'width': 100} for col in ('SKU', 'Name', 'Current Stock', 'Min Stock', 'Category')}
+        self.low_stock_table = VirtualTable(
+            low_stock_frame,
+            columns,
+            pager=low_stock_pager(),
+            height=5,
+        )
+        self.low_stock_table.pack(padx=10, pady=10, fill='both', expand=True)
+    
+    def get_dashboard_data(self):
+        """Every dashboard number in one read (see src.database.dashboard_data)"""
+        with db_connection() as conn:
+            return load_dashboard_data(conn)
+    
+    def load_changes(self, known_version):
+        """Worker side: (data_version, data, seconds), data is None when nothing changed"""
+        with db_connection() as conn:
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if version == known_version:
+                return version, None, 0.0
+            start = time.perf_counter()
+            data = load_dashboard_data(conn)
+            return version, data, time.perf_counter() - start
+    
+    def show_data(self, data):
+        """Tk side: put freshly loaded numbers on screen"""
+        self.update_metrics(data)
+        self.update_category_chart(data['category_counts'])
+        self.update_stock_status_chart(data['stock_status_counts'])
+        self.low_stock_table.refresh()
+    
+    def update_metrics(self, metrics):
+        self.metric_cards['total_products'].set_value(str(metrics['total_products']))
+        self.metric_cards['total_value'].set_value(f"${metrics['total_value']:,.2f}")
+        self.metric_cards['low_stock_count'].set_value(str(metrics['low_stock_count']))
+    
+    def update_category_chart(self, data):
+        """Redraw the pie on its existing axes when the counts changed"""
+        if data == self.category_data:
+            return
+        self.category_data = data
+        ax = self.category_ax
+        # Wedges cannot change count in place, the axes are cleared and reused
+        ax.clear()
+        ax.pie([row[1] for row in data], labels=[row[0] for row in data], autopct='%1.1f%%')
+        ax.set_title('Products by Category')
+        self.category_canvas.draw_idle()
+    
+    def update_stock_status_chart(self, values):
+        """Resize the existing bars when the counts changed"""
+        if values == self.stock_data:
+            return
+        self.stock_data = values
+        for bar, value in zip(self.stock_bars, values):
+            bar.set_height(value)
+        self.stock_ax.relim()
+        self.stock_ax.autoscale_view()
+        self.stock_canvas.draw_idle()
+    
+    def on_show(self):
+        self.refresh()
+    
+    def refresh(self, force=False):
+        """Load the numbers on the worker thread if the database changed (always with force)"""
+        known_version = None if force else self.data_version
+        self.runner.submit(
+            "refresh",
+            lambda cancelled: self.load_changes(known_version),
+            self.on_refreshed,
+            lambda e: print(f"Error refreshing dashboard: {e}"),
+        )
+    
+    def on_refreshed(self, result):
+        version, data, seconds = result
+        self.data_version = version
+        if data is None:
+            self.stats['skipped'] += 1
+            return
+        self.show_data(data)
+        
+        milliseconds = seconds * 1000
+        self.stats['loads'] += 1
+        self.stats['last_ms'] = milliseconds
+        self.stats['total_ms'] += milliseconds
+        self.stats['max_ms'] = max(self.stats['max_ms'], milliseconds)
+        self.status_label.configure(
+            text=f"Updated {datetime.now().strftime('%H:%M:%S')} in {milliseconds:.1f} ms"
+        )
+    
+    def refresh_stats(self):
+        """Refresh counts and load durations in milliseconds"""
+        stats = dict(self.stats)
+        stats['mean_ms'] = stats['total_ms'] / stats['loads'] if stats['loads'] else 0.0
+        return stats
+    
+    def schedule_refresh(self):
+        """Check for changes every refresh_interval_ms while the dashboard is on screen"""
+        if self.winfo_ismapped():
+            self.refresh()
+        self._refresh_after_id = self.after(self.refresh_interval_ms, self.schedule_refresh)
+    
+    def stop_auto_refresh(self):
+        """Stop the periodic refresh and drop any load in flight"""
+        if self._refresh_after_id is not None:
+            self.after_cancel(self._refresh_after_id)
+            self._refresh_after_id = None
+        self.runner.shutdown()
+    
+    def destroy(self):
+        self.stop_auto_refresh()
+        super().destroy()
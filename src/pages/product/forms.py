@@ -376,6 +376,7 @@ class SearchForm(BaseForm):
         # Sort by filter
         ctk.CTkLabel(filters_row, text="Sort by:").pack(side="left", padx=(15,2))
         sort_options = [
+            "Relevance",
             "Name (A-Z)", 
             "Name (Z-A)", 
             "Price (Low-High)", 
@@ -389,7 +390,7 @@ class SearchForm(BaseForm):
             width=150,
             command=lambda _: self.search_products()
         )
-        self.sort_combo.set("Name (A-Z)")
+        self.sort_combo.set("Relevance")
         self.sort_combo.pack(side="left", padx=5)
 
         # Stock status filter
@@ -134,6 +134,15 @@ class ProductManagementFrame(ctk.CTkFrame):
             table.grid_remove()
         self.tables[table_type].grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
     
+    def on_show(self):
+        """Pick up products, stock and categories changed on other pages"""
+        categories = [cat[1] for cat in self.product_manager.load_categories()]
+        self.create_form.category_combobox.configure(values=categories)
+        self.update_form.category_combobox.configure(values=categories)
+        self.search_form.category_combo.configure(values=['All'] + categories)
+        self.product_table.table.refresh()
+        self.purchase_table.table.refresh()
+    
     def refresh_table(self):
         """Refresh both tables"""
         self.product_table.refresh()
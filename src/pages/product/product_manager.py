@@ -1,6 +1,21 @@
 import re
 from tkinter import messagebox
-from src.database.db_config import get_db_connection
+from src.database.db_config import db_connection
+from src.database import product_search, purchase_history
+from src.database.catalog import catalog
+from src.database.paging import ListPager
+from src.database.product_search import PRODUCT_SORT_COLUMNS
+from src.database.stock_ledger import ADJUST, OPENING, TODAY, record_movements
+
+# Search form sort option -> (product table column, reverse)
+SORT_OPTION_COLUMNS = {
+    "Name (A-Z)": ('Name', False),
+    "Name (Z-A)": ('Name', True),
+    "Price (Low-High)": ('Price', False),
+    "Price (High-Low)": ('Price', True),
+    "Stock (Low-High)": ('Quantity', False),
+    "Stock (High-Low)": ('Quantity', True),
+}
 
 class ProductManager:
     def __init__(self):
@@ -10,13 +25,9 @@ class ProductManager:
         self.load_categories()  # Load categories
     
     def load_categories(self):
-        """Load all categories from database"""
+        """Load all categories from the catalog cache"""
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, name FROM category ORDER BY name")
-            self.categories = cursor.fetchall()
-            conn.close()
+            self.categories = catalog.category_list()
             return self.categories
         except Exception as e:
             messagebox.showerror("Error", f"Error loading categories: {e}")
@@ -24,10 +35,7 @@ class ProductManager:
     
     def get_category_id(self, category_name):
         """Get category ID by name"""
-        for cat_id, cat_name in self.categories:
-            if cat_name == category_name:
-                return cat_id
-        return None
+        return catalog.category_id(category_name)
     
     def validate_sku(self, sku):
         """Validate SKU format"""
@@ -38,18 +46,8 @@ class ProductManager:
     def is_sku_unique(self, sku, exclude_id=None):
         """Check if SKU is unique"""
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            if exclude_id:
-                cursor.execute("SELECT COUNT(*) FROM products WHERE reference = ? AND id != ?", (sku, exclude_id))
-            else:
-                cursor.execute("SELECT COUNT(*) FROM products WHERE reference = ?", (sku,))
-            
-            count = cursor.fetchone()[0]
-            conn.close()
-            
-            return count == 0
+            product_id = catalog.product_id(sku)
+            return product_id is None or (exclude_id is not None and product_id == exclude_id)
         except Exception as e:
             messagebox.showerror("Error", f"Error checking SKU uniqueness: {e}")
             return False
@@ -61,14 +59,17 @@ class ProductManager:
             if not category_id:
                 raise ValueError("Invalid category")
             
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO products (reference, name, description, price, quantity, min_quantity, category_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (sku, name, description, price, quantity, min_quantity, category_id))
-            conn.commit()
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT INTO products (reference, name, description, price, quantity, min_quantity, category_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (sku, name, description, price, quantity, min_quantity, category_id))
+                product_id = cursor.lastrowid
+                if quantity:
+                    record_movements(cursor, [(product_id, quantity, OPENING, None, "Opening balance")])
+                conn.commit()
+                catalog.put_product(conn, product_id)
             return True
         except Exception as e:
             messagebox.showerror("Error", f"Error creating product: {e}")
@@ -81,15 +82,22 @@ class ProductManager:
             if not category_id:
                 raise ValueError("Invalid category")
             
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE products
-                SET reference = ?, name = ?, description = ?, price = ?, quantity = ?, min_quantity = ?, category_id = ?
-                WHERE id = ?
-            """, (sku, name, description, price, quantity, min_quantity, category_id, product_id))
-            conn.commit()
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                # A quantity typed into the form is a stock adjustment in the ledger
+                cursor.execute(f"""
+                    INSERT INTO stock_movements (product_id, quantity_change, movement_type, date, note)
+                    SELECT id, ? - quantity, '{ADJUST}', {TODAY}, 'Product edited'
+                    FROM products
+                    WHERE id = ? AND quantity != ?
+                """, (quantity, product_id, quantity))
+                cursor.execute("""
+                    UPDATE products
+                    SET reference = ?, name = ?, description = ?, price = ?, quantity = ?, min_quantity = ?, category_id = ?
+                    WHERE id = ?
+                """, (sku, name, description, price, quantity, min_quantity, category_id, product_id))
+                conn.commit()
+                catalog.put_product(conn, product_id)
             return True
         except Exception as e:
             messagebox.showerror("Error", f"Error updating product: {e}")
@@ -98,11 +106,11 @@ class ProductManager:
     def delete_product(self, product_id):
         """Delete a product"""
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM products WHERE id = ?", (product_id,))
-            conn.commit()
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM products WHERE id = ?", (product_id,))
+                conn.commit()
+            catalog.remove_product(product_id)
             return True
         except Exception as e:
             messagebox.showerror("Error", f"Error deleting product: {e}")
@@ -111,17 +119,10 @@ class ProductManager:
     def get_product(self, product_id):
         """Get product by ID"""
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT p.id, p.reference, p.name, p.description, p.price, p.quantity, p.min_quantity, c.name
-                FROM products p
-                LEFT JOIN category c ON p.category_id = c.id
-                WHERE p.id = ?
-            """, (product_id,))
-            product = cursor.fetchone()
-            conn.close()
-            return product
+            # The update form passes the ID as typed
+            return catalog.get_product(int(product_id))
+        except ValueError:
+            return None
         except Exception as e:
             messagebox.showerror("Error", f"Error loading product: {e}")
             return None
@@ -129,17 +130,7 @@ class ProductManager:
     def get_all_products(self):
         """Get all products"""
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT p.id, p.reference, p.name, p.description, p.price, p.quantity, p.min_quantity, c.name
-                FROM products p
-                LEFT JOIN category c ON p.category_id = c.id
-                ORDER BY p.id
-            """)
-            products = cursor.fetchall()
-            conn.close()
-            return products
+            return catalog.all_products()
         except Exception as e:
             messagebox.showerror("Error", f"Error loading products: {e}")
             return []
@@ -149,66 +140,45 @@ class ProductManager:
         Search products based on various criteria
         
         Args:
-            search_term (str): Search term to match against product name or SKU
+            search_term (str): Search term matched against SKU, name, description and category
             category (str): Category name to filter products
             stock_status (str): Filter by stock status ('In Stock', 'Low Stock', 'All')
-            sort_by (str): Sort option (e.g., "Price (Low-High)")
+            sort_by (str): Sort option (e.g., "Price (Low-High)"), relevance by default
             
         Returns:
             list: List of matching products
         """
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            query = """
-                SELECT p.id, p.reference, p.name, p.description, p.price, p.quantity, p.min_quantity, c.name
-                FROM products p
-                LEFT JOIN category c ON p.category_id = c.id
-                WHERE 1=1
-            """
-            params = []
-            
-            if search_term:
-                query += """ AND (
-                    LOWER(p.name) LIKE LOWER(?)
-                    OR LOWER(p.reference) LIKE LOWER(?)
-                )"""
-                search_pattern = f"%{search_term}%"
-                params.extend([search_pattern, search_pattern])
-            
-            if category and category != "All":
-                query += " AND c.name = ?"
-                params.append(category)
-            
-            if stock_status:
-                if stock_status == "Low Stock":
-                    query += " AND p.quantity > 0 AND p.quantity <= p.min_quantity"
-                elif stock_status == "In Stock":
-                    query += " AND p.quantity > p.min_quantity"
-            
-            # Handle sorting
-            if sort_by:
-                if sort_by == "Name (A-Z)":
-                    query += " ORDER BY p.name ASC"
-                elif sort_by == "Name (Z-A)":
-                    query += " ORDER BY p.name DESC"
-                elif sort_by == "Price (Low-High)":
-                    query += " ORDER BY p.price ASC"
-                elif sort_by == "Price (High-Low)":
-                    query += " ORDER BY p.price DESC"
-                elif sort_by == "Stock (Low-High)":
-                    query += " ORDER BY p.quantity ASC"
-                elif sort_by == "Stock (High-Low)":
-                    query += " ORDER BY p.quantity DESC"
-            else:
-                query += " ORDER BY p.name ASC"
-            
-            cursor.execute(query, params)
-            products = cursor.fetchall()
-            conn.close()
-            return products
+            with db_connection() as conn:
+                return product_search.search_products(
+                    conn,
+                    search_term=search_term,
+                    category=category,
+                    stock_status=stock_status,
+                    sort_by=sort_by
+                )
             
         except Exception as e:
             messagebox.showerror("Error", f"Error searching products: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def products_pager(self, category=None, stock_status=None, sort=None, reverse=False, search_term=None):
+        """Pager over the products matching a search and filters, ordered by a product table column"""
+        return product_search.products_pager(search_term, category, stock_status, sort, reverse)
+    
+    def search_pager(self, search_term=None, category=None, stock_status=None, sort_by=None):
+        """Pager over the results of a product search
+        
+        Results sorted by a column are paged by the database like the whole
+        catalog; relevance-ranked results are loaded once and paged in memory.
+        """
+        if sort_by in SORT_OPTION_COLUMNS or not (search_term or "").strip():
+            sort, reverse = SORT_OPTION_COLUMNS.get(sort_by, ('Name', False))
+            return self.products_pager(category, stock_status, sort, reverse, search_term)
+        
+        products = self.search_products(search_term, category, stock_status, sort_by)
+        return ListPager(products, sort_columns={col: i for i, col in enumerate(PRODUCT_SORT_COLUMNS)})
+
+    def purchases_pager(self, date_from=None, date_to=None):
+        """Pager over the purchase history between two YYYY-MM-DD dates, newest first"""
+        return purchase_history.purchases_pager(date_from, date_to)
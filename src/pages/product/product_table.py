@@ -1,5 +1,6 @@
 import customtkinter as ctk
 from tkinter import ttk, Menu, messagebox
+from src.interfaces.virtual_table import VirtualTable
 
 class ProductTable(ctk.CTkFrame):
     def __init__(self, parent, product_manager):
@@ -18,33 +19,21 @@ class ProductTable(ctk.CTkFrame):
             'Category': {'width': 100, 'anchor': 'w'}
         }
         
+        self._search_params = None
         self.setup_table()
         self.setup_context_menu()
     
     def setup_table(self):
         """Setup the table and scrollbars"""
-        columns = ('ID', 'Reference', 'Name', 'Description', 'Price', 'Quantity', 'Min Quantity', 'Category')
-        self.tree = ttk.Treeview(self, columns=columns, show='headings')
-        
         # Configure the treeview style
         style = ttk.Style()
         style.configure("Treeview", font=('Arial', 10))
         style.configure("Treeview.Heading", font=('Arial', 10, 'bold'))
         
-        # Define headings and columns
-        for col in columns:
-            self.tree.heading(col, text=col, command=lambda c=col: self.sort_table_by_column(c))
-            self.tree.column(col, width=self.columns[col]['width'], anchor=self.columns[col]['anchor'])
-        
-        # Add scrollbars
-        y_scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
-        x_scrollbar = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
-        
-        # Pack the table and scrollbars
-        self.tree.pack(side="left", fill="both", expand=True)
-        y_scrollbar.pack(side="right", fill="y")
-        x_scrollbar.pack(side="bottom", fill="x")
+        self.table = VirtualTable(self, self.columns, format_row=self.format_row, row_tags=self.row_tags)
+        self.table.pack(fill="both", expand=True)
+        self.tree = self.table.tree
+        self.tree.tag_configure('low_stock', foreground='red')
         
         # Bind events
         self.tree.bind('<Double-1>', self.on_double_click)
@@ -60,127 +49,74 @@ class ProductTable(ctk.CTkFrame):
     
     def on_double_click(self, event):
         """Handle double-click on table row"""
-        item = self.tree.selection()[0]
-        self.edit_selected(item)
+        row = self.table.select_at(event.y)
+        if row:
+            self.edit_selected(row)
     
     def show_context_menu(self, event):
         """Show context menu on right-click"""
-        item = self.tree.identify_row(event.y)
-        if item:
-            self.tree.selection_set(item)
+        if self.table.select_at(event.y):
             self.context_menu.post(event.x_root, event.y_root)
     
-    def edit_selected(self, item=None):
+    def edit_selected(self, row=None):
         """Load selected item into update form"""
-        if not item:
-            selection = self.tree.selection()
-            if not selection:
+        if not row:
+            row = self.table.selected_row()
+            if not row:
                 return
-            item = selection[0]
         
-        values = self.tree.item(item)['values']
-        if values:
-            # Switch to update form and load values
-            self.master.show_form("update")
-            self.master.update_form.load_product(values[0])
+        # Switch to update form and load values
+        self.master.show_form("update")
+        self.master.update_form.load_product(row[0])
     
     def delete_selected(self):
         """Delete selected item"""
-        selection = self.tree.selection()
-        if not selection:
-            return
-        
-        item = selection[0]
-        values = self.tree.item(item)['values']
-        if values and messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete product {values[1]}?"):
-            if self.product_manager.delete_product(values[0]):
+        row = self.table.selected_row()
+        if row and messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete product {row[1]}?"):
+            if self.product_manager.delete_product(row[0]):
                 self.refresh()
     
     def copy_sku(self):
         """Copy selected item's SKU to clipboard"""
-        selection = self.tree.selection()
-        if not selection:
-            return
-        
-        item = selection[0]
-        values = self.tree.item(item)['values']
-        if values:
+        row = self.table.selected_row()
+        if row:
             self.clipboard_clear()
-            self.clipboard_append(values[1])
+            self.clipboard_append(row[1])
             messagebox.showinfo("Success", "SKU copied to clipboard")
     
-    def sort_table_by_column(self, column):
-        """Sort table by clicking on column header"""
-        # Get current sort order
-        if hasattr(self, '_sort_column') and self._sort_column == column:
-            self._sort_reverse = not self._sort_reverse
-        else:
-            self._sort_column = column
-            self._sort_reverse = False
-        
-        # Update the current search parameters with sort info
-        if hasattr(self.product_manager, 'current_search'):
-            self.product_manager.current_search['sort_by'] = {
-                'column': self._sort_column,
-                'reverse': self._sort_reverse
-            }
-        else:
-            self.product_manager.current_search = {
-                'search_term': None,
-                'category': None,
-                'stock_status': None,
-                'sort_by': {
-                    'column': self._sort_column,
-                    'reverse': self._sort_reverse
-                }
-            }
-        
-        # Refresh the table to apply the sort
-        self.refresh()
+    def format_row(self, product):
+        """Format a product row for display"""
+        formatted_values = list(product)
+        # Format price to 2 decimal places
+        formatted_values[4] = f"${formatted_values[4]:.2f}"
+        # Add warning icon for low stock
+        if formatted_values[5] <= formatted_values[6]:
+            formatted_values[5] = f"⚠️ {formatted_values[5]}"
+        return formatted_values
+    
+    def row_tags(self, product):
+        return ('low_stock',) if product[5] <= product[6] else ()
     
     def refresh(self):
         """Refresh table data"""
-        # Clear the table
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
         # Get search parameters if they exist
         search_params = getattr(self.product_manager, 'current_search', None)
         
         # Fetch products based on search parameters
         if search_params:
-            products = self.product_manager.search_products(
+            pager = self.product_manager.search_pager(
                 search_term=search_params.get('search_term'),
                 category=search_params.get('category'),
                 stock_status=search_params.get('stock_status'),
                 sort_by=search_params.get('sort_by')
             )
         else:
-            products = self.product_manager.get_all_products()
-        
-        # Insert products with proper formatting
-        for product in products:
-            formatted_values = list(product)
-            # Format price to 2 decimal places
-            formatted_values[4] = f"${formatted_values[4]:.2f}"
-            # Add warning icon for low stock
-            if formatted_values[5] <= formatted_values[6]:
-                formatted_values[5] = f"⚠️ {formatted_values[5]}"
-            
-            self.tree.insert(
-                '',
-                'end',
-                values=formatted_values,
-                tags=('low_stock',) if product[5] <= product[6] else ()
-            )
-        
-        # Configure tag for low stock items
-        self.tree.tag_configure('low_stock', foreground='red')
-        
-        # Update column headers to show sort order
-        if hasattr(self, '_sort_column'):
-            for col in self.columns:
-                if col == self._sort_column:
-                    self.tree.heading(col, text=f"{col} {'↓' if self._sort_reverse else '↑'}")
-                else:
-                    self.tree.heading(col, text=col)
+            pager = self.product_manager.products_pager()
+        
+        # Keep the header sort the user picked until the search changes
+        previous = self.table.pager
+        same_search = previous is not None and search_params is self._search_params
+        if same_search and previous.sort is not None:
+            pager.set_sort(previous.sort, previous.reverse)
+        self._search_params = search_params
+        self.table.set_pager(pager, keep_position=same_search)
@@ -1,108 +1,92 @@
 import customtkinter as ctk
-from tkinter import ttk
-from src.database.db_config import get_db_connection
+from tkinter import messagebox
+from datetime import datetime
+from src.interfaces.virtual_table import VirtualTable
 
 class PurchaseTable(ctk.CTkFrame):
     def __init__(self, parent, product_manager):
         super().__init__(parent)
         self.product_manager = product_manager
-        
+        self.filters = {'date_from': None, 'date_to': None}
+
         # Configure grid
-        self.grid_rowconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
         self.grid_columnconfigure(0, weight=1)
-        
-        # Create a frame to contain the treeview and scrollbars
-        self.table_frame = ctk.CTkFrame(self, width=500)
-        self.table_frame.grid(row=0, column=0, sticky="nsew")
-        self.table_frame.grid_rowconfigure(0, weight=1)
-        self.table_frame.grid_columnconfigure(0, weight=1)
-        
-        # Create Treeview
-        self.tree = ttk.Treeview(self.table_frame, columns=("ID", "Admin", "User", "Date", "Total Amount", "Products"), show="headings")
-        
-        # Configure columns
-        self.tree.heading("ID", text="ID")
-        self.tree.heading("Admin", text="Admin")
-        self.tree.heading("User", text="User")
-        self.tree.heading("Date", text="Date")
-        self.tree.heading("Total Amount", text="Total Amount")
-        self.tree.heading("Products", text="Purchased Items")
-        
-        # Configure column widths
-        self.tree.column("ID", width=50)
-        self.tree.column("Admin", width=100)
-        self.tree.column("User", width=100)
-        self.tree.column("Date", width=150)
-        self.tree.column("Total Amount", width=100)
-        self.tree.column("Products", width=300)
-        
-        # Add scrollbars
-        y_scrollbar = ttk.Scrollbar(self.table_frame, orient="vertical", command=self.tree.yview)
-        x_scrollbar = ttk.Scrollbar(self.table_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
-        
-        # Grid layout
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        y_scrollbar.grid(row=0, column=1, sticky="ns")
-        x_scrollbar.grid(row=1, column=0, sticky="ew")
-        
+
+        # Date range filter
+        filter_frame = ctk.CTkFrame(self)
+        filter_frame.grid(row=0, column=0, sticky="ew", pady=(0, 5))
+
+        ctk.CTkLabel(filter_frame, text="From:").pack(side="left", padx=(5, 2))
+        self.date_from_entry = ctk.CTkEntry(filter_frame, placeholder_text="YYYY-MM-DD", width=110)
+        self.date_from_entry.pack(side="left", padx=5)
+
+        ctk.CTkLabel(filter_frame, text="To:").pack(side="left", padx=(10, 2))
+        self.date_to_entry = ctk.CTkEntry(filter_frame, placeholder_text="YYYY-MM-DD", width=110)
+        self.date_to_entry.pack(side="left", padx=5)
+
+        ctk.CTkButton(filter_frame, text="Filter", width=80, command=self.apply_filter).pack(side="left", padx=5)
+        ctk.CTkButton(filter_frame, text="Clear", width=80, command=self.clear_filter).pack(side="left", padx=5)
+
+        self.date_from_entry.bind('<Return>', lambda e: self.apply_filter())
+        self.date_to_entry.bind('<Return>', lambda e: self.apply_filter())
+
+        # Create table
+        columns = {
+            "ID": {'width': 50},
+            "Admin": {'width': 100},
+            "User": {'width': 100},
+            "Date": {'width': 150},
+            "Total Amount": {'width': 100},
+            "Purchased Items": {'width': 300},
+        }
+        self.table = VirtualTable(self, columns, format_row=self.format_row, width=500)
+        self.table.grid(row=1, column=0, sticky="nsew")
+        self.tree = self.table.tree
+
         # Initial load
         self.refresh()
-    
+
+    def format_row(self, purchase):
+        """Format a purchase row for display"""
+        return (
+            purchase[0],
+            purchase[1] or "N/A",  # Admin name
+            purchase[2] or "N/A",  # User name
+            purchase[3],           # Date
+            f"${purchase[4]:.2f}", # Total amount
+            purchase[5] or "",     # Products with quantities
+        )
+
+    def apply_filter(self):
+        """Filter the purchases by the entered date range"""
+        filters = {}
+        for key, entry in (('date_from', self.date_from_entry), ('date_to', self.date_to_entry)):
+            value = entry.get().strip()
+            if value:
+                try:
+                    datetime.strptime(value, "%Y-%m-%d")
+                except ValueError:
+                    messagebox.showerror("Error", "Dates must be in YYYY-MM-DD format")
+                    return
+            filters[key] = value or None
+
+        self.filters = filters
+        self.refresh()
+
+    def clear_filter(self):
+        """Show every purchase again"""
+        self.date_from_entry.delete(0, 'end')
+        self.date_to_entry.delete(0, 'end')
+        self.filters = {'date_from': None, 'date_to': None}
+        self.refresh()
+
     def refresh(self):
         """Refresh the purchase table data"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Get all purchases with admin and user info
-            cursor.execute("""
-                SELECT 
-                    p.id,
-                    a.username as admin_name,
-                    u.name as user_name,
-                    p.created_at,
-                    p.total_amount
-                FROM purchases p
-                LEFT JOIN admin a ON p.created_by = a.id
-                LEFT JOIN users u ON p.user_id = u.id
-                ORDER BY p.created_at DESC
-            """)
-            purchases = cursor.fetchall()
-            
-            # For each purchase, get its products
-            for purchase in purchases:
-                purchase_id = purchase[0]
-                cursor.execute("""
-                    SELECT pr.name, pd.quantity
-                    FROM purchase_details pd
-                    JOIN products pr ON pd.product_id = pr.id
-                    WHERE pd.purchase_id = ?
-                    ORDER BY pr.name
-                """, (purchase_id,))
-                products = cursor.fetchall()
-                
-                # Format products as "item1, qty1 | item2, qty2"
-                products_str = " | ".join([f"{name}, {qty}" for name, qty in products])
-                
-                # Format total amount with currency symbol
-                formatted_total = f"${purchase[4]:.2f}"
-                
-                # Insert into treeview with all information
-                self.tree.insert("", "end", values=(
-                    purchase_id,
-                    purchase[1] or "N/A",  # Admin name
-                    purchase[2] or "N/A",  # User name
-                    purchase[3],           # Date
-                    formatted_total,       # Total amount
-                    products_str          # Products with quantities
-                ))
-            
-            conn.close()
-                
-        except Exception as e:
-            print(f"Error loading purchases: {e}")
+        pager = self.product_manager.purchases_pager(**self.filters)
+
+        # Keep the header sort the user picked
+        previous = self.table.pager
+        if previous:
+            pager.set_sort(previous.sort, previous.reverse)
+        self.table.set_pager(pager)
@@ -0,0 +1 @@
+from .sales_frame import SalesFrame
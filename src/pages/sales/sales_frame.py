@@ -0,0 +1,237 @@
+import customtkinter as ctk
+from datetime import date
+from tkinter import messagebox
+from src.database.db_config import db_connection
+from src.database.paging import ListPager
+from src.database.sales_analytics import sales_by_period, sales_by_product, sales_by_category, year_over_year
+from src.interfaces.background import BackgroundRunner
+from src.interfaces.charts import new_figure, draw_figure
+from src.interfaces.virtual_table import VirtualTable
+from src.pages.dashboard.dashboard_frame import DashboardMetricCard
+
+PERIOD_CHOICES = ['day', 'week', 'month']
+
+MONTH_LABELS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+# Table column -> row index of the report rows
+PRODUCT_COLUMNS = {'SKU': 1, 'Name': 2, 'Units': 4, 'Revenue': 5, 'Margin': 6}
+CATEGORY_COLUMNS = {'Category': 0, 'Units': 2, 'Revenue': 3, 'Margin': 4}
+
+
+def format_money(value):
+    return f"${value:,.2f}"
+
+
+class SalesFrame(ctk.CTkFrame):
+    """Sales reports read from the daily rollups (see src.database.sales_analytics)
+
+    Revenue, units and margin for a date range, bucketed by day, week or
+    month, the same months a year earlier, and the products and categories
+    ranked by revenue. Reports load on a worker thread.
+    """
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.runner = BackgroundRunner(self, name="sales")
+        self.period_data = None
+        self.yoy_data = None
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.scrollable_frame = ctk.CTkScrollableFrame(self)
+        self.scrollable_frame.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+        self.scrollable_frame.grid_columnconfigure((0, 1, 2), weight=1)
+
+        ctk.CTkLabel(
+            self.scrollable_frame,
+            text="Sales",
+            font=("Arial", 24, "bold")
+        ).grid(row=0, column=0, columnspan=3, pady=(20, 0))
+
+        self.create_controls()
+        self.create_metrics_section()
+        self.create_charts_section()
+        self.create_tables_section()
+        self.refresh()
+
+    def create_controls(self):
+        """Period selector and date range"""
+        controls = ctk.CTkFrame(self.scrollable_frame, fg_color="transparent")
+        controls.grid(row=1, column=0, columnspan=3, pady=10)
+
+        today = date.today()
+        ctk.CTkLabel(controls, text="Group by:").pack(side="left", padx=5)
+        self.period_var = ctk.StringVar(value='week')
+        ctk.CTkComboBox(
+            controls, values=PERIOD_CHOICES, variable=self.period_var, width=100,
+            command=lambda _: self.refresh()
+        ).pack(side="left", padx=5)
+
+        ctk.CTkLabel(controls, text="From:").pack(side="left", padx=5)
+        self.from_entry = ctk.CTkEntry(controls, width=110)
+        self.from_entry.insert(0, today.replace(month=1, day=1).isoformat())
+        self.from_entry.pack(side="left", padx=5)
+
+        ctk.CTkLabel(controls, text="To:").pack(side="left", padx=5)
+        self.to_entry = ctk.CTkEntry(controls, width=110)
+        self.to_entry.insert(0, today.isoformat())
+        self.to_entry.pack(side="left", padx=5)
+
+        ctk.CTkButton(controls, text="Show", width=80, command=self.refresh).pack(side="left", padx=5)
+
+        self.status_label = ctk.CTkLabel(self.scrollable_frame, text="Loading...", text_color="gray")
+        self.status_label.grid(row=3, column=0, columnspan=3)
+
+    def create_metrics_section(self):
+        self.metric_cards = {}
+        for column, (key, title, icon) in enumerate((
+            ('revenue', "Revenue", "💵"),
+            ('units', "Units Sold", "📦"),
+            ('margin', "Margin", "📈"),
+        )):
+            card = DashboardMetricCard(self.scrollable_frame, title, "", icon)
+            card.grid(row=2, column=column, padx=10, pady=10, sticky="nsew")
+            self.metric_cards[key] = card
+
+    def create_charts_section(self):
+        charts_frame = ctk.CTkFrame(self.scrollable_frame)
+        charts_frame.grid(row=4, column=0, columnspan=3, padx=10, pady=10, sticky="nsew")
+        charts_frame.grid_columnconfigure((0, 1), weight=1)
+
+        self.period_figure = new_figure()
+        self.period_ax = self.period_figure.add_subplot()
+        self.period_canvas = draw_figure(self.period_figure, charts_frame)
+        self.period_canvas.get_tk_widget().grid(row=0, column=0, padx=10, pady=10)
+
+        self.yoy_figure = new_figure()
+        self.yoy_ax = self.yoy_figure.add_subplot()
+        self.yoy_canvas = draw_figure(self.yoy_figure, charts_frame)
+        self.yoy_canvas.get_tk_widget().grid(row=0, column=1, padx=10, pady=10)
+
+    def create_tables_section(self):
+        tables_frame = ctk.CTkFrame(self.scrollable_frame)
+        tables_frame.grid(row=5, column=0, columnspan=3, padx=10, pady=10, sticky="nsew")
+        tables_frame.grid_columnconfigure((0, 1), weight=1)
+
+        ctk.CTkLabel(tables_frame, text="Products by Revenue", font=("Arial", 16, "bold")).grid(row=0, column=0, pady=10)
+        self.product_table = VirtualTable(
+            tables_frame,
+            {col: {'width': 100, 'anchor': 'e' if col in ('Units', 'Revenue', 'Margin') else 'w'}
+             for col in PRODUCT_COLUMNS},
+            format_row=lambda row: (row[1], row[2], row[4], format_money(row[5]), format_money(row[6])),
+            height=10,
+        )
+        self.product_table.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
+
+        ctk.CTkLabel(tables_frame, text="Categories by Revenue", font=("Arial", 16, "bold")).grid(row=0, column=1, pady=10)
+        self.category_table = VirtualTable(
+            tables_frame,
+            {col: {'width': 100, 'anchor': 'e' if col != 'Category' else 'w'} for col in CATEGORY_COLUMNS},
+            format_row=lambda row: (row[0], row[2], format_money(row[3]), format_money(row[4])),
+            height=10,
+        )
+        self.category_table.grid(row=1, column=1, padx=10, pady=10, sticky="nsew")
+
+    def get_range(self):
+        """(from, to) as YYYY-MM-DD, None when an entry is not a valid date"""
+        try:
+            date_from = date.fromisoformat(self.from_entry.get().strip())
+            date_to = date.fromisoformat(self.to_entry.get().strip())
+        except ValueError:
+            return None
+        return date_from.isoformat(), date_to.isoformat()
+
+    def load_reports(self, period, date_from, date_to):
+        """Worker side: every report for the range"""
+        with db_connection() as conn:
+            return {
+                'periods': sales_by_period(conn, period, date_from, date_to),
+                'products': sales_by_product(conn, date_from, date_to),
+                'categories': sales_by_category(conn, date_from, date_to),
+                'yoy': year_over_year(conn, int(date_to[:4])),
+                'year': int(date_to[:4]),
+            }
+
+    def refresh(self):
+        date_range = self.get_range()
+        if date_range is None:
+            messagebox.showwarning("Warning", "Dates must be in YYYY-MM-DD format")
+            return
+        if date_range[0] > date_range[1]:
+            messagebox.showwarning("Warning", "The start date is after the end date")
+            return
+        period = self.period_var.get()
+        self.status_label.configure(text="Loading...")
+        self.runner.submit(
+            "reports",
+            lambda cancelled: self.load_reports(period, *date_range),
+            self.show_data,
+            lambda e: messagebox.showerror("Error", f"Error loading sales: {e}"),
+        )
+
+    def show_data(self, data):
+        """Tk side: put the loaded reports on screen"""
+        periods = data['periods']
+        revenue = sum(row[3] for row in periods)
+        margin = sum(row[4] for row in periods)
+        costed_revenue = sum(row[5] for row in periods)
+        self.metric_cards['revenue'].set_value(format_money(revenue))
+        self.metric_cards['units'].set_value(str(sum(row[2] for row in periods)))
+        if costed_revenue:
+            self.metric_cards['margin'].set_value(f"{format_money(margin)} ({margin / costed_revenue:.0%})")
+        else:
+            self.metric_cards['margin'].set_value("No costs set")
+
+        self.update_period_chart(periods)
+        self.update_yoy_chart(data['year'], data['yoy'])
+        self.product_table.set_pager(ListPager(data['products'], sort_columns=PRODUCT_COLUMNS))
+        self.category_table.set_pager(ListPager(data['categories'], sort_columns=CATEGORY_COLUMNS))
+        self.status_label.configure(
+            text=f"{sum(row[1] for row in periods)} purchases in {len(periods)} {self.period_var.get()}s"
+        )
+
+    def update_period_chart(self, rows):
+        """Revenue and margin per period, redrawn only when they changed"""
+        if rows == self.period_data:
+            return
+        self.period_data = rows
+        ax = self.period_ax
+        ax.clear()
+        labels = [row[0] for row in rows]
+        ax.plot(labels, [row[3] for row in rows], marker='o', label='Revenue')
+        ax.plot(labels, [row[4] for row in rows], marker='o', label='Margin')
+        ax.set_title('Revenue by Period')
+        ax.tick_params(axis='x', labelrotation=45, labelsize=7)
+        # Keep about a dozen date labels whatever the period count
+        step = max(1, len(labels) // 12)
+        ax.set_xticks(range(0, len(labels), step))
+        ax.set_xticklabels(labels[::step])
+        if rows:
+            ax.legend()
+        self.period_figure.tight_layout()
+        self.period_canvas.draw_idle()
+
+    def update_yoy_chart(self, year, rows):
+        """Monthly revenue of a year next to the year before"""
+        if (year, rows) == self.yoy_data:
+            return
+        self.yoy_data = (year, rows)
+        by_month = {int(month): (current, previous) for month, current, previous in rows}
+        months = range(1, 13)
+        ax = self.yoy_ax
+        ax.clear()
+        ax.bar([m - 0.2 for m in months], [by_month.get(m, (0, 0))[1] for m in months], width=0.4, label=str(year - 1))
+        ax.bar([m + 0.2 for m in months], [by_month.get(m, (0, 0))[0] for m in months], width=0.4, label=str(year))
+        ax.set_xticks(list(months))
+        ax.set_xticklabels(MONTH_LABELS, fontsize=7)
+        ax.set_title('Revenue Year over Year')
+        ax.legend()
+        self.yoy_canvas.draw_idle()
+
+    def on_show(self):
+        self.refresh()
+
+    def destroy(self):
+        self.runner.shutdown()
+        super().destroy()
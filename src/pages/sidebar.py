@@ -35,6 +35,10 @@ class SidebarFrame(ctk.CTkFrame):
                 "text": "Checkout",
                 "icon": "🛒"
             },
+            "sales": {
+                "text": "Sales",
+                "icon": "📈"
+            },
             "users": {
                 "text": "Users",
                 "icon": "👥"
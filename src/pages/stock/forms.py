@@ -2,6 +2,7 @@ import customtkinter as ctk
 from tkinter import messagebox
 from datetime import datetime
 from tkcalendar import DateEntry
+from src.database.stock_ledger import MOVEMENT_TYPES
 
 class AddStockForm(ctk.CTkFrame):
     def __init__(self, parent, stock_manager, refresh_callback):
@@ -139,7 +140,7 @@ class SearchStockForm(ctk.CTkFrame):
         self.product_id.pack(pady=5, padx=10, fill="x")
         
         # Movement Type
-        self.movement_type = ctk.CTkComboBox(self, values=["All", "IN", "OUT"])
+        self.movement_type = ctk.CTkComboBox(self, values=["All"] + MOVEMENT_TYPES)
         self.movement_type.set("All")
         self.movement_type.pack(pady=5, padx=10, fill="x")
         
@@ -159,6 +160,12 @@ class SearchStockForm(ctk.CTkFrame):
                                foreground='white', borderwidth=2)
         self.date_to.pack(side="left", padx=5)
         
+        # Stock as of the To date instead of the movements
+        self.as_of = ctk.CTkCheckBox(self, text="Show stock and value as of the To date")
+        self.as_of.pack(pady=5, padx=10, anchor="w")
+        self.as_of_time = ctk.CTkEntry(self, placeholder_text="Time HH:MM (Optional, end of day)")
+        self.as_of_time.pack(pady=5, padx=10, fill="x")
+        
         # Search button
         ctk.CTkButton(self, text="Search",
                      command=self.search).pack(pady=10)
@@ -170,6 +177,10 @@ class SearchStockForm(ctk.CTkFrame):
                      hover_color="#7f8c8d").pack(pady=5)
     
     def search(self):
+        if self.as_of.get():
+            self.search_as_of()
+            return
+        
         filters = {}
         
         # Add product ID filter if provided
@@ -191,8 +202,23 @@ class SearchStockForm(ctk.CTkFrame):
         # Refresh table with filters
         self.refresh_callback(filters)
     
+    def search_as_of(self):
+        day = self.date_to.get_date()
+        if not self.as_of_time.get():
+            # The date alone is the end of that day
+            self.refresh_callback({'as_of': day})
+            return
+        try:
+            at = datetime.strptime(self.as_of_time.get(), "%H:%M").time()
+        except ValueError:
+            messagebox.showerror("Error", "Please enter the time as HH:MM")
+            return
+        self.refresh_callback({'as_of': datetime.combine(day, at)})
+    
     def clear(self):
         self.product_id.delete(0, 'end')
+        self.as_of_time.delete(0, 'end')
+        self.as_of.deselect()
         self.movement_type.set("All")
         self.date_from.set_date(datetime.now())
         self.date_to.set_date(datetime.now())
@@ -1,6 +1,6 @@
 import customtkinter as ctk
 from .stock_manager import StockManager
-from .stock_table import StockTable
+from .stock_table import InventoryTable, StockTable
 from .forms import AddStockForm, RemoveStockForm, SearchStockForm
 
 class StockManagementFrame(ctk.CTkFrame):
@@ -78,6 +78,8 @@ class StockManagementFrame(ctk.CTkFrame):
         """Setup the stock table"""
         self.stock_table = StockTable(self.table_frame, self.stock_manager)
         self.stock_table.pack(fill="both", expand=True)
+        # Shown instead of the movements for a search "as of" a moment
+        self.inventory_table = InventoryTable(self.table_frame, self.stock_manager)
     
     def show_form(self, form_type):
         """Show the selected form and hide others"""
@@ -86,5 +88,12 @@ class StockManagementFrame(ctk.CTkFrame):
         self.forms[form_type].pack(fill="both", expand=True, padx=10, pady=10)
     
     def refresh_table(self, filters=None):
-        """Refresh the stock table"""
+        """Refresh the stock table, or show the inventory when the filters ask for stock as of a moment"""
+        if filters and filters.get('as_of'):
+            self.stock_table.pack_forget()
+            self.inventory_table.pack(fill="both", expand=True)
+            self.inventory_table.refresh(filters['as_of'])
+            return
+        self.inventory_table.pack_forget()
+        self.stock_table.pack(fill="both", expand=True)
         self.stock_table.refresh(filters)
@@ -1,134 +1,147 @@
-from database.db_config import get_db_connection
+from src.database.db_config import db_connection
+from src.database.catalog import catalog
+from src.database.catalog_snapshot import snapshot, rows_for_ids
+from src.database.forecasting import reorder_suggestions
+from src.database.stock_ledger import (
+    IN, OUT, MOVEMENT_COLUMNS, MOVEMENT_SOURCE, inventory_as_of, inventory_valuation, movement_conditions,
+    movements_pager, record_movements,
+)
+from src.database.paging import ListPager
+
+# Inventory table column -> row index of the inventory_as_of() rows
+INVENTORY_SORT_COLUMNS = {
+    'ID': 0,
+    'Reference': 1,
+    'Product': 2,
+    'Quantity': 3,
+    'Unit Cost': 4,
+    'Unit Price': 5,
+    'Cost Value': 6,
+    'Retail Value': 7,
+}
 
 class StockManager:
-    def __init__(self):
-        self.conn = get_db_connection()
-        self.cursor = self.conn.cursor()
-    
     def add_stock(self, product_id, quantity_added, date, note=""):
         """Add stock for a product"""
         try:
-            # First update the product's quantity
-            self.cursor.execute("""
-                UPDATE products 
-                SET quantity = quantity + ? 
-                WHERE id = ?
-            """, (quantity_added, product_id))
-            
-            # Then record the stock movement
-            self.cursor.execute("""
-                INSERT INTO stock_movements (product_id, quantity_change, movement_type, date, note)
-                VALUES (?, ?, 'IN', ?, ?)
-            """, (product_id, quantity_added, date, note))
-            
-            self.conn.commit()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                # First update the product's quantity
+                cursor.execute("""
+                    UPDATE products 
+                    SET quantity = quantity + ? 
+                    WHERE id = ?
+                """, (quantity_added, product_id))
+                
+                # Then record the stock movement
+                record_movements(cursor, [(product_id, quantity_added, IN, date, note)])
+                
+                conn.commit()
+                catalog.put_product(conn, product_id)
             return True
         except Exception as e:
             print(f"Error adding stock: {e}")
-            self.conn.rollback()
             return False
     
     def remove_stock(self, product_id, quantity_removed, date, note=""):
         """Remove stock for a product"""
         try:
-            # Check if we have enough stock
-            self.cursor.execute("SELECT quantity FROM products WHERE id = ?", (product_id,))
-            current_quantity = self.cursor.fetchone()[0]
-            
-            if current_quantity < quantity_removed:
-                return False, "Insufficient stock"
-            
-            # Update product quantity
-            self.cursor.execute("""
-                UPDATE products 
-                SET quantity = quantity - ? 
-                WHERE id = ?
-            """, (quantity_removed, product_id))
-            
-            # Record the stock movement
-            self.cursor.execute("""
-                INSERT INTO stock_movements (product_id, quantity_change, movement_type, date, note)
-                VALUES (?, ?, 'OUT', ?, ?)
-            """, (product_id, quantity_removed, date, note))
-            
-            self.conn.commit()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                # Check if we have enough stock
+                cursor.execute("SELECT quantity FROM products WHERE id = ?", (product_id,))
+                current_quantity = cursor.fetchone()[0]
+                
+                if current_quantity < quantity_removed:
+                    return False, "Insufficient stock"
+                
+                # Update product quantity
+                cursor.execute("""
+                    UPDATE products 
+                    SET quantity = quantity - ? 
+                    WHERE id = ?
+                """, (quantity_removed, product_id))
+                
+                # Record the stock movement, stock leaving is a negative change
+                record_movements(cursor, [(product_id, -quantity_removed, OUT, date, note)])
+                
+                conn.commit()
+                catalog.put_product(conn, product_id)
             return True, "Stock removed successfully"
         except Exception as e:
             print(f"Error removing stock: {e}")
-            self.conn.rollback()
             return False, str(e)
     
     def get_stock_movements(self, filters=None):
         """Get stock movements with optional filters"""
         try:
-            query = """
-                SELECT 
-                    sm.id,
-                    p.reference,
-                    p.name,
-                    sm.quantity_change,
-                    sm.movement_type,
-                    sm.date,
-                    sm.note,
-                    p.quantity as current_stock
-                FROM stock_movements sm
-                JOIN products p ON sm.product_id = p.id
-            """
-            
-            if filters:
-                conditions = []
-                params = []
-                
-                if filters.get('product_id'):
-                    conditions.append("p.id = ?")
-                    params.append(filters['product_id'])
-                
-                if filters.get('movement_type'):
-                    conditions.append("sm.movement_type = ?")
-                    params.append(filters['movement_type'])
-                
-                if filters.get('date_from'):
-                    conditions.append("sm.date >= ?")
-                    params.append(filters['date_from'])
-                
-                if filters.get('date_to'):
-                    conditions.append("sm.date <= ?")
-                    params.append(filters['date_to'])
-                
-                if conditions:
-                    query += " WHERE " + " AND ".join(conditions)
+            query = f"SELECT {', '.join(MOVEMENT_COLUMNS)} FROM {MOVEMENT_SOURCE}"
+            conditions, params = movement_conditions(filters)
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
             
             query += " ORDER BY sm.date DESC"
             
-            self.cursor.execute(query, params if filters else ())
-            return self.cursor.fetchall()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                return cursor.fetchall()
         except Exception as e:
             print(f"Error getting stock movements: {e}")
             return []
     
+    def movements_pager(self, filters=None, sort='Date', reverse=True):
+        """Pager over the stock movements ordered by a stock table column, newest first by default"""
+        return movements_pager(filters, sort, reverse)
+    
     def get_low_stock_products(self, threshold=None):
         """Get products with stock below their minimum quantity"""
         try:
-            query = """
-                SELECT 
-                    id, reference, name, quantity, min_quantity,
-                    CASE 
-                        WHEN quantity <= 0 THEN 'Out of Stock'
-                        WHEN quantity <= min_quantity THEN 'Low Stock'
+            with db_connection() as conn:
+                # The snapshot picks and orders the rows: out of stock, low, then the rest
+                ids = snapshot.refresh(conn).low_stock_ids(threshold)
+                return rows_for_ids(conn, ids, """
+                    p.id, p.reference, p.name, p.quantity, p.min_quantity,
+                    CASE
+                        WHEN p.quantity <= 0 THEN 'Out of Stock'
+                        WHEN p.quantity <= p.min_quantity THEN 'Low Stock'
                         ELSE 'OK'
                     END as status
-                FROM products
-                WHERE quantity <= COALESCE(?, min_quantity)
-                ORDER BY 
-                    CASE 
-                        WHEN quantity <= 0 THEN 1
-                        WHEN quantity <= min_quantity THEN 2
-                        ELSE 3
-                    END
-            """
-            
-            self.cursor.execute(query, (threshold,))
-            return self.cursor.fetchall()
+                """)
         except Exception as e:
             print(f"Error getting low stock products: {e}")
             return []
+
+    def get_reorder_suggestions(self, limit=None):
+        """Products the last forecasting run says to reorder, with the suggested quantities"""
+        try:
+            with db_connection() as conn:
+                return reorder_suggestions(conn, limit)
+        except Exception as e:
+            print(f"Error getting reorder suggestions: {e}")
+            return []
+
+    def get_inventory_as_of(self, moment=None):
+        """Quantity and value of every product in stock at a moment (date, datetime or ISO text), now when None"""
+        try:
+            with db_connection() as conn:
+                return inventory_as_of(conn, moment, in_stock=True)
+        except Exception as e:
+            print(f"Error getting inventory: {e}")
+            return []
+
+    def inventory_pager(self, moment=None):
+        """Pager over get_inventory_as_of(), largest retail value first"""
+        return ListPager(self.get_inventory_as_of(moment), sort_columns=INVENTORY_SORT_COLUMNS,
+                         sort='Retail Value', reverse=True)
+
+    def get_inventory_valuation(self, moment=None):
+        """Products in stock, units and their value at cost and at price at a moment"""
+        try:
+            with db_connection() as conn:
+                return inventory_valuation(conn, moment)
+        except Exception as e:
+            print(f"Error getting inventory valuation: {e}")
+            return None
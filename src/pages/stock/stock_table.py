@@ -1,6 +1,7 @@
 import customtkinter as ctk
 from tkinter import ttk, Menu
 from datetime import datetime
+from src.interfaces.virtual_table import VirtualTable
 
 class StockTable(ctk.CTkFrame):
     def __init__(self, parent, stock_manager):
@@ -24,28 +25,18 @@ class StockTable(ctk.CTkFrame):
     
     def setup_table(self):
         """Setup the table and scrollbars"""
-        columns = list(self.columns.keys())
-        self.tree = ttk.Treeview(self, columns=columns, show='headings')
-        
         # Configure the treeview style
         style = ttk.Style()
         style.configure("Treeview", font=('Arial', 10))
         style.configure("Treeview.Heading", font=('Arial', 10, 'bold'))
         
-        # Define headings and columns
-        for col in columns:
-            self.tree.heading(col, text=col, command=lambda c=col: self.sort_table_by_column(c))
-            self.tree.column(col, width=self.columns[col]['width'], anchor=self.columns[col]['anchor'])
-        
-        # Add scrollbars
-        y_scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
-        x_scrollbar = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
+        self.table = VirtualTable(self, self.columns, row_tags=self.row_tags)
+        self.table.pack(fill="both", expand=True)
+        self.tree = self.table.tree
         
-        # Pack the table and scrollbars
-        self.tree.pack(side="left", fill="both", expand=True)
-        y_scrollbar.pack(side="right", fill="y")
-        x_scrollbar.pack(side="bottom", fill="x")
+        # Configure row colors
+        self.tree.tag_configure('in', foreground='green')
+        self.tree.tag_configure('out', foreground='red')
         
         # Bind events
         self.tree.bind('<Button-3>', self.show_context_menu)
@@ -59,65 +50,77 @@ class StockTable(ctk.CTkFrame):
     
     def show_context_menu(self, event):
         """Show context menu on right-click"""
-        item = self.tree.identify_row(event.y)
-        if item:
-            self.tree.selection_set(item)
+        if self.table.select_at(event.y):
             self.context_menu.post(event.x_root, event.y_root)
     
     def view_details(self):
         """View details of selected movement"""
-        selection = self.tree.selection()
-        if not selection:
+        if not self.table.selected_row():
             return
         # TODO: Implement view details dialog
         pass
     
     def export_movement(self):
         """Export selected movement"""
-        selection = self.tree.selection()
-        if not selection:
+        if not self.table.selected_row():
             return
         # TODO: Implement export functionality
         pass
     
-    def sort_table_by_column(self, column):
-        """Sort table by clicking on column header"""
-        items = [(self.tree.set(item, column), item) for item in self.tree.get_children()]
-        
-        # Sort items
-        items.sort(reverse=getattr(self, '_sort_reverse', False))
-        
-        # Update sort direction for next click
-        self._sort_reverse = not getattr(self, '_sort_reverse', False)
-        
-        # Rearrange items in sorted positions
-        for index, (_, item) in enumerate(items):
-            self.tree.move(item, '', index)
+    def row_tags(self, movement):
+        # Set row color by direction: stock coming in or leaving
+        return ('in',) if movement[3] > 0 else ('out',)
     
     def refresh(self, filters=None):
-        """Refresh table data"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Get and display stock movements
-        movements = self.stock_manager.get_stock_movements(filters)
-        for movement in movements:
-            values = (
-                movement[0],  # ID
-                movement[1],  # Reference
-                movement[2],  # Product Name
-                movement[3],  # Quantity Change
-                movement[4],  # Movement Type
-                movement[5],  # Date
-                movement[6],  # Note
-                movement[7]   # Current Stock
-            )
-            
-            # Set row color based on movement type
-            tag = 'in' if movement[4] == 'IN' else 'out'
-            self.tree.insert('', 'end', values=values, tags=(tag,))
-        
-        # Configure row colors
-        self.tree.tag_configure('in', foreground='green')
-        self.tree.tag_configure('out', foreground='red')
+        """Refresh table data, keeping the header sort the user picked"""
+        previous = self.table.pager
+        if previous is None:
+            pager = self.stock_manager.movements_pager(filters)
+        else:
+            pager = self.stock_manager.movements_pager(filters, previous.sort, previous.reverse)
+        self.table.set_pager(pager)
+
+
+def format_money(value):
+    return "" if value is None else f"${value:,.2f}"
+
+
+class InventoryTable(ctk.CTkFrame):
+    """Stock and value of every product at a past moment (see StockManager.inventory_pager)"""
+
+    def __init__(self, parent, stock_manager):
+        super().__init__(parent)
+        self.stock_manager = stock_manager
+
+        self.columns = {
+            'ID': {'width': 50, 'anchor': 'center'},
+            'Reference': {'width': 100, 'anchor': 'w'},
+            'Product': {'width': 200, 'anchor': 'w'},
+            'Quantity': {'width': 80, 'anchor': 'center'},
+            'Unit Cost': {'width': 90, 'anchor': 'e'},
+            'Unit Price': {'width': 90, 'anchor': 'e'},
+            'Cost Value': {'width': 110, 'anchor': 'e'},
+            'Retail Value': {'width': 110, 'anchor': 'e'}
+        }
+
+        # Totals of the moment shown
+        self.summary = ctk.CTkLabel(self, text="", font=("Arial", 12, "bold"), anchor="w")
+        self.summary.pack(fill="x", padx=10, pady=5)
+
+        self.table = VirtualTable(self, self.columns, format_row=self.format_row)
+        self.table.pack(fill="both", expand=True)
+
+    def format_row(self, row):
+        """Format an inventory row for display"""
+        return list(row[:4]) + [format_money(value) for value in row[4:]]
+
+    def refresh(self, moment):
+        """Show the inventory at a moment (date or datetime)"""
+        valuation = self.stock_manager.get_inventory_valuation(moment)
+        if valuation:
+            self.summary.configure(text=(
+                f"Stock as of {moment}: {valuation['products']} products, "
+                f"{valuation['units']} units, {format_money(valuation['cost_value'])} at cost, "
+                f"{format_money(valuation['retail_value'])} at retail"
+            ))
+        self.table.set_pager(self.stock_manager.inventory_pager(moment))
@@ -1,8 +1,21 @@
 import customtkinter as ctk
-from tkinter import ttk, messagebox
-from src.database.db_config import get_db_connection
+from tkinter import messagebox
+from src.database.db_config import db_connection
+from src.database.paging import KeysetPager
+from src.interfaces.virtual_table import VirtualTable
 import sqlite3
 
+# User table column -> ORDER BY expression
+USER_SORT_COLUMNS = {
+    'ID': 'id',
+    'Name': 'name',
+    'Phone': "COALESCE(phone, '')",
+    'Email': "COALESCE(email, '')",
+    'Loyalty Points': 'COALESCE(loyalty_points, 0)',
+    'Total Spent': 'COALESCE(total_spent, 0)',
+    'Created At': "COALESCE(created_at, '')",
+}
+
 class UsersFrame(ctk.CTkFrame):
     def __init__(self, parent, **kwargs):
         super().__init__(parent, fg_color="transparent", **kwargs)
@@ -92,31 +105,20 @@ class UsersFrame(ctk.CTkFrame):
         self.table_frame.grid_rowconfigure(0, weight=1)
         self.table_frame.grid_columnconfigure(0, weight=1)
         
-        columns = ('ID', 'Name', 'Phone', 'Email', 'Loyalty Points', 'Total Spent', 'Created At')
-        self.tree = ttk.Treeview(self.table_frame, columns=columns, show='headings')
-        
-        # Define headings
-        column_widths = {
-            'ID': 50,
-            'Name': 150,
-            'Phone': 100,
-            'Email': 200,
-            'Loyalty Points': 100,
-            'Total Spent': 100,
-            'Created At': 150
+        # Define columns
+        columns = {
+            'ID': {'width': 50},
+            'Name': {'width': 150},
+            'Phone': {'width': 100},
+            'Email': {'width': 200},
+            'Loyalty Points': {'width': 100},
+            'Total Spent': {'width': 100},
+            'Created At': {'width': 150}
         }
         
-        for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=column_widths[col])
-        
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(self.table_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        
-        # Pack the table and scrollbar
-        self.tree.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.table = VirtualTable(self.table_frame, columns)
+        self.table.pack(fill="both", expand=True)
+        self.tree = self.table.tree
         
         # Show create form by default
         self.show_form("create")
@@ -161,16 +163,15 @@ class UsersFrame(ctk.CTkFrame):
                 messagebox.showerror("Error", "Loyalty points must be a valid number")
                 return
             
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO users (name, phone, email, loyalty_points, total_spent)
-                VALUES (?, ?, ?, ?, 0.0)
-            """, (name, phone, email, loyalty_points))
-            
-            conn.commit()
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    INSERT INTO users (name, phone, email, loyalty_points, total_spent)
+                    VALUES (?, ?, ?, ?, 0.0)
+                """, (name, phone, email, loyalty_points))
+                
+                conn.commit()
             
             self.clear_create_entries()
             self.refresh_table()
@@ -189,17 +190,16 @@ class UsersFrame(ctk.CTkFrame):
                 messagebox.showerror("Error", "Please enter a user ID")
                 return
             
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT name, phone, email, loyalty_points
-                FROM users
-                WHERE id = ?
-            """, (int(user_id),))
-            
-            user = cursor.fetchone()
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    SELECT name, phone, email, loyalty_points
+                    FROM users
+                    WHERE id = ?
+                """, (int(user_id),))
+                
+                user = cursor.fetchone()
             
             if user:
                 self.update_name_entry.delete(0, 'end')
@@ -238,17 +238,16 @@ class UsersFrame(ctk.CTkFrame):
                 messagebox.showerror("Error", "Loyalty points must be a valid number")
                 return
             
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                UPDATE users
-                SET name = ?, phone = ?, email = ?, loyalty_points = ?
-                WHERE id = ?
-            """, (new_name, new_phone, new_email, loyalty_points, int(user_id)))
-            
-            conn.commit()
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    UPDATE users
+                    SET name = ?, phone = ?, email = ?, loyalty_points = ?
+                    WHERE id = ?
+                """, (new_name, new_phone, new_email, loyalty_points, int(user_id)))
+                
+                conn.commit()
             
             self.clear_update_entries()
             self.refresh_table()
@@ -267,29 +266,26 @@ class UsersFrame(ctk.CTkFrame):
                 messagebox.showerror("Error", "Please enter a user ID")
                 return
             
-            # Check if user has any purchases
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT COUNT(*) FROM purchase WHERE buyer_id = ?
-            """, (int(user_id),))
-            
-            purchase_count = cursor.fetchone()[0]
-            
-            if purchase_count > 0:
-                if not messagebox.askyesno("Warning", 
-                    f"This user has {purchase_count} purchases. Deleting the user will keep the purchase records. Continue?"):
-                    conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                # Check if user has any purchases
+                cursor.execute("""
+                    SELECT COUNT(*) FROM purchase WHERE buyer_id = ?
+                """, (int(user_id),))
+                
+                purchase_count = cursor.fetchone()[0]
+                
+                if purchase_count > 0:
+                    if not messagebox.askyesno("Warning", 
+                        f"This user has {purchase_count} purchases. Deleting the user will keep the purchase records. Continue?"):
+                        return
+                
+                if not messagebox.askyesno("Confirm", "Are you sure you want to delete this user?"):
                     return
-            
-            if not messagebox.askyesno("Confirm", "Are you sure you want to delete this user?"):
-                conn.close()
-                return
-            
-            cursor.execute("DELETE FROM users WHERE id = ?", (int(user_id),))
-            conn.commit()
-            conn.close()
+                
+                cursor.execute("DELETE FROM users WHERE id = ?", (int(user_id),))
+                conn.commit()
             
             self.delete_id_entry.delete(0, 'end')
             self.refresh_table()
@@ -298,29 +294,20 @@ class UsersFrame(ctk.CTkFrame):
         except Exception as e:
             messagebox.showerror("Error", f"Error deleting user: {e}")
     
+    def on_show(self):
+        self.table.refresh()
+    
     def refresh_table(self):
         """Refresh the user table"""
-        # Clear the current table
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT id, name, phone, email, loyalty_points, total_spent, created_at
-                FROM users
-                ORDER BY name
-            """)
-            
-            for row in cursor.fetchall():
-                self.tree.insert('', 'end', values=row)
-                
-            conn.close()
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error refreshing table: {e}")
+        sort = self.table.pager.sort if self.table.pager else 'Name'
+        reverse = self.table.pager.reverse if self.table.pager else False
+        self.table.set_pager(KeysetPager(
+            ["id", "name", "phone", "email", "loyalty_points", "total_spent", "created_at"],
+            "users",
+            sort_columns=USER_SORT_COLUMNS,
+            sort=sort,
+            reverse=reverse,
+        ), keep_position=True)
     
     def clear_create_entries(self):
         """Clear create form entries"""